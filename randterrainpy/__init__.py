@@ -1,3 +1,7 @@
 from terrain import *
 from exceptions import *
 from terraingen import *
+from terrainio import *
+from erosion import *
+from spatial import *
+from batch import *
@@ -0,0 +1,113 @@
+"""Generation of many terrains at once, spread over a pool of processes."""
+
+from terrain import Terrain
+from exceptions import *
+import numpy as np
+import multiprocessing
+import multiprocessing.sharedctypes
+
+
+_worker_state = {}
+"""dict: Shared array of all heights, and generator and its arguments, of a batch generation worker process.
+
+Only set in pool workers, so batches generated in this process (even one within another) never share it.
+"""
+
+
+def _init_batch_worker(shared_heights, shape, generator, args, kwargs):
+    """Attach a worker process to the shared heights of a batch generation.
+
+    Args:
+        shared_heights (multiprocessing.RawArray): Heights of all terrains in batch.
+        shape (tuple(int, int, int)): Shape of heights, (number of terrains, length, width).
+        generator (TerrainGenerator): Generator to call.
+        args (tuple): Positional arguments to call generator with.
+        kwargs (dict): Keyword arguments to call generator with, other than seed.
+
+    """
+    _worker_state.clear()
+    _worker_state["heights"] = np.frombuffer(shared_heights, dtype=np.float64).reshape(shape)
+    _worker_state["generator"] = generator
+    _worker_state["args"] = args
+    _worker_state["kwargs"] = kwargs
+
+
+def _generate_into(heights, generator, args, kwargs, index, seed):
+    """Generate one terrain of a batch, and store its heights in heights of batch.
+
+    Args:
+        heights (np.ndarray): Heights of all terrains in batch, of shape (number of terrains, length, width).
+        generator (TerrainGenerator): Generator to call.
+        args (tuple): Positional arguments to call generator with.
+        kwargs (dict): Keyword arguments to call generator with, other than seed.
+        index (int): Index of terrain in batch.
+        seed (int): Seed to generate terrain with.
+
+    Raises:
+        InvalidDimensionsError: Terrain is not the same size as the first in batch.
+
+    """
+    terrain = generator(*args, seed=seed, **kwargs)
+    if terrain.as_array().shape != heights.shape[1:]:
+        raise InvalidDimensionsError()
+    heights[index] = terrain.as_array()
+
+
+def _generate_item(item):
+    """Generate one terrain of a batch in a worker process, and store its heights in shared heights.
+
+    Args:
+        item (tuple(int, int)): Index of terrain in batch, and seed to generate it with.
+
+    """
+    index, seed = item
+    _generate_into(_worker_state["heights"], _worker_state["generator"], _worker_state["args"],
+                   _worker_state["kwargs"], index, seed)
+
+
+def generate_batch(generator, seeds, args=(), kwargs=None, processes=None):
+    """Generate one terrain for each of many seeds, spread over a pool of processes.
+
+    Each terrain is made by generator(*args, seed=seed, **kwargs), and is exactly the same as calling that directly.
+    Workers write heights straight into one shared array, rather than sending terrains back to be pickled.
+    The first terrain is made in this process, to find the size of all of them.
+
+    Args:
+        generator (TerrainGenerator): Generator that takes a seed keyword argument, e.g. DiamondSquareGenerator
+            or PerlinGenerator. Must be picklable, so amplitude functions must be defined at module level.
+        seeds (list[int]): Seed of each terrain.
+        args (tuple): Positional arguments to call generator with.
+        kwargs (dict): Keyword arguments to call generator with, other than seed.
+        processes (int): Number of worker processes. If None, the number of CPUs. If 1, all are made in this process.
+
+    Returns:
+        list[Terrain]: Terrain generated from each seed, in order, backed by one shared array.
+
+    Raises:
+        InvalidDimensionsError: Not all terrains are the same size.
+
+    """
+    kwargs = {} if kwargs is None else dict(kwargs)
+    seeds = list(seeds)
+    if not seeds:
+        return []
+    first = generator(*args, seed=seeds[0], **kwargs).as_array()
+    shape = (len(seeds),) + first.shape
+    shared_heights = multiprocessing.sharedctypes.RawArray("d", int(np.prod(shape)))
+    heights = np.frombuffer(shared_heights, dtype=np.float64).reshape(shape)
+    heights[0] = first
+    items = list(enumerate(seeds))[1:]
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes == 1 or len(items) <= 1:
+        for index, seed in items:
+            _generate_into(heights, generator, args, kwargs, index, seed)
+    else:
+        pool = multiprocessing.Pool(min(processes, len(items)), _init_batch_worker,
+                                    (shared_heights, shape, generator, args, kwargs))
+        try:
+            pool.map(_generate_item, items, chunksize=max(1, len(items) // (4 * processes)))
+        finally:
+            pool.close()
+            pool.join()
+    return [Terrain._wrap_array(heights[index]) for index in range(len(seeds))]
@@ -0,0 +1,716 @@
+"""Erosion engines working directly on arrays of heights.
+
+(Used by the erosion methods of Terrain; use those instead unless working with raw arrays.)
+
+"""
+
+from exceptions import *
+from rng import make_rng
+import numpy as np
+import multiprocessing
+import multiprocessing.sharedctypes
+import time
+
+
+THERMAL_TRANSFER_RATE = 1.0
+"""float: Fraction of a position's excess height above talus moved to its neighbours per iteration.
+
+The whole excess is moved, as in the original position by position algorithm, to every position
+only one neighbour gives to. All transfers of an iteration are applied together, so a position which
+several neighbours give to at once (e.g. a pit) takes the mean of their transfers rather than their sum.
+It can then never be raised above the height its highest donor had, so heights stay within their original range.
+"""
+
+_VONNEUMANN_OFFSETS = ((0, 1), (-1, 0), (1, 0), (0, -1))
+"""tuple(tuple(int, int)): X-Y offsets of upper, left, right and lower neighbours, as in Terrain."""
+
+ACTIVE_DENSE_FRACTION = 0.25
+"""float: Fraction of positions active above which ActiveThermalErosion processes the whole grid at once.
+
+Processing a few positions by index costs several times more per position than processing all of them by slices,
+so while most positions are active, the whole grid is processed instead (giving the same heights).
+"""
+
+
+class ErosionStats(object):
+    """Summary of a run of an erosion engine."""
+
+    def __init__(self, iterations, residual, active_cells=None, seconds=0.0):
+        """
+
+        Args:
+            iterations (int): Number of iterations performed.
+            residual (float): Largest height transferred in last iteration.
+            active_cells (list[int]): Number of positions processed in each iteration, if engine tracks it.
+            seconds (float): Time taken by iterations, in seconds, not counting starting worker processes.
+
+        """
+        self.iterations = iterations
+        self.residual = residual
+        self.active_cells = active_cells
+        self.seconds = seconds
+
+
+def _neighbour_slices(offset, shape):
+    """Get slices selecting all positions with a neighbour at an offset, and their neighbours.
+
+    Args:
+        offset (tuple(int, int)): X-Y offset of neighbour.
+        shape (tuple(int, int)): Shape of heights array, (length, width).
+
+    Returns:
+        tuple(tuple(slice, slice), tuple(slice, slice)): Index of positions, and index of their neighbours.
+
+    """
+    def axis_slices(delta, size):
+        if delta > 0:
+            return slice(0, size - delta), slice(delta, size)
+        else:
+            return slice(-delta, size), slice(0, size + delta)
+    src_x, dst_x = axis_slices(offset[0], shape[1])
+    src_y, dst_y = axis_slices(offset[1], shape[0])
+    return (src_y, src_x), (dst_y, dst_x)
+
+
+def _sum_directions(transfers, out):
+    """Sum transfers to all neighbours of each position, always adding directions in the same order.
+
+    Args:
+        transfers (np.ndarray): Transfers to each neighbour, indexed by direction first.
+        out (np.ndarray): Array to store sums in.
+
+    Returns:
+        np.ndarray: out.
+
+    """
+    np.add(transfers[0], transfers[1], out=out)
+    for direction in range(2, len(transfers)):
+        out += transfers[direction]
+    return out
+
+
+class ThermalErosion(object):
+    """Thermal erosion of an array of heights, processing all positions together each iteration.
+
+    Each iteration, every position higher than one of its Von Neumann neighbours by more than talus
+    moves THERMAL_TRANSFER_RATE of (largest difference - talus) to its lower neighbours,
+    split in proportion to their height differences. A neighbour several positions give to
+    takes its share divided by the number of them. Total height is conserved.
+
+    """
+
+    def __init__(self, heights, talus):
+        """
+
+        Args:
+            heights (np.ndarray): Float64 array of heights of shape (length, width). Is eroded in place.
+            talus (float): Minimum height difference that will cause height transfer to a neighbour.
+
+        """
+        self.heights = heights
+        self.talus = talus
+        self._slices = [_neighbour_slices(offset, heights.shape) for offset in _VONNEUMANN_OFFSETS]
+        self._transfers = np.empty((len(self._slices),) + heights.shape)
+        """np.ndarray: Height moved from each position to each of its neighbours, in neighbour order."""
+        self._stable = np.empty(self._transfers.shape, dtype=bool)
+        self._total = np.empty(heights.shape)
+        self._scale = np.empty(heights.shape)
+        self._no_transfer = np.empty(heights.shape, dtype=bool)
+        self._donors = np.empty(heights.shape)
+        """np.ndarray: Number of neighbours moving height into each position, at least one."""
+
+    def step(self):
+        """Perform one iteration of thermal erosion.
+
+        Returns:
+            float: Largest height transferred between any two positions.
+
+        """
+        transfers = self._compute_transfers()
+        self._apply(transfers)
+        return float(transfers.max()) if transfers.size else 0.0
+
+    def _compute_transfers(self):
+        """Compute height to move from every position to each of its neighbours, from current heights.
+
+        Returns:
+            np.ndarray: Transfers, indexed by direction then position.
+
+        """
+        heights = self.heights
+        transfers = self._transfers
+        # height differences to each neighbour; positions without that neighbour never transfer
+        transfers.fill(-np.inf)
+        for direction, (src, dst) in enumerate(self._slices):
+            np.subtract(heights[src], heights[dst], out=transfers[direction][src])
+        np.less_equal(transfers, self.talus, out=self._stable)
+        np.putmask(transfers, self._stable, 0)
+        # split rate * (largest difference - talus) between neighbours, in proportion to difference
+        _sum_directions(transfers, self._total)
+        np.max(transfers, axis=0, out=self._scale)
+        np.equal(self._total, 0, out=self._no_transfer)
+        np.putmask(self._total, self._no_transfer, 1)
+        self._scale -= self.talus
+        self._scale *= THERMAL_TRANSFER_RATE
+        self._scale /= self._total
+        np.putmask(self._scale, self._no_transfer, 0)
+        transfers *= self._scale
+        # divide transfers into each position between the neighbours giving to it, if more than one
+        self._donors.fill(0)
+        for direction, (src, dst) in enumerate(self._slices):
+            self._donors[dst] += ~self._stable[direction][src]
+        np.maximum(self._donors, 1, out=self._donors)
+        for direction, (src, dst) in enumerate(self._slices):
+            transfers[direction][src] /= self._donors[dst]
+        return transfers
+
+    def _apply(self, transfers):
+        """Move heights between positions.
+
+        Args:
+            transfers (np.ndarray): Height moved from each position to each of its neighbours, in neighbour order.
+
+        """
+        heights = self.heights
+        heights -= _sum_directions(transfers, self._total)   # total no longer needed by step, reuse as buffer
+        for direction, (src, dst) in enumerate(self._slices):
+            heights[dst] += transfers[direction][src]
+
+
+class ActiveThermalErosion(object):
+    """Thermal erosion of an array of heights, only processing positions which may be unstable.
+
+    Gives exactly the same heights as ThermalErosion, but keeps a set of active positions:
+    a position is only processed again once it or one of its neighbours has changed height.
+    Later iterations therefore cost time in proportion to the eroding front rather than the whole area.
+
+    """
+
+    def __init__(self, heights, talus):
+        """
+
+        Args:
+            heights (np.ndarray): C-contiguous float64 array of heights of shape (length, width). Is eroded in place.
+            talus (float): Minimum height difference that will cause height transfer to a neighbour.
+
+        """
+        self.heights = heights
+        self.talus = talus
+        self._flat_heights = heights.reshape(-1)
+        self._dense = ThermalErosion(heights, talus)
+        """ThermalErosion: Engine used while most positions are active."""
+        self._changed = np.zeros(heights.shape, dtype=bool)
+        self._active_mask = np.zeros(heights.shape, dtype=bool)
+        self._donors = np.empty(heights.size)
+        """np.ndarray: Number of neighbours moving height into each receiving position, at least one."""
+        self._active = None
+        """np.ndarray: Sorted flat indices of positions to process next iteration, or None if all are."""
+
+    @property
+    def active_count(self):
+        """int: Number of positions to be processed next iteration."""
+        return self.heights.size if self._active is None else len(self._active)
+
+    def step(self):
+        """Perform one iteration of thermal erosion on active positions.
+
+        Returns:
+            float: Largest height transferred between any two positions.
+
+        """
+        if self.active_count > ACTIVE_DENSE_FRACTION * self.heights.size:
+            return self._step_dense()
+        else:
+            return self._step_sparse()
+
+    def _step_dense(self):
+        """Perform one iteration on the whole grid, then find positions to process next.
+
+        Returns:
+            float: Largest height transferred between any two positions.
+
+        """
+        residual = self._dense.step()
+        transfers = self._dense._transfers
+        changed = self._changed
+        np.any(transfers != 0, axis=0, out=changed)
+        for direction, (src, dst) in enumerate(self._dense._slices):
+            changed[dst] |= transfers[direction][src] != 0
+        self._set_active(changed)
+        return residual
+
+    def _step_sparse(self):
+        """Perform one iteration on active positions only, then find positions to process next.
+
+        Returns:
+            float: Largest height transferred between any two positions.
+
+        """
+        cells = self._active
+        if len(cells) == 0:
+            return 0.0
+        heights = self._flat_heights
+        length, width = self.heights.shape
+        cells_y, cells_x = cells // width, cells % width
+        directions = len(_VONNEUMANN_OFFSETS)
+        neighbours = np.empty((directions, len(cells)), dtype=cells.dtype)
+        has_neighbour = np.empty((directions, len(cells)), dtype=bool)
+        transfers = np.empty((directions, len(cells)))
+        transfers.fill(-np.inf)
+        # same arithmetic as ThermalErosion.step, on active positions only
+        for direction, (off_x, off_y) in enumerate(_VONNEUMANN_OFFSETS):
+            valid = has_neighbour[direction]
+            np.logical_and((0 <= cells_x + off_x) & (cells_x + off_x < width),
+                           (0 <= cells_y + off_y) & (cells_y + off_y < length), out=valid)
+            np.add(cells, off_y * width + off_x, out=neighbours[direction])
+            transfers[direction][valid] = heights[cells[valid]] - heights[neighbours[direction][valid]]
+        stable = transfers <= self.talus
+        np.putmask(transfers, stable, 0)
+        total = _sum_directions(transfers, np.empty(len(cells)))
+        scale = np.max(transfers, axis=0)
+        no_transfer = total == 0
+        np.putmask(total, no_transfer, 1)
+        scale -= self.talus
+        scale *= THERMAL_TRANSFER_RATE
+        scale /= total
+        np.putmask(scale, no_transfer, 0)
+        transfers *= scale
+        # positions giving height are all active, so their receivers' donors are counted in full
+        donors = self._donors
+        for direction in range(directions):
+            donors[neighbours[direction][has_neighbour[direction]]] = 0
+        for direction in range(directions):
+            valid = has_neighbour[direction]
+            donors[neighbours[direction][valid]] += ~stable[direction][valid]
+        for direction in range(directions):
+            valid = has_neighbour[direction]
+            transfers[direction][valid] /= np.maximum(donors[neighbours[direction][valid]], 1)
+        outflow = _sum_directions(transfers, total)
+        heights[cells] -= outflow
+        changed = [cells[outflow != 0]]
+        for direction in range(directions):
+            valid = has_neighbour[direction]
+            # each position has one neighbour per direction, so receivers are unique
+            receivers = neighbours[direction][valid]
+            inflow = transfers[direction][valid]
+            heights[receivers] += inflow
+            changed.append(receivers[inflow != 0])
+        changed = np.concatenate(changed)
+        if len(changed) * (directions + 1) < ACTIVE_DENSE_FRACTION * self.heights.size:
+            self._active = self._around(changed)
+        else:
+            self._changed.reshape(-1)[changed] = True
+            self._set_active(self._changed)
+        return float(transfers.max())
+
+    def _set_active(self, changed):
+        """Make changed positions and their neighbours the active positions, and clear changed.
+
+        Args:
+            changed (np.ndarray): Boolean array of shape (length, width) marking positions which changed height.
+
+        """
+        active = self._active_mask
+        active[...] = changed
+        for src, dst in self._dense._slices:
+            active[dst] |= changed[src]
+        changed.fill(False)
+        self._active = None if active.all() else np.flatnonzero(active)
+
+    def _around(self, cells):
+        """Get positions and all their Von Neumann neighbours.
+
+        Args:
+            cells (np.ndarray): Flat indices of positions.
+
+        Returns:
+            np.ndarray: Sorted unique flat indices of positions and their neighbours.
+
+        """
+        length, width = self.heights.shape
+        cells_y, cells_x = cells // width, cells % width
+        around = [cells]
+        for off_x, off_y in _VONNEUMANN_OFFSETS:
+            valid = ((0 <= cells_x + off_x) & (cells_x + off_x < width) &
+                     (0 <= cells_y + off_y) & (cells_y + off_y < length))
+            around.append(cells[valid] + (off_y * width + off_x))
+        return np.unique(np.concatenate(around))
+
+
+_worker_state = {}
+"""dict: Shared arrays and talus of a parallel erosion worker process."""
+
+
+def _init_erosion_worker(shared_heights, shared_transfers, shape, talus):
+    """Attach a worker process to the shared arrays of a parallel erosion.
+
+    Args:
+        shared_heights (multiprocessing.RawArray): Heights of whole grid.
+        shared_transfers (multiprocessing.RawArray): Transfers of whole grid, for each direction.
+        shape (tuple(int, int)): Shape of heights, (length, width).
+        talus (float): Minimum height difference that will cause height transfer to a neighbour.
+
+    """
+    _worker_state.clear()
+    _worker_state["heights"] = np.frombuffer(shared_heights, dtype=np.float64).reshape(shape)
+    _worker_state["transfers"] = np.frombuffer(shared_transfers, dtype=np.float64).reshape(
+        (len(_VONNEUMANN_OFFSETS),) + shape)
+    _worker_state["talus"] = talus
+
+
+def _strip_transfers(strip):
+    """Compute transfers from all positions in a strip of rows, and store them in shared transfers.
+
+    Heights are read from the strip plus two rows (halo) either side of it,
+    as transfers depend on heights of Von Neumann neighbours and of the neighbours of those.
+
+    Args:
+        strip (tuple(int, int)): First row of strip, and row after last.
+
+    Returns:
+        float: Largest transfer from any position in strip.
+
+    """
+    start, stop = strip
+    heights = _worker_state["heights"]
+    halo_start, halo_stop = max(start - 2, 0), min(stop + 2, heights.shape[0])
+    # pool may give a strip to any worker, so buffers are made for each strip every iteration
+    engine = ThermalErosion(heights[halo_start:halo_stop], _worker_state["talus"])
+    transfers = engine._compute_transfers()[:, start - halo_start:stop - halo_start]
+    _worker_state["transfers"][:, start:stop] = transfers
+    return float(transfers.max()) if transfers.size else 0.0
+
+
+def _strip_apply(strip):
+    """Move heights into and out of all positions in a strip of rows, using shared transfers.
+
+    Transfers into the strip are read from one row (halo) either side of it.
+    Arithmetic is done in the same order as ThermalErosion._apply, so heights are identical.
+
+    Args:
+        strip (tuple(int, int)): First row of strip, and row after last.
+
+    """
+    start, stop = strip
+    heights = _worker_state["heights"]
+    transfers = _worker_state["transfers"]
+    heights[start:stop] -= _sum_directions(transfers[:, start:stop], np.empty(heights[start:stop].shape))
+    for direction, offset in enumerate(_VONNEUMANN_OFFSETS):
+        (src_y, src_x), (dst_y, dst_x) = _neighbour_slices(offset, heights.shape)
+        # restrict receiving rows to strip
+        row_start, row_stop = max(dst_y.start, start), min(dst_y.stop, stop)
+        if row_start < row_stop:
+            shift = src_y.start - dst_y.start
+            heights[row_start:row_stop, dst_x] += transfers[direction, row_start+shift:row_stop+shift, src_x]
+
+
+class ParallelThermalErosion(object):
+    """Thermal erosion of an array of heights, split into strips of rows processed by a pool of processes.
+
+    Heights and transfers are held in shared memory. Each iteration, every worker computes transfers
+    for its own strip, then (once all have finished) applies transfers into its strip,
+    reading the one row halos of neighbouring strips directly from shared memory.
+    Gives exactly the same heights as ThermalErosion.
+
+    """
+
+    def __init__(self, heights, talus, processes):
+        """
+
+        Args:
+            heights (np.ndarray): Float64 array of heights of shape (length, width).
+                Copied into shared memory; use copy_back() to store results in it.
+            talus (float): Minimum height difference that will cause height transfer to a neighbour.
+            processes (int): Number of worker processes, and of strips.
+
+        """
+        self.heights = heights
+        length = heights.shape[0]
+        shared_heights = multiprocessing.sharedctypes.RawArray("d", heights.size)
+        shared_transfers = multiprocessing.sharedctypes.RawArray("d", len(_VONNEUMANN_OFFSETS) * heights.size)
+        self._shared = np.frombuffer(shared_heights, dtype=np.float64).reshape(heights.shape)
+        self._shared[...] = heights
+        bounds = np.linspace(0, length, min(processes, length) + 1).astype(int)
+        self._strips = [(int(bounds[i]), int(bounds[i+1])) for i in range(len(bounds) - 1)]
+        self._pool = multiprocessing.Pool(len(self._strips), _init_erosion_worker,
+                                          (shared_heights, shared_transfers, heights.shape, talus))
+
+    def step(self):
+        """Perform one iteration of thermal erosion over all strips.
+
+        Returns:
+            float: Largest height transferred between any two positions.
+
+        """
+        residual = max(self._pool.map(_strip_transfers, self._strips))
+        self._pool.map(_strip_apply, self._strips)
+        return residual
+
+    def copy_back(self):
+        """Copy eroded heights from shared memory into original array."""
+        self.heights[...] = self._shared
+
+    def close(self):
+        """Stop worker processes."""
+        self._pool.close()
+        self._pool.join()
+
+
+def thermal_erode(heights, iterations=1, talus=0.5, tol=0.0, active_set=False, processes=1):
+    """Perform thermal erosion upon an array of heights, in place.
+
+    Args:
+        heights (np.ndarray): C-contiguous float64 array of heights of shape (length, width).
+        iterations (int): Maximum number of iterations of thermal erosion to do.
+        talus (float): Minimum height difference that will cause height transfer to a neighbour.
+        tol (float): Stop early once the largest height transferred in an iteration is no more than this.
+        active_set (bool): Whether to only process positions which may be unstable (see ActiveThermalErosion).
+            Gives the same heights, and records number of positions processed per iteration.
+        processes (int): Number of processes to split grid between (see ParallelThermalErosion).
+            Gives the same heights. Cannot be combined with active_set.
+
+    Returns:
+        ErosionStats: Number of iterations performed, largest transfer in the last, time taken,
+            and positions processed per iteration if active_set.
+
+    Raises:
+        InvalidOptionError: Both active_set and more than one process were requested.
+
+    """
+    if active_set and processes > 1:
+        raise InvalidOptionError()
+    active_cells = None
+    if processes > 1 and heights.shape[0] > 1:
+        engine = ParallelThermalErosion(heights, talus, processes)
+    elif active_set:
+        engine = ActiveThermalErosion(heights, talus)
+        active_cells = []
+    else:
+        engine = ThermalErosion(heights, talus)
+    start_time = time.time()
+    try:
+        residual = 0.0
+        performed = iterations
+        for iteration in range(iterations):
+            if active_cells is not None:
+                active_cells.append(engine.active_count)
+            residual = engine.step()
+            if residual <= tol:
+                performed = iteration + 1
+                break
+        # only store heights once all iterations succeed, so a failed worker leaves heights as they were
+        if isinstance(engine, ParallelThermalErosion):
+            engine.copy_back()
+    finally:
+        if isinstance(engine, ParallelThermalErosion):
+            engine.close()
+    return ErosionStats(performed, residual, active_cells, time.time() - start_time)
+
+
+class HydraulicErosionStats(object):
+    """Summary of a run of hydraulic erosion."""
+
+    def __init__(self, droplets, seconds):
+        """
+
+        Args:
+            droplets (int): Number of droplets simulated.
+            seconds (float): Time taken, in seconds.
+
+        """
+        self.droplets = droplets
+        self.seconds = seconds
+
+    @property
+    def droplets_per_second(self):
+        """float: Number of droplets simulated per second."""
+        return self.droplets / self.seconds if self.seconds > 0 else float("inf")
+
+
+class HydraulicErosion(object):
+    """Particle based hydraulic erosion of an array of heights, simulating batches of droplets together.
+
+    Each droplet starts at a random position and flows downhill for up to max_steps steps,
+    following the bilinearly interpolated gradient of the heights with some inertia.
+    A droplet can carry sediment in proportion to its slope, speed and water.
+    It picks up sediment where it carries less than this and deposits sediment where it carries more
+    or flows uphill, spreading either over the four positions around it by bilinear weights.
+    Droplets stop once they leave the grid, taking their sediment with them,
+    or once they stop moving or run out of steps, dropping their sediment where they are.
+
+    All droplets of a batch move a step at a time together, each seeing the heights left by the previous step.
+
+    """
+
+    def __init__(self, heights, inertia=0.05, capacity=4.0, min_slope=0.01, deposition=0.3,
+                 erosion=0.3, evaporation=0.01, gravity=4.0, max_steps=30):
+        """
+
+        Args:
+            heights (np.ndarray): C-contiguous float64 array of heights of shape (length, width). Is eroded in place.
+            inertia (float): Fraction of a droplet's previous direction kept each step, between 0 and 1.
+            capacity (float): Multiplier of sediment a droplet can carry.
+            min_slope (float): Smallest slope used for sediment capacity, so flat ground still erodes.
+            deposition (float): Fraction of excess sediment deposited per step.
+            erosion (float): Fraction of unused capacity picked up per step.
+            evaporation (float): Fraction of water lost per step.
+            gravity (float): Acceleration of droplets going downhill.
+            max_steps (int): Most steps simulated for each droplet.
+
+        """
+        self.heights = heights
+        self.inertia = inertia
+        self.capacity = capacity
+        self.min_slope = min_slope
+        self.deposition = deposition
+        self.erosion = erosion
+        self.evaporation = evaporation
+        self.gravity = gravity
+        self.max_steps = max_steps
+        self._flat_heights = heights.reshape(-1)
+
+    def _corners(self, pos_x, pos_y):
+        """Get flat indices of the four positions around points, and their bilinear weights.
+
+        Args:
+            pos_x (np.ndarray): X coordinates of points, between 0 and width - 1.
+            pos_y (np.ndarray): Y coordinates of points, between 0 and length - 1.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Indices and weights of corners, each of shape (4, points),
+                in order upper left, upper right, lower left, lower right.
+
+        """
+        width = self.heights.shape[1]
+        cell_x = np.minimum(pos_x.astype(np.intp), width - 2)
+        cell_y = np.minimum(pos_y.astype(np.intp), self.heights.shape[0] - 2)
+        frac_x = pos_x - cell_x
+        frac_y = pos_y - cell_y
+        base = cell_y * width + cell_x
+        indices = np.array([base, base + 1, base + width, base + width + 1])
+        weights = np.array([(1 - frac_x) * (1 - frac_y), frac_x * (1 - frac_y),
+                            (1 - frac_x) * frac_y, frac_x * frac_y])
+        return indices, weights
+
+    def _sample(self, pos_x, pos_y):
+        """Get bilinearly interpolated heights and gradients at points.
+
+        Args:
+            pos_x (np.ndarray): X coordinates of points, between 0 and width - 1.
+            pos_y (np.ndarray): Y coordinates of points, between 0 and length - 1.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray, np.ndarray): Heights, x gradients and y gradients at points.
+
+        """
+        indices, weights = self._corners(pos_x, pos_y)
+        h00, h10, h01, h11 = self._flat_heights[indices]
+        frac_x = weights[1] + weights[3]
+        frac_y = weights[2] + weights[3]
+        grad_x = (h10 - h00) * (1 - frac_y) + (h11 - h01) * frac_y
+        grad_y = (h01 - h00) * (1 - frac_x) + (h11 - h10) * frac_x
+        return (weights * [h00, h10, h01, h11]).sum(axis=0), grad_x, grad_y
+
+    def _update_speed(self, speed, height_change):
+        """Get speeds of droplets after moving, accelerating downhill and slowing uphill.
+
+        Args:
+            speed (np.ndarray): Speeds of droplets before moving.
+            height_change (np.ndarray): Change in height of each droplet when moving; negative going downhill.
+
+        Returns:
+            np.ndarray: New speeds of droplets, never negative.
+
+        """
+        return np.sqrt(np.maximum(speed ** 2 - height_change * self.gravity, 0))
+
+    def simulate(self, pos_x, pos_y):
+        """Simulate a batch of droplets from their starting positions until all have stopped.
+
+        Args:
+            pos_x (np.ndarray): Starting x coordinates of droplets, between 0 and width - 1.
+            pos_y (np.ndarray): Starting y coordinates of droplets, between 0 and length - 1.
+
+        """
+        length, width = self.heights.shape
+        if width < 2 or length < 2:
+            return
+        dir_x = np.zeros(len(pos_x))
+        dir_y = np.zeros(len(pos_x))
+        speed = np.ones(len(pos_x))
+        water = np.ones(len(pos_x))
+        sediment = np.zeros(len(pos_x))
+        for _ in range(self.max_steps):
+            if len(pos_x) == 0:
+                break
+            height, grad_x, grad_y = self._sample(pos_x, pos_y)
+            dir_x = dir_x * self.inertia - grad_x * (1 - self.inertia)
+            dir_y = dir_y * self.inertia - grad_y * (1 - self.inertia)
+            dir_len = np.hypot(dir_x, dir_y)
+            moving = dir_len > 0
+            dir_len[~moving] = 1
+            dir_x /= dir_len
+            dir_y /= dir_len
+            new_x = pos_x + dir_x
+            new_y = pos_y + dir_y
+            inside = (0 <= new_x) & (new_x <= width - 1) & (0 <= new_y) & (new_y <= length - 1)
+            # droplets leaving the grid take their sediment with them; stopped droplets drop it
+            self._deposit(pos_x[~moving], pos_y[~moving], sediment[~moving])
+            inside &= moving
+            pos_x, pos_y, new_x, new_y = pos_x[inside], pos_y[inside], new_x[inside], new_y[inside]
+            dir_x, dir_y, height = dir_x[inside], dir_y[inside], height[inside]
+            speed, water, sediment = speed[inside], water[inside], sediment[inside]
+            height_change = self._sample(new_x, new_y)[0] - height
+            capacity = np.maximum(-height_change, self.min_slope) * speed * water * self.capacity
+            depositing = (sediment > capacity) | (height_change > 0)
+            amount = np.where(height_change > 0, np.minimum(height_change, sediment),
+                              (sediment - capacity) * self.deposition)
+            picked_up = np.minimum((capacity - sediment) * self.erosion, -height_change)
+            amount = np.where(depositing, amount, -picked_up)     # > 0 for deposits, < 0 for pick ups
+            sediment -= amount
+            self._deposit(pos_x, pos_y, amount)
+            speed = self._update_speed(speed, height_change)
+            water *= 1 - self.evaporation
+            pos_x, pos_y = new_x, new_y
+        self._deposit(pos_x, pos_y, sediment)
+
+    def _deposit(self, pos_x, pos_y, amount):
+        """Add heights around points, spread over the four positions around each by bilinear weights.
+
+        Args:
+            pos_x (np.ndarray): X coordinates of points, between 0 and width - 1.
+            pos_y (np.ndarray): Y coordinates of points, between 0 and length - 1.
+            amount (np.ndarray): Height to add around each point; negative to remove height.
+
+        """
+        if len(amount):
+            indices, weights = self._corners(pos_x, pos_y)
+            np.add.at(self._flat_heights, indices.ravel(), (weights * amount).ravel())
+
+
+def hydraulic_erode(heights, droplets=100000, seed=None, batch_size=10000, **params):
+    """Perform particle based hydraulic erosion upon an array of heights, in place.
+
+    Heights are clipped to between 0 and 1 afterwards.
+
+    Args:
+        heights (np.ndarray): C-contiguous float64 array of heights of shape (length, width).
+        droplets (int): Number of droplets to simulate.
+        seed (int): Seed for droplet starting positions. If None, drawn from the random module.
+        batch_size (int): Number of droplets simulated together. Results depend on this as well as seed.
+        **params: Further parameters of HydraulicErosion.
+
+    Returns:
+        HydraulicErosionStats: Number of droplets simulated, and time taken.
+
+    """
+    start_time = time.time()
+    engine = HydraulicErosion(heights, **params)
+    rng = make_rng(seed)
+    length, width = heights.shape
+    for batch_start in range(0, droplets, batch_size):
+        batch = min(batch_size, droplets - batch_start)
+        pos_x, pos_y = rng.random_sample((2, batch))
+        engine.simulate(pos_x * (width - 1), pos_y * (length - 1))
+    np.clip(heights, 0, 1, out=heights)
+    return HydraulicErosionStats(droplets, time.time() - start_time)
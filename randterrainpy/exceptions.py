@@ -29,3 +29,8 @@ class InvalidCoefficientCountError(Error):
 class InvalidFileFormatError(Error):
     """Error raised when .terr file is not of valid format."""
     pass
+
+
+class InvalidOptionError(Error):
+    """Error raised when an unrecognised mode or policy name is given."""
+    pass
@@ -0,0 +1,96 @@
+"""Sources of random numbers for generators and erosion."""
+
+import numpy as np
+import random
+
+
+def make_rng(seed=None):
+    """Make a numpy random state to draw batches of random numbers from.
+
+    Args:
+        seed (int): Seed between 0 and 2**32 - 1. If None, a seed is drawn from the random module,
+            so random.seed() still makes results reproducible.
+
+    Returns:
+        np.random.RandomState: New random state.
+
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    return np.random.RandomState(seed)
+
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _splitmix64(value):
+    """Mix the bits of a 64 bit integer (the output function of splitmix64).
+
+    Args:
+        value (int): Integer between 0 and 2**64 - 1.
+
+    Returns:
+        int: Mixed integer between 0 and 2**64 - 1.
+
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return value ^ (value >> 31)
+
+
+def derive_seed(seed, *keys):
+    """Derive a seed for one part of a larger random structure, e.g. one tile of a world.
+
+    The same seed and keys always give the same derived seed, so parts can be made in any order.
+
+    Args:
+        seed (int): Seed of whole structure.
+        *keys (int): Integers identifying the part, which may be negative.
+
+    Returns:
+        int: Seed between 0 and 2**32 - 1, to pass to make_rng.
+
+    """
+    value = _splitmix64(seed & _MASK_64)
+    for key in keys:
+        value = _splitmix64(value ^ (key & _MASK_64))
+    return value >> 32
+
+
+def _splitmix64_array(values):
+    """Mix the bits of each of an array of 64 bit integers, as _splitmix64 does.
+
+    Args:
+        values (np.ndarray): Array of dtype uint64.
+
+    Returns:
+        np.ndarray: Array of mixed integers, of dtype uint64.
+
+    """
+    # wrapping around is intended, but numpy warns of it for scalars
+    with np.errstate(over="ignore"):
+        values = values + np.uint64(0x9E3779B97F4A7C15)
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def hash_keys(seed, *keys):
+    """Hash a seed with arrays of keys, e.g. to give each point of an unbounded lattice its own random value.
+
+    Uses the same hash as derive_seed, but keeps all 64 bits,
+    so derive_seed(seed, *keys) == hash_keys(seed, *keys) >> np.uint64(32).
+
+    Args:
+        seed (int): Seed of whole structure.
+        *keys (np.ndarray): Integer arrays identifying parts, broadcastable together. May be negative.
+
+    Returns:
+        np.ndarray: Hashes of dtype uint64, of shape of keys broadcast together.
+
+    """
+    values = _splitmix64_array(np.uint64(seed & _MASK_64))
+    for key in keys:
+        values = _splitmix64_array(values ^ np.asarray(key, dtype=np.int64).astype(np.uint64))
+    return values
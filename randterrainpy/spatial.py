@@ -0,0 +1,328 @@
+"""Spatial indexing of seed points, for nearest seed searches over a grid of positions,
+and random placement of seed points.
+
+(Used by VoronoiTerrain; use that instead unless working with raw arrays.)
+
+"""
+
+from rng import make_rng
+import numpy as np
+import math
+
+
+class SeedGrid(object):
+    """Bucket grid of seed points over a width by length grid of positions.
+
+    Seeds are sorted into square buckets of positions, so that finding the seeds near a position
+    only needs to look at the buckets around it. Seeds outside the grid are kept in the nearest edge bucket.
+
+    """
+
+    def __init__(self, points, width, length, bucket_size=None):
+        """
+
+        Args:
+            points (list[tuple(float, float)]): X-Y coordinates of seed points.
+            width (int): Width of grid of positions.
+            length (int): Length of grid of positions.
+            bucket_size (int): Side length of buckets, in positions. If None, chosen to hold a few seeds each.
+
+        """
+        self.points = np.array(points, dtype=np.float64).reshape(-1, 2)
+        self.width = width
+        self.length = length
+        if bucket_size is None:
+            bucket_size = int(2 * math.sqrt(width * length / float(max(len(self.points), 1))))
+        self.bucket_size = max(bucket_size, 4)
+        self.buckets_x = max(-(-width // self.bucket_size), 1)
+        self.buckets_y = max(-(-length // self.bucket_size), 1)
+        bucket_x = np.clip(np.floor(self.points[:, 0] / self.bucket_size), 0, self.buckets_x - 1).astype(np.intp)
+        bucket_y = np.clip(np.floor(self.points[:, 1] / self.bucket_size), 0, self.buckets_y - 1).astype(np.intp)
+        buckets = bucket_y * self.buckets_x + bucket_x
+        self._order = np.argsort(buckets, kind="mergesort")
+        """np.ndarray: Indices of seeds, sorted by bucket then index."""
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(buckets, minlength=self.buckets_x * self.buckets_y))))
+        """np.ndarray: Position in _order of first seed of each bucket, and of end of seeds."""
+
+    def seeds_near(self, bucket_x, bucket_y, rings):
+        """Get all seeds in buckets within a number of rings of a bucket.
+
+        Args:
+            bucket_x (int): X index of central bucket.
+            bucket_y (int): Y index of central bucket.
+            rings (int): Number of rings of buckets around central bucket to include.
+
+        Returns:
+            np.ndarray: Sorted indices of seeds.
+
+        """
+        min_x, max_x = max(bucket_x - rings, 0), min(bucket_x + rings, self.buckets_x - 1)
+        min_y, max_y = max(bucket_y - rings, 0), min(bucket_y + rings, self.buckets_y - 1)
+        parts = [self._order[self._offsets[row * self.buckets_x + min_x]:self._offsets[row * self.buckets_x + max_x + 1]]
+                 for row in range(min_y, max_y + 1)]
+        return np.sort(np.concatenate(parts))
+
+    def nearest(self, xs, ys, bucket_x, bucket_y):
+        """Find nearest seed to positions, all within one bucket.
+
+        Ties go to the seed of lowest index.
+
+        Args:
+            xs (np.ndarray): X coordinates of positions.
+            ys (np.ndarray): Y coordinates of positions.
+            bucket_x (int): X index of bucket containing all positions.
+            bucket_y (int): Y index of bucket containing all positions.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Index of nearest seed, and its squared distance, for each position.
+                Index is -1 if there are no seeds.
+
+        """
+        if len(self.points) == 0:
+            return np.full(len(xs), -1, dtype=np.intp), np.full(len(xs), np.inf)
+        all_rings = max(self.buckets_x, self.buckets_y)
+        rings = 0
+        while True:
+            seeds = self.seeds_near(bucket_x, bucket_y, rings)
+            if len(seeds) > 0:
+                dist_squared = ((self.points[seeds, 0] - xs[:, np.newaxis]) ** 2 +
+                                (self.points[seeds, 1] - ys[:, np.newaxis]) ** 2)
+                closest = np.argmin(dist_squared, axis=1)   # first of equals, so lowest seed index
+                closest_dist = dist_squared[np.arange(len(xs)), closest]
+                # seeds beyond these rings are more than rings * bucket_size away, so cannot be as close
+                if rings >= all_rings or closest_dist.max() <= (rings * self.bucket_size) ** 2:
+                    return seeds[closest], closest_dist
+            rings += 1
+
+
+def nearest_seed_map(points, width, length):
+    """Find nearest seed point to every position in a grid.
+
+    Gives the same result as comparing every position with every seed in order:
+    ties go to the seed of lowest index, and a position is given seed 0
+    if no seed is closer than width**2 + length**2 squared distance.
+
+    Args:
+        points (list[tuple(float, float)]): X-Y coordinates of seed points.
+        width (int): Width of grid.
+        length (int): Length of grid.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Index of nearest seed as int32, and squared distance to it,
+            each of shape (length, width).
+
+    """
+    labels = np.zeros((length, width), dtype=np.int32)
+    dist_squared = np.zeros((length, width))
+    grid = SeedGrid(points, width, length)
+    size = grid.bucket_size
+    for bucket_y in range(grid.buckets_y):
+        for bucket_x in range(grid.buckets_x):
+            tile = (slice(bucket_y * size, min((bucket_y + 1) * size, length)),
+                    slice(bucket_x * size, min((bucket_x + 1) * size, width)))
+            tile_ys, tile_xs = np.mgrid[tile]
+            seeds, dists = grid.nearest(tile_xs.ravel().astype(np.float64), tile_ys.ravel().astype(np.float64),
+                                        bucket_x, bucket_y)
+            labels[tile] = seeds.reshape(tile_xs.shape)
+            dist_squared[tile] = dists.reshape(tile_xs.shape)
+    too_far = dist_squared >= width ** 2 + length ** 2
+    labels[too_far] = 0
+    return labels, dist_squared
+
+
+def nearest_seeds(points, xs, ys, width, length, exclude=None):
+    """Find nearest seed point to some positions in a grid.
+
+    Follows the same rules as nearest_seed_map, but only looks at the given positions.
+
+    Args:
+        points (list[tuple(float, float)]): X-Y coordinates of seed points.
+        xs (np.ndarray): X coordinates of positions, between 0 and width - 1.
+        ys (np.ndarray): Y coordinates of positions, between 0 and length - 1.
+        width (int): Width of grid.
+        length (int): Length of grid.
+        exclude (int): Index of a seed to ignore, if any.
+
+    Returns:
+        tuple(np.ndarray, np.ndarray): Index of nearest seed as int32, and squared distance to it, for each position.
+
+    """
+    points = np.array(points, dtype=np.float64).reshape(-1, 2)
+    if exclude is not None:
+        points[exclude] = np.inf    # never closest, but keeps indices of other seeds
+    labels = np.zeros(len(xs), dtype=np.int32)
+    dist_squared = np.full(len(xs), np.inf)
+    if len(xs) == 0:
+        return labels, dist_squared
+    grid = SeedGrid(points, width, length)
+    buckets = (ys // grid.bucket_size) * grid.buckets_x + xs // grid.bucket_size
+    order = np.argsort(buckets, kind="mergesort")
+    bucket_ids, starts = np.unique(buckets[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+    for bucket, start, end in zip(bucket_ids.tolist(), starts.tolist(), ends.tolist()):
+        group = order[start:end]
+        seeds, dists = grid.nearest(xs[group].astype(np.float64), ys[group].astype(np.float64),
+                                    bucket % grid.buckets_x, bucket // grid.buckets_x)
+        labels[group] = seeds
+        dist_squared[group] = dists
+    labels[dist_squared >= width ** 2 + length ** 2] = 0
+    return labels, dist_squared
+
+
+class RegionStats(object):
+    """Summary of heights within each region of a diagram.
+
+    Each attribute is an array with one element per region; mean, min and max are nan for empty regions.
+
+    """
+
+    def __init__(self, area, mean, min, max):
+        """
+
+        Args:
+            area (np.ndarray): Number of positions in each region.
+            mean (np.ndarray): Mean height of each region.
+            min (np.ndarray): Lowest height in each region.
+            max (np.ndarray): Highest height in each region.
+
+        """
+        self.area = area
+        self.mean = mean
+        self.min = min
+        self.max = max
+
+
+def region_stats(values, cells, offsets):
+    """Summarise values within regions, given positions of each region.
+
+    Args:
+        values (np.ndarray): Value at each position, flattened.
+        cells (np.ndarray): Indices into values, grouped by region.
+        offsets (np.ndarray): Start of each region's group in cells, plus end of last group.
+
+    Returns:
+        RegionStats: Area, mean, min and max of values in each region.
+
+    """
+    area = np.diff(offsets)
+    grouped = values[cells]
+    filled = area > 0
+    starts = offsets[:-1][filled]
+    mean, low, high = (np.full(len(area), np.nan) for _ in range(3))
+    if filled.any():
+        mean[filled] = np.add.reduceat(grouped, starts) / area[filled]
+        low[filled] = np.minimum.reduceat(grouped, starts)
+        high[filled] = np.maximum.reduceat(grouped, starts)
+    return RegionStats(area, mean, low, high)
+
+
+def uniform_points(width, length, num_points, seed=None):
+    """Pick distinct positions on a grid uniformly at random.
+
+    Candidates are drawn in batches and checked against a grid of taken positions,
+    or, when most positions are wanted, taken from a random permutation of all positions.
+
+    Args:
+        width (int): Width of grid.
+        length (int): Length of grid.
+        num_points (int): Number of positions to pick.
+        seed (int): Seed for positions. If None, drawn from the random module.
+
+    Returns:
+        list[tuple(int, int)]: X-Y coordinates of positions, in order picked.
+
+    Raises:
+        ValueError: num_points is more than the number of positions on grid.
+
+    """
+    area = width * length
+    if num_points > area:
+        raise ValueError("cannot pick more distinct positions than are on grid")
+    rng = make_rng(seed)
+    if 2 * num_points > area:
+        cells = rng.permutation(area)[:num_points]
+    else:
+        taken = np.zeros(area, dtype=bool)
+        picked = []
+        needed = num_points
+        while needed > 0:
+            batch = rng.randint(0, area, needed + needed // 4 + 16)
+            _, first = np.unique(batch, return_index=True)
+            batch = batch[np.sort(first)]
+            batch = batch[~taken[batch]][:needed]
+            taken[batch] = True
+            picked.append(batch)
+            needed -= len(batch)
+        cells = np.concatenate(picked) if picked else np.zeros(0, dtype=np.intp)
+    return list(zip((cells % width).tolist(), (cells // width).tolist()))
+
+
+def poisson_disk_points(width, length, min_dist, num_points=None, seed=None, attempts=30):
+    """Pick positions on a grid at random, no two closer than a minimum distance.
+
+    Uses Bridson's algorithm: new positions are tried around already picked ones
+    until none have room around them, with a background grid holding at most one position per cell
+    so each check only looks at nearby positions.
+
+    Args:
+        width (int): Width of grid.
+        length (int): Length of grid.
+        min_dist (float): Minimum distance between positions. Must be > 0.
+        num_points (int): Number of positions to pick. If None, or more than fit, as many as fit.
+        seed (int): Seed for positions. If None, drawn from the random module.
+        attempts (int): Number of positions tried around each picked position before giving up on it.
+
+    Returns:
+        list[tuple(int, int)]: X-Y coordinates of positions.
+
+    Raises:
+        ValueError: min_dist is not > 0.
+
+    References:
+        Fast Poisson Disk Sampling in Arbitrary Dimensions: Robert Bridson
+        [https://www.cs.ubc.ca/~rbridson/docs/bridson-siggraph07-poissondisk.pdf]
+
+    """
+    if not min_dist > 0:
+        raise ValueError("minimum distance must be positive")
+    rng = make_rng(seed)
+    if width * length == 0 or num_points == 0:
+        return []
+    cell_size = min_dist / math.sqrt(2)
+    cells_x, cells_y = int(math.ceil(width / cell_size)), int(math.ceil(length / cell_size))
+    grid = np.full((cells_y + 4, cells_x + 4), -1, dtype=np.intp)    # 2 empty cells of padding around edges
+    points = np.zeros((min(cells_x * cells_y, width * length), 2), dtype=np.intp)
+    grid_offsets = np.mgrid[-2:3, -2:3].reshape(2, -1)
+
+    def add_point(index, x, y):
+        points[index] = x, y
+        grid[int(y / cell_size) + 2, int(x / cell_size) + 2] = index
+
+    add_point(0, rng.randint(width), rng.randint(length))
+    count = 1
+    active = [0]
+    while active:
+        slot = rng.randint(len(active))
+        x, y = points[active[slot]]
+        # candidates in ring between min_dist and twice that, rounded to positions on grid
+        radius = min_dist * np.sqrt(rng.uniform(1, 4, attempts))
+        angle = rng.uniform(0, 2 * math.pi, attempts)
+        xs, ys = np.round(x + radius * np.cos(angle)).astype(np.intp), np.round(y + radius * np.sin(angle)).astype(np.intp)
+        on_grid = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < length)
+        xs, ys = xs[on_grid], ys[on_grid]
+        near = grid[(ys / cell_size).astype(np.intp) + 2 + grid_offsets[0][:, np.newaxis],
+                    (xs / cell_size).astype(np.intp) + 2 + grid_offsets[1][:, np.newaxis]]
+        near_points = points[near]
+        dist_squared = (near_points[..., 0] - xs) ** 2 + (near_points[..., 1] - ys) ** 2
+        fits = np.flatnonzero(((dist_squared >= min_dist ** 2) | (near < 0)).all(axis=0))
+        if len(fits):
+            add_point(count, xs[fits[0]], ys[fits[0]])
+            active.append(count)
+            count += 1
+        else:
+            active[slot] = active[-1]
+            active.pop()
+    picked = points[:count]
+    if num_points is not None and num_points < count:
+        picked = picked[np.sort(rng.permutation(count)[:num_points])]
+    return list(zip(picked[:, 0].tolist(), picked[:, 1].tolist()))
@@ -3,6 +3,11 @@
 import copy
 from exceptions import *
 from terraindisplay import *
+import terrainio
+import erosion
+import spatial
+from rng import make_rng
+import numpy as np
 import random
 import math
 import os
@@ -11,6 +16,13 @@ import os
 class Terrain(object):
     """Container for a randomly generated area of terrain."""
 
+    CLAMP = "clamp"
+    """Out of bounds policy: heights above 1 or below 0 are set to 1 or 0."""
+    RAISE = "raise"
+    """Out of bounds policy: heights above 1 or below 0 raise HeightOutOfBoundsError."""
+    RESCALE = "rescale"
+    """Out of bounds policy: all heights are linearly rescaled so that the lowest and highest fit in 0 and 1."""
+
     def __init__(self, width, length):
         """Initializer for Terrain.
 
@@ -21,8 +33,70 @@ class Terrain(object):
         """
         self._width = width
         self._length = length
-        self._height_map = [[0 for _ in range(self.width)] for _ in range(self.length)]
-        """List[list[float]]: Map of heights of all points in terrain grid."""
+        self._height_map = np.zeros((self.length, self.width), dtype=np.float64)
+        """np.ndarray: Map of heights of all points in terrain grid, indexed [y, x]."""
+        self._heights_version = 0
+        """int: Number of times heights have been changed, so values derived from them know when to update."""
+
+    @classmethod
+    def from_array(cls, heights, copy=False):
+        """Make a Terrain from a 2D array of heights.
+
+        Args:
+            heights (np.ndarray): Array of heights of shape (length, width), all between 0 and 1.
+            copy (bool): Whether to copy heights. If False, heights is used as the terrain's own storage
+                whenever it is already a C-contiguous float64 array, so changes to either are seen by both.
+
+        Returns:
+            Terrain: Terrain with given heights.
+
+        Raises:
+            InvalidDimensionsError: Heights is not 2-dimensional.
+            HeightOutOfBoundsError: Some height is not between 0 and 1.
+
+        """
+        if copy:
+            heights = np.array(heights, dtype=np.float64, order="C")
+        else:
+            heights = np.require(heights, dtype=np.float64, requirements="C")
+        if heights.ndim != 2:
+            raise InvalidDimensionsError()
+        if heights.size > 0 and not (0 <= heights.min() and heights.max() <= 1):
+            raise HeightOutOfBoundsError()
+        return cls._wrap_array(heights)
+
+    @classmethod
+    def _wrap_array(cls, heights):
+        """Make a Terrain using an array as its storage, without checking it.
+
+        Args:
+            heights (np.ndarray): C-contiguous float64 array of heights of shape (length, width).
+
+        Returns:
+            Terrain: Terrain backed by heights.
+
+        """
+        terr = cls.__new__(cls)
+        terr._length, terr._width = heights.shape
+        terr._height_map = heights
+        terr._heights_version = 0
+        return terr
+
+    def as_array(self):
+        """Get the array of heights backing self, without copying.
+
+        Changes to the returned array alter the terrain, and heights written to it must stay between 0 and 1.
+        Call heights_changed() after changing it, so values derived from heights are updated.
+
+        Returns:
+            np.ndarray: Array of heights of shape (length, width), indexed [y, x].
+
+        """
+        return self._height_map
+
+    def heights_changed(self):
+        """Note that heights were changed other than through methods of self, e.g. through as_array()."""
+        self._heights_version += 1
 
     @property
     def width(self):
@@ -46,7 +120,7 @@ class Terrain(object):
             float: Height of terrain at coordinates, between 0 and 1.
 
         """
-        return self._height_map[item[1] % self.length][item[0] % self.width]
+        return self._height_map[item[1] % self.length, item[0] % self.width]
 
     def __setitem__(self, key, value):
         """Set the height of an item, bounded within 0 and 1.
@@ -61,7 +135,8 @@ class Terrain(object):
         """
         if not 0 <= round(value, 3) <= 1:
             raise HeightOutOfBoundsError()
-        self._height_map[key[1] % self.length][key[0] % self.width] = round(value, 3)
+        self._height_map[key[1] % self.length, key[0] % self.width] = round(value, 3)
+        self._heights_version += 1
 
     def __eq__(self, other):
         """Test equality, element by element.
@@ -75,7 +150,154 @@ class Terrain(object):
         elif not (other.width == self.width and other.length == self.length):
             return False
         else:
-            return all(self[x, y] == other[x, y] for x in range(self.width) for y in range(self.length))
+            return bool(np.array_equal(self._height_map, other._height_map))
+
+    @classmethod
+    def _check_policy(cls, out_of_bounds):
+        """Check that an out of bounds policy is valid.
+
+        Args:
+            out_of_bounds (str): Policy to check.
+
+        Raises:
+            InvalidOptionError: Policy is not one of CLAMP, RAISE or RESCALE.
+
+        """
+        if out_of_bounds not in (cls.CLAMP, cls.RAISE, cls.RESCALE):
+            raise InvalidOptionError()
+
+    @classmethod
+    def _bound_heights(cls, heights, out_of_bounds):
+        """Apply an out of bounds policy to an array of heights, in place.
+
+        Args:
+            heights (np.ndarray): Array of heights to bound.
+            out_of_bounds (str): One of CLAMP, RAISE or RESCALE.
+
+        Returns:
+            np.ndarray: heights, with all values between 0 and 1.
+
+        Raises:
+            HeightOutOfBoundsError: Some height is not between 0 and 1 and out_of_bounds is RAISE.
+
+        """
+        if heights.size == 0:
+            return heights
+        low, high = heights.min(), heights.max()
+        if 0 <= low and high <= 1:
+            return heights
+        if out_of_bounds == cls.CLAMP:
+            np.clip(heights, 0, 1, out=heights)
+        elif out_of_bounds == cls.RESCALE:
+            low, high = min(low, 0), max(high, 1)
+            heights -= low
+            heights /= float(high - low)
+        else:
+            raise HeightOutOfBoundsError()
+        return heights
+
+    def _apply(self, operation, operand, out_of_bounds, in_place):
+        """Apply an element-wise operation to heights of self, then bound the result.
+
+        Args:
+            operation (np.ufunc): Binary ufunc taking heights of self and operand.
+            operand (np.ndarray | float): Second argument of operation.
+            out_of_bounds (str): One of CLAMP, RAISE or RESCALE.
+            in_place (bool): Whether to store result in self, or in a new Terrain.
+
+        Returns:
+            Terrain: self if in_place, new Terrain otherwise.
+
+        Raises:
+            HeightOutOfBoundsError: Result is not between 0 and 1 and out_of_bounds is RAISE.
+                Self is left unaltered in this case.
+
+        """
+        self._check_policy(out_of_bounds)
+        if in_place and out_of_bounds != Terrain.RAISE:
+            # safe to work directly in own buffer, as bounding cannot fail halfway
+            self._bound_heights(operation(self._height_map, operand, out=self._height_map), out_of_bounds)
+            self._heights_version += 1
+            return self
+        heights = self._bound_heights(operation(self._height_map, operand), out_of_bounds)
+        if in_place:
+            self._height_map[...] = heights
+            self._heights_version += 1
+            return self
+        return Terrain._wrap_array(heights)
+
+    def _other_heights(self, other):
+        """Get heights of another Terrain to combine with self.
+
+        Args:
+            other (Terrain): Terrain to combine with self. Must have same dimensions as self.
+
+        Returns:
+            np.ndarray: Array of heights of other.
+
+        Raises:
+            InvalidDimensionsError: Other and self have different widths and lengths.
+
+        """
+        if other.length != self.length or other.width != self.width:
+            raise InvalidDimensionsError()
+        return other._height_map
+
+    def add(self, other, out_of_bounds=CLAMP, in_place=False):
+        """Add two terrains, height by height.
+
+        Args:
+            other (Terrain): Other terrain to add self to. Must have same dimensions as self.
+            out_of_bounds (str): Policy for sums outside 0 and 1; one of CLAMP, RAISE or RESCALE.
+            in_place (bool): Whether to store result in self rather than a new Terrain.
+
+        Returns:
+            Terrain: Terrain of heights of self and other added together.
+
+        Raises:
+            InvalidDimensionsError: Other and self have different widths and lengths.
+            HeightOutOfBoundsError: A sum is above 1 and out_of_bounds is RAISE.
+            InvalidOptionError: out_of_bounds is not a valid policy.
+
+        """
+        return self._apply(np.add, self._other_heights(other), out_of_bounds, in_place)
+
+    def sub(self, other, out_of_bounds=CLAMP, in_place=False):
+        """Subtract two terrains, height by height.
+
+        Args:
+            other (Terrain): Other terrain to subtract from self. Must have same dimensions as self.
+            out_of_bounds (str): Policy for differences outside 0 and 1; one of CLAMP, RAISE or RESCALE.
+            in_place (bool): Whether to store result in self rather than a new Terrain.
+
+        Returns:
+            Terrain: Terrain of heights of other subtracted from self.
+
+        Raises:
+            InvalidDimensionsError: Other and self have different widths and lengths.
+            HeightOutOfBoundsError: A difference is below 0 and out_of_bounds is RAISE.
+            InvalidOptionError: out_of_bounds is not a valid policy.
+
+        """
+        return self._apply(np.subtract, self._other_heights(other), out_of_bounds, in_place)
+
+    def mul(self, other, out_of_bounds=RAISE, in_place=False):
+        """Multiply self with scalar, height by height.
+
+        Args:
+            other (float): Scalar to scale self by.
+            out_of_bounds (str): Policy for products outside 0 and 1; one of CLAMP, RAISE or RESCALE.
+            in_place (bool): Whether to store result in self rather than a new Terrain.
+
+        Returns:
+            Terrain: Terrain of heights of self multiplied by other.
+
+        Raises:
+            HeightOutOfBoundsError: A product is not between 0 and 1 and out_of_bounds is RAISE.
+            InvalidOptionError: out_of_bounds is not a valid policy.
+
+        """
+        return self._apply(np.multiply, float(other), out_of_bounds, in_place)
 
     def __add__(self, other):
         """Add two terrains, height by height. Maximum value of element is 1.
@@ -90,36 +312,52 @@ class Terrain(object):
             InvalidDimensionsError: Other and self have different widths and lengths.
 
         """
-        if other.length != self.length or other.width != self.width:
-            raise InvalidDimensionsError()
-        result = Terrain(self.width, self.length)
-        for i in range(self.width):
-            for j in range(self.length):
-                val = self[i, j] + other[i, j]
-                result[i, j] = 1 if val > 1 else val
-        return result
+        return self.add(other)
+
+    def __iadd__(self, other):
+        """Add another terrain to self in place, height by height. Maximum value of element is 1.
+
+        Args:
+            other (Terrain): Other terrain to add to self. Must have same dimensions as self.
+
+        Returns:
+            Terrain: self, with heights of other added.
+
+        Raises:
+            InvalidDimensionsError: Other and self have different widths and lengths.
+
+        """
+        return self.add(other, in_place=True)
 
     def __sub__(self, other):
         """Subtract two terrains, height by height. Minimum value of element is 0.
 
         Args:
-            other (Terrain): Other terrain to subtract self from. Must have same dimensions as self.
+            other (Terrain): Other terrain to subtract from self. Must have same dimensions as self.
 
         Returns:
-            Terrain: Terrain of heights of self subtracted from other.
+            Terrain: Terrain of heights of other subtracted from self.
 
         Raises:
             InvalidDimensionsError: Other and self have different widths and lengths.
 
         """
-        if other.length != self.length or other.width != self.width:
-            raise InvalidDimensionsError()
-        result = Terrain(self.width, self.length)
-        for i in range(self.width):
-            for j in range(self.length):
-                val = self[i, j] - other[i, j]
-                result[i, j] = 0 if val < 0 else val
-        return result
+        return self.sub(other)
+
+    def __isub__(self, other):
+        """Subtract another terrain from self in place, height by height. Minimum value of element is 0.
+
+        Args:
+            other (Terrain): Other terrain to subtract from self. Must have same dimensions as self.
+
+        Returns:
+            Terrain: self, with heights of other subtracted.
+
+        Raises:
+            InvalidDimensionsError: Other and self have different widths and lengths.
+
+        """
+        return self.sub(other, in_place=True)
 
     def __mul__(self, other):
         """Multiply self with scalar; scales all values down by scalar, bounded by 0 and 1.
@@ -130,15 +368,26 @@ class Terrain(object):
         Returns:
             Terrain: Terrain of heights of self multiplied by other.
 
+        Raises:
+            HeightOutOfBoundsError: A product is not between 0 and 1.
+
+        """
+        return self.mul(other)
+
+    def __imul__(self, other):
+        """Multiply self with scalar in place.
+
+        Args:
+            other (float): Scalar to scale self by.
+
+        Returns:
+            Terrain: self, with heights multiplied by other.
+
+        Raises:
+            HeightOutOfBoundsError: A product is not between 0 and 1. Self is left unaltered in this case.
+
         """
-        result = Terrain(self.width, self.length)
-        for i in range(self.width):
-            for j in range(self.length):
-                val = self[i, j] * other
-                if not 0 <= val <= 1:
-                    raise HeightOutOfBoundsError()
-                result[i, j] = val
-        return result
+        return self.mul(other, in_place=True)
 
     def __str__(self):
         """Return string representation of self.
@@ -147,10 +396,27 @@ class Terrain(object):
             str: String of float's, to 1 decimal place, in a 2D grid of heights.
 
         """
-        result = ""
-        for x in range(self.length):
-            result += "\t".join("{0:.1f}".format(abs(i)) for i in self._height_map[x]) + "\n"
-        return result
+        return "".join(self._iter_str_lines())
+
+    def _iter_str_lines(self):
+        """Yield lines of string representation of self, one row at a time.
+
+        Yields:
+            str: Tab delimited heights of a row, to 1 decimal place, including newline.
+
+        """
+        for row in self._height_map:
+            yield "\t".join("{0:.1f}".format(abs(i)) for i in row.tolist()) + "\n"
+
+    def write_str(self, file_obj, chunk_size=terrainio.TERR_CHUNK_SIZE):
+        """Write string representation of self to a file, in chunks of bounded size.
+
+        Args:
+            file_obj (file): Text file-like object to write to.
+            chunk_size (int): Number of characters to buffer before each write.
+
+        """
+        terrainio.write_chunked(file_obj, self._iter_str_lines(), chunk_size)
 
     def display_2d(self):
         """Display a 2D top-down image of terrain as a grid of greyscale squares.
@@ -187,11 +453,18 @@ class Terrain(object):
         if not os.path.isdir(path):
             raise IOError()
         else:
-            terr_file = open(path + fname + ".terr", mode="w")
-            terr_file.write(str(self.width) + " " + str(self.length) + "\n")
-            for row in self._height_map:
-                terr_file.write(" ".join(str(round(x, 4)) for x in row) + "\n")
-            terr_file.close()
+            with open(path + fname + ".terr", mode="w") as terr_file:
+                self.write_terrain(terr_file)
+
+    def write_terrain(self, file_obj, chunk_size=terrainio.TERR_CHUNK_SIZE):
+        """Write terrain in .terr format to a file, in chunks of bounded size.
+
+        Args:
+            file_obj (file): Text file-like object to write to.
+            chunk_size (int): Number of characters to buffer before each write.
+
+        """
+        terrainio.write_terr(file_obj, self.width, self.length, self._height_map, chunk_size)
 
     @classmethod
     def load_terrain(cls, path, fname):
@@ -207,26 +480,93 @@ class Terrain(object):
         Raises:
             IOError: Cannot get given file from path.
             InvalidFileFormatError: File does not conform to .terr extension format.
+            InvalidDimensionsError: Width or length in file is 0.
+            HeightOutOfBoundsError: A height in file is not between 0 and 1.
 
         """
-        if not os.path.isdir(path + fname + ".terr"):
+        if not os.path.isfile(path + fname + ".terr"):
             raise IOError()
         else:
-            terr_file = open(path + fname + ".terr", mode="r")
-            terr_file_lines = terr_file.read().split("\n")
-            terr_file.close()
-            width = int(terr_file_lines[0].split(" ")[0])
-            length = int(terr_file_lines[0].split(" ")[1])
-            if not len(terr_file_lines) == length + 1:
-                raise InvalidFileFormatError()
-            heights = [[float(x) for x in terr_file_lines[1:][y].split(" ")] for y in range(length)]
-            if not all(len(line) == width for line in heights):
-                raise InvalidFileFormatError()
-            terr = Terrain(width, length)
-            for y in range(length):
-                for x in range(width):
-                    terr[x, y] = heights[y][x]
-            return terr
+            with open(path + fname + ".terr", mode="r") as terr_file:
+                return cls.read_terrain(terr_file)
+
+    @classmethod
+    def read_terrain(cls, file_obj):
+        """Read terrain in .terr format from a file, one row at a time.
+
+        Args:
+            file_obj (file): Text file-like object, positioned at start of .terr file.
+
+        Returns:
+            Terrain: Terrain from file.
+
+        Raises:
+            InvalidFileFormatError: File does not conform to .terr extension format.
+            InvalidDimensionsError: Width or length in file is 0.
+            HeightOutOfBoundsError: A height in file is not between 0 and 1.
+
+        """
+        width, length = terrainio.read_terr_header(file_obj)
+        terr = cls(width, length)
+        for y, row in enumerate(terrainio.iter_terr_rows(file_obj, width, length)):
+            if not (0 <= row.min() and row.max() <= 1):
+                raise HeightOutOfBoundsError()
+            terr._height_map[y] = row
+        return terr
+
+    def save_terrain_binary(self, path, fname, dtype="<f8"):
+        """Save terrain to a location, using binary .bterr extension.
+
+        .bterr extension has a fixed size header holding format version, dtype, width and length,
+        followed by raw heights row by row. (See terrainio for full layout.)
+
+        Args:
+            path (str): Path to folder containing terrain. Must end with slash.
+            fname (str): Name of file, minus extension.
+            dtype (str): Dtype to store heights as; "<f8" (default, exact), "<f4" or "<f2".
+
+        Raises:
+            IOError: Cannot get path.
+            InvalidOptionError: dtype is not a valid .bterr dtype.
+
+        """
+        if not os.path.isdir(path):
+            raise IOError()
+        else:
+            with open(path + fname + ".bterr", mode="wb") as terr_file:
+                terrainio.write_binary(terr_file, self._height_map, dtype)
+
+    @classmethod
+    def load_terrain_binary(cls, path, fname, mode="c", window=None):
+        """Load terrain from a .bterr file.
+
+        Float64 heights are memory mapped rather than read, so loading costs almost nothing
+        and heights are only read from disk once accessed.
+
+        Args:
+            path (str): Path to folder containing terrain. Must end with slash.
+            fname (str): Name of file, minus extension.
+            mode (str): Memory map mode; "c" (default) keeps changes in memory only,
+                "r+" writes changes back to the file, and "r" makes the terrain read only.
+            window (tuple(int, int, int, int)): If given, x, y, width and length of a rectangle to load.
+                Only this rectangle is read, into memory, and mode is ignored.
+
+        Returns:
+            Terrain: Terrain from .bterr file.
+
+        Raises:
+            IOError: Cannot get given file from path.
+            InvalidFileFormatError: File does not conform to .bterr extension format.
+            InvalidDimensionsError: Window is not within terrain.
+
+        """
+        filename = path + fname + ".bterr"
+        if window is not None:
+            return cls._wrap_array(terrainio.read_binary_window(filename, *window))
+        heights = terrainio.map_binary(filename, mode)
+        if heights.dtype != np.float64:
+            heights = np.array(heights, dtype=np.float64)
+        return cls._wrap_array(heights)
 
     def get_vonneumann_neighbours(self, x, y):
         """Get Von Neumann neighbours of point x, y.
@@ -266,33 +606,49 @@ class Terrain(object):
                                if 0 <= px < self.width and 0 <= py < self.length]
         return filtered_neighbours
 
-    def thermal_erode(self, iterations=1, talus=0.5):
-        """Perform one iteration of thermal erosion upon self.
+    def thermal_erode(self, iterations=1, talus=0.5, tol=0.0, active_set=False, processes=1):
+        """Perform iterations of thermal erosion upon self.
+
+        Every position is processed together each iteration, and total height is conserved.
+        (See erosion.ThermalErosion for details.)
+
+        Args:
+            iterations (int): Maximum number of times to do thermal erosion.
+            talus (float): Minimum height difference that will cause height transfer to a neighbour.
+            tol (float): Stop early once the largest height transferred in an iteration is no more than this.
+            active_set (bool): Whether to only process positions that may be unstable, i.e. that changed
+                or had a neighbour change in the last iteration. Same result, but later iterations are cheaper.
+            processes (int): Number of processes to split terrain between, as strips of rows in shared memory.
+                Same result. Cannot be combined with active_set.
+
+        Returns:
+            ErosionStats: Number of iterations performed, largest height transferred in the last, time taken,
+                and number of positions processed in each iteration if active_set.
+
+        Raises:
+            InvalidOptionError: Both active_set and more than one process were requested.
+
+        """
+        self._heights_version += 1
+        return erosion.thermal_erode(self._height_map, iterations, talus, tol, active_set, processes)
+
+    def hydraulic_erode(self, droplets=100000, seed=None, batch_size=10000, **params):
+        """Perform particle based hydraulic erosion upon self, simulating batches of droplets together.
+
+        (See erosion.HydraulicErosion for details and further parameters.)
 
         Args:
-            iterations (int): Number of times to do thermal erosion.
-            talus (int): Minimumm height difference that will cause height transfter to a neighbour.
+            droplets (int): Number of droplets to simulate.
+            seed (int): Seed for droplet starting positions. If None, drawn from the random module.
+            batch_size (int): Number of droplets simulated together. Results depend on this as well as seed.
+            **params: Further parameters of erosion.HydraulicErosion, e.g. inertia or max_steps.
+
+        Returns:
+            HydraulicErosionStats: Number of droplets simulated, time taken, and droplets per second.
 
         """
-        for _ in range(iterations):
-            for x in range(self.width):
-                for y in range(self.length):
-                    diff_total = 0
-                    diff_max = 0
-                    # get largest height difference with neighbours and total difference
-                    for nx, ny in self.get_vonneumann_neighbours(x, y):
-                        difference = self[x, y] - self[nx, ny]
-                        if difference > talus:
-                            diff_total += difference
-                            if difference > diff_max:
-                                diff_max = difference
-                    # transfer some height of current point to adjacent points <= current height - talus
-                    for nx, ny in self.get_vonneumann_neighbours(x, y):
-                        difference = self[x, y] - self[nx, ny]
-                        if difference > talus:
-                            transferred_height = (diff_max - talus)*(difference / float(diff_total))
-                            self[x, y] -= transferred_height
-                            self[nx, ny] += transferred_height
+        self._heights_version += 1
+        return erosion.hydraulic_erode(self._height_map, droplets, seed, batch_size, **params)
 
 
 class VoronoiTerrain(Terrain):
@@ -313,39 +669,395 @@ class VoronoiTerrain(Terrain):
 
         """
         super(VoronoiTerrain, self).__init__(width, length)
-        self._points = points
+        self._points = list(points)
         """List[tuple(int, int)]: List of all points to define regions around."""
-        self._region_map = [[0 for _ in range(self.width)] for _ in range(self.length)]
-        """List[list[int]]: 2-dimensional list of indices of which point each position is closest to."""
-        self._point_regions = [[] for _ in self._points]
-        """List[list[tuple(int, int)]]: Lists of points in each region.
-        Point's index in _points coincides with index in _point_regions."""
-        self._feature_points = [[] for _ in self._points]
-        """List[list[tuple(int, int)]]: Lists of feature points in each region.
-        Point's index in _points coincides with index in _point_regions."""
+        self._point_index = {}
+        """dict[tuple(int, int), int]: Index in _points of each point, the first if a point is repeated."""
+        self._region_map = np.zeros((self.length, self.width), dtype=np.int32)
+        """np.ndarray: Indices of which point each position is closest to, indexed [y, x]."""
+        self._max_region_dist = 0.0
+        """float: Upper bound of squared distances from positions to their closest points,
+        or None if not yet found (see _region_dist_bound)."""
+        self._region_cells = None
+        """np.ndarray: Flat indices (y * width + x) of positions, grouped by region in order of _points,
+        and in order of index within each region. None if out of date with _region_map."""
+        self._region_offsets = None
+        """np.ndarray: Start of each region in _region_cells, and end of last region."""
+        self._boundaries = None
+        """dict[str, np.ndarray]: Edges, corners and adjacency of regions (see _boundary_index),
+        or None if out of date with _region_map."""
+        self._region_stats = None
+        """tuple(int, spatial.RegionStats): Heights version stats were found at, and the stats,
+        or None if out of date with _region_map."""
+        self._region_bounds = np.zeros((len(self._points), 4), dtype=np.int64)
+        """np.ndarray: Min x, min y, max x and max y of positions in each region, in order of _points.
+        Empty regions have min x and y of width and length, and max x and y of -1,
+        or None if not yet found (see _bounds)."""
+        self._features = np.zeros((0, 2), dtype=np.int64)
+        """np.ndarray: X-Y coordinates of feature points of all regions, grouped by region in order of _points,
+        and in order added within each region."""
+        self._feature_offsets = np.zeros(len(self._points) + 1, dtype=np.int64)
+        """np.ndarray: Start of each region's feature points in _features, and end of last region's."""
         self._init_regions()
 
     def _init_regions(self):
-        """Initialize region map. and list of regions."""
-        self._point_regions = [[] for _ in self._points]    # Reset list of regions
-        self._feature_points = [[] for _ in self._points]
-        for x in range(self.width):
-            for y in range(self.length):
-                min_dist = self.width**2 + self.length**2
-                closest_pnt_index = 0
-                for pnt in self._points:
-                    dist_squared = (pnt[0] - x)**2 + (pnt[1] - y)**2
-                    if dist_squared < min_dist:
-                        min_dist = dist_squared
-                        closest_pnt_index = self._points.index(pnt)
-                self._region_map[y][x] = closest_pnt_index
-                if len(self._point_regions) > 0:
-                    self._point_regions[closest_pnt_index] += [(x, y)]
+        """Initialize region map, index of regions and their bounding boxes.
+
+        Closest points are found through a bucket grid of points (see spatial.SeedGrid).
+        If two points are equally close to a position, it goes to the point first in the list.
+
+        """
+        self._clear_feature_points()
+        self._index_points()
+        self._label_regions()
+        self._bound_regions()
+
+    def _set_regions(self, labels, features, feature_offsets):
+        """Set region map and feature points directly, from points already set, rather than finding regions.
+
+        Args:
+            labels (np.ndarray): Int32 index of closest point to each position, indexed [y, x].
+            features (np.ndarray): X-Y coordinates of feature points, grouped by region (see _features).
+            feature_offsets (np.ndarray): Start of each region's feature points, and end of last region's.
+
+        """
+        self._features = np.asarray(features, dtype=np.int64).reshape(-1, 2)
+        self._feature_offsets = np.array(feature_offsets, dtype=np.int64)
+        self._index_points()
+        self._regions_changed()
+        self._region_map = labels
+        # only needed once regions are updated or measured, so found then rather than on every load
+        self._max_region_dist = None
+        self._region_bounds = None
+
+    def _bound_regions(self):
+        """Recompute bounding boxes of all regions from region map."""
+        cells, offsets = self._region_index()
+        self._region_bounds = np.empty((len(self._points), 4), dtype=np.int64)
+        self._region_bounds[:] = (self.width, self.length, -1, -1)
+        starts, ends = offsets[:-1][:len(self._points)], offsets[1:][:len(self._points)]
+        filled = ends > starts
+        if filled.any():
+            xs, ys = cells % self.width, cells // self.width
+            filled_starts = starts[filled]
+            self._region_bounds[filled, 0] = np.minimum.reduceat(xs, filled_starts)
+            self._region_bounds[filled, 1] = ys[filled_starts]
+            self._region_bounds[filled, 2] = np.maximum.reduceat(xs, filled_starts)
+            self._region_bounds[filled, 3] = ys[ends[filled] - 1]
+
+    def _bounds(self):
+        """Get bounding boxes of all regions, finding them from the region index if unknown.
+
+        Returns:
+            np.ndarray: Min x, min y, max x and max y of positions in each region (see _region_bounds).
+
+        """
+        if self._region_bounds is None:
+            self._bound_regions()
+        return self._region_bounds
+
+    def _label_regions(self):
+        """Recompute region map from points, leaving index and bounding boxes of regions out of date."""
+        self._regions_changed()
+        self._region_map, region_dist = spatial.nearest_seed_map(self._points, self.width, self.length)
+        self._max_region_dist = float(region_dist.max()) if region_dist.size else 0.0
+
+    def _region_dist_bound(self):
+        """Get upper bound of squared distances from positions to their closest points, finding it if unknown.
+
+        Found a row at a time, so no more than a row of distances is held at once.
+
+        Returns:
+            float: Largest squared distance from a position to its closest point,
+                or infinity if there are positions but no points.
+
+        """
+        if self._max_region_dist is None:
+            self._max_region_dist = float("inf") if self._region_map.size and not self._points else 0.0
+            if self._points:
+                points = np.array(self._points, dtype=np.float64).reshape(-1, 2)
+                xs = np.arange(self.width)
+                for y in range(self.length):
+                    row = points[self._region_map[y]]
+                    row_dist = ((row[:, 0] - xs) ** 2 + (row[:, 1] - y) ** 2).max() if self.width else 0.0
+                    self._max_region_dist = max(self._max_region_dist, float(row_dist))
+        return self._max_region_dist
+
+    def _widen_region_dist(self, dist):
+        """Raise upper bound of squared distances to closest points to include some new distances.
+
+        Args:
+            dist (np.ndarray): Squared distances from positions to their new closest points.
+
+        """
+        if len(dist) and self._max_region_dist is not None:
+            self._max_region_dist = max(self._max_region_dist, float(dist.max()))
+
+    def _regions_changed(self):
+        """Mark everything derived from region map as out of date."""
+        self._region_cells = None
+        self._boundaries = None
+        self._region_stats = None
+
+    def _index_points(self):
+        """Rebuild map from points to their indices in _points."""
+        self._point_index = {}
+        for index, point in enumerate(self._points):
+            self._point_index.setdefault(point, index)
+
+    def _get_point_index(self, x, y):
+        """Get index of a point in _points.
+
+        Args:
+            x (int): X coordinate of point.
+            y (int): Y coordinate of point.
+
+        Returns:
+            int: Index of first point at x and y.
+
+        Raises:
+            ValueError: No point at x and y.
+
+        """
+        try:
+            return self._point_index[(x, y)]
+        except KeyError:
+            raise ValueError((x, y), "is not a point")
+
+    def _region_index(self):
+        """Get positions of all regions, rebuilding the index if regions changed since last use.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Read only flat indices of positions grouped by region (see _region_cells),
+                and start of each region within them, plus end of last region.
+
+        """
+        if self._region_cells is None:
+            labels = self._region_map.ravel()
+            cells = np.argsort(labels, kind="mergesort").astype(np.int32)
+            cells.flags.writeable = False
+            counts = np.bincount(labels, minlength=len(self._points))
+            self._region_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+            self._region_cells = cells
+        return self._region_cells, self._region_offsets
+
+    def _update_bounds(self, indices, window):
+        """Recompute bounding boxes of some regions from region map.
+
+        Args:
+            indices (iterable[int]): Indices of regions to update.
+            window (tuple(int, int, int, int)): Min x, min y, and max x and y plus one,
+                of a rectangle which includes all positions of the regions besides those within their old bounds.
+
+        """
+        if self._region_bounds is None:
+            # unknown bounds are found from the whole region map once needed
+            indices = ()
+        for index in indices:
+            old_min_x, old_min_y, old_max_x, old_max_y = self._region_bounds[index].tolist()
+            if old_max_x < 0 or old_max_y < 0:
+                min_x, min_y, max_x, max_y = window
+            else:
+                min_x, min_y = min(window[0], old_min_x), min(window[1], old_min_y)
+                max_x, max_y = max(window[2], old_max_x + 1), max(window[3], old_max_y + 1)
+            in_region = self._region_map[min_y:max_y, min_x:max_x] == index
+            in_columns, in_rows = np.nonzero(in_region.any(axis=0))[0], np.nonzero(in_region.any(axis=1))[0]
+            if len(in_columns):
+                self._region_bounds[index] = (min_x + in_columns[0], min_y + in_rows[0],
+                                              min_x + in_columns[-1], min_y + in_rows[-1])
+            else:
+                self._region_bounds[index] = (self.width, self.length, -1, -1)
+        self._boundaries = None
+        self._region_stats = None
+
+    def _move_cells(self, moved, old_labels, new_labels):
+        """Move positions between regions in the index of regions, keeping each region's positions in order.
+
+        Only the slices of regions involved are searched, as in remove_point. Does nothing if the index
+        is out of date, as it is then rebuilt on next use.
+
+        Args:
+            moved (np.ndarray): Flat indices (y * width + x) of positions which changed region.
+            old_labels (np.ndarray): Index of region each position was in.
+            new_labels (np.ndarray): Index of region each position is now in.
+
+        """
+        if self._region_cells is None or not len(moved):
+            return
+        cells, offsets = self._region_cells, self._region_offsets
+        num_regions = len(offsets) - 1
+
+        def slice_positions(cells, offsets, labels):
+            # positions within region slices at which sorted positions of each label are found or go
+            order = np.lexsort((moved, labels))
+            sorted_labels, sorted_moved = labels[order], moved[order]
+            label_ids, starts = np.unique(sorted_labels, return_index=True)
+            ends = np.append(starts[1:], len(order))
+            positions = np.empty(len(order), dtype=np.intp)
+            for label, start, end in zip(label_ids.tolist(), starts.tolist(), ends.tolist()):
+                region = cells[offsets[label]:offsets[label + 1]]
+                positions[start:end] = offsets[label] + np.searchsorted(region, sorted_moved[start:end])
+            return positions, sorted_moved
+
+        removed, _ = slice_positions(cells, offsets, old_labels)
+        kept = np.delete(cells, removed)
+        counts = np.diff(offsets) - np.bincount(old_labels, minlength=num_regions)
+        kept_offsets = np.concatenate(([0], np.cumsum(counts)))
+        inserted, sorted_moved = slice_positions(kept, kept_offsets, new_labels)
+        cells = np.insert(kept, inserted, sorted_moved).astype(np.int32)
+        cells.flags.writeable = False
+        counts += np.bincount(new_labels, minlength=num_regions)
+        self._region_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._region_cells = cells
+
+    def _claim_positions(self, index):
+        """Give a point all positions closer to it than to their current closest point.
+
+        Only positions which can possibly be closer are looked at,
+        i.e. those within sqrt(_region_dist_bound()) of the point.
+
+        Args:
+            index (int): Index of point in _points.
+
+        Returns:
+            set[int]: Indices of all regions which changed.
+
+        """
+        point_x, point_y = self._points[index]
+        radius = math.sqrt(min(self._region_dist_bound(), self.width ** 2 + self.length ** 2))
+        min_x, max_x = max(int(math.floor(point_x - radius)), 0), min(int(math.ceil(point_x + radius)) + 1, self.width)
+        min_y, max_y = max(int(math.floor(point_y - radius)), 0), min(int(math.ceil(point_y + radius)) + 1, self.length)
+        if min_x >= max_x or min_y >= max_y:
+            return set([index])
+        window = (slice(min_y, max_y), slice(min_x, max_x))
+        ys, xs = np.mgrid[window]
+        labels = self._region_map[window]
+        label_ids, label_positions = np.unique(labels, return_inverse=True)
+        label_points = np.array([self._points[label] for label in label_ids.tolist()], dtype=np.float64)
+        label_points = label_points[label_positions].reshape(labels.shape + (2,))
+        old_dist = (label_points[..., 0] - xs) ** 2 + (label_points[..., 1] - ys) ** 2
+        dist = (point_x - xs) ** 2 + (point_y - ys) ** 2
+        claimed = (((dist < old_dist) | ((dist == old_dist) & (index < labels))) &
+                   (dist < self.width ** 2 + self.length ** 2))
+        old_labels = labels[claimed]
+        changed = set(np.unique(old_labels).tolist())
+        labels[claimed] = index
+        claimed_ys, claimed_xs = np.nonzero(claimed)
+        self._move_cells((claimed_ys + min_y) * self.width + claimed_xs + min_x, old_labels,
+                         np.full(len(old_labels), index, dtype=old_labels.dtype))
+        changed.add(index)
+        # bound by all positions the point owns, not only those claimed, since in an empty diagram
+        # every position already has label 0 and a new first point claims nothing
+        owned_ys, owned_xs = np.nonzero(labels == index)
+        if len(owned_xs):
+            self._update_bounds(changed, (min_x + owned_xs.min(), min_y + owned_ys.min(),
+                                          min_x + owned_xs.max() + 1, min_y + owned_ys.max() + 1))
+        return changed
+
+    def _release_positions(self, index):
+        """Give all positions of a point's region to their closest other point.
+
+        Args:
+            index (int): Index of point in _points.
+
+        Returns:
+            set[int]: Indices of all regions which changed.
+
+        """
+        min_x, min_y, max_x, max_y = self._bounds()[index].tolist()
+        if max_x < 0 or max_y < 0:
+            return set([index])
+        window = (slice(min_y, max_y + 1), slice(min_x, max_x + 1))
+        in_region = self._region_map[window] == index
+        ys, xs = np.nonzero(in_region)
+        labels, dist = spatial.nearest_seeds(self._points, xs + min_x, ys + min_y, self.width, self.length, index)
+        self._region_map[window][in_region] = labels
+        self._move_cells((ys + min_y) * self.width + xs + min_x, np.full(len(labels), index, dtype=labels.dtype),
+                         labels)
+        self._widen_region_dist(dist)
+        changed = set(labels.tolist())
+        changed.add(index)
+        self._update_bounds(changed, (min_x, min_y, max_x + 1, max_y + 1))
+        return changed
+
+    def _in_region(self, index, x, y):
+        """Test whether a position is within a region.
+
+        Args:
+            index (int): Index of point of region in _points.
+            x (int): X coordinate of position.
+            y (int): Y coordinate of position.
+
+        Returns:
+            bool: True if position is on terrain and closest to the point, False otherwise.
+
+        """
+        return 0 <= x < self.width and 0 <= y < self.length and self._region_map[y, x] == index
+
+    def _clear_feature_points(self):
+        """Remove all feature points."""
+        self._features = np.zeros((0, 2), dtype=np.int64)
+        self._feature_offsets = np.zeros(len(self._points) + 1, dtype=np.int64)
+
+    def _feature_regions(self):
+        """Get index of region of each feature point.
+
+        Returns:
+            np.ndarray: Index in _points of region each row of _features was added to.
+
+        """
+        return np.repeat(np.arange(len(self._points)), np.diff(self._feature_offsets))
+
+    def _store_feature_points(self, regions, features):
+        """Set feature points, keeping them grouped by region.
+
+        Args:
+            regions (np.ndarray): Index of region of each feature point.
+            features (np.ndarray): X-Y coordinates of feature points, of shape (n, 2).
+                Feature points of the same region are kept in the order given.
+
+        """
+        order = np.argsort(regions, kind="mergesort")
+        self._features = np.asarray(features, dtype=np.int64).reshape(-1, 2)[order]
+        counts = np.bincount(regions, minlength=len(self._points)).astype(np.int64)
+        self._feature_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def _add_feature_points(self, regions, features):
+        """Add feature points after those already in their regions, regrouping all feature points.
+
+        For adding many feature points to many regions at once; use _insert_feature_points for one region.
+
+        Args:
+            regions (np.ndarray): Index of region of each new feature point.
+            features (np.ndarray): X-Y coordinates of new feature points, of shape (n, 2).
+
+        """
+        self._store_feature_points(np.concatenate((self._feature_regions(), regions)).astype(np.intp),
+                                   np.concatenate((self._features, np.reshape(features, (-1, 2)))))
+
+    def _insert_feature_points(self, region, features):
+        """Add feature points after those already in one region, without regrouping all feature points.
+
+        Args:
+            region (int): Index of region of new feature points.
+            features (np.ndarray): X-Y coordinates of new feature points, of shape (n, 2).
+
+        """
+        features = np.asarray(features, dtype=np.int64).reshape(-1, 2)
+        self._features = np.insert(self._features, self._feature_offsets[region + 1], features, axis=0)
+        self._feature_offsets[region + 1:] += len(features)
+
+    def _filter_feature_points(self):
+        """Remove feature points no longer within their regions."""
+        regions = self._feature_regions()
+        keep = self._region_map[self._features[:, 1], self._features[:, 0]] == regions
+        if not keep.all():
+            self._store_feature_points(regions[keep], self._features[keep])
 
     @property
     def points(self):
         """List[tuple(int, int)]: List of all points to define regions around."""
-        return copy.deepcopy(self._points)  # list is mutable, don't allow user to alter it
+        return list(self._points)  # list is mutable, don't allow user to alter it
 
     def get_closest_point(self, x, y):
         """Get the index of the closest point to a position.
@@ -355,21 +1067,125 @@ class VoronoiTerrain(Terrain):
             y (int): Y coordinate of position.
 
         Returns:
-            tuple(int, int): X-Y coordinates of closest point in Voronoi diagram to position.
+            int: Index of closest point in Voronoi diagram to position.
 
         """
-        return self._region_map[y][x]
+        return int(self._region_map[y, x])
 
     def add_point(self, x, y):
         """Add a point to make region around.
 
+        Only positions which may now be closest to the new point are updated, along with the regions they left.
+
         Args:
             x (int): X coordinate of point.
             y (int): Y coordinate of point.
 
         """
         self._points.append((x, y))
-        self._init_regions()
+        self._point_index.setdefault((x, y), len(self._points) - 1)
+        self._feature_offsets = np.append(self._feature_offsets, self._feature_offsets[-1])
+        if self._region_bounds is not None:
+            self._region_bounds = np.vstack((self._region_bounds, [(self.width, self.length, -1, -1)]))
+        if self._region_cells is not None and len(self._region_offsets) == len(self._points):
+            # new region starts empty, and gains its positions as they are claimed
+            self._region_offsets = np.append(self._region_offsets, self._region_offsets[-1])
+        else:
+            self._region_cells = None
+        self._boundaries = None
+        self._region_stats = None
+        self._claim_positions(len(self._points) - 1)
+        self._filter_feature_points()
+
+    def remove_point(self, x, y):
+        """Remove a point and its region, giving its positions to their next closest points.
+
+        Args:
+            x (int): X coordinate of point.
+            y (int): Y coordinate of point.
+
+        """
+        index = self._get_point_index(x, y)
+        if len(self._points) == 1:
+            # no other region to give positions to
+            del self._points[index]
+            self._init_regions()
+            return
+        cells, offsets = self._region_index()
+        start, stop = offsets[index], offsets[index + 1]
+        # only positions of the removed region change region, and are found from its slice of the region index
+        released = cells[start:stop].astype(np.intp)
+        released_xs, released_ys = released % self.width, released // self.width
+        labels, dist = spatial.nearest_seeds(self._points, released_xs, released_ys, self.width, self.length, index)
+        flat_map = self._region_map.ravel()
+        flat_map[released] = labels
+        self._widen_region_dist(dist)
+        if self._region_bounds is not None:
+            # other regions only gain positions, so their bounds only widen
+            np.minimum.at(self._region_bounds[:, 0], labels, released_xs)
+            np.minimum.at(self._region_bounds[:, 1], labels, released_ys)
+            np.maximum.at(self._region_bounds[:, 2], labels, released_xs)
+            np.maximum.at(self._region_bounds[:, 3], labels, released_ys)
+        # insert released positions into their new regions' slices, keeping each slice in increasing order
+        kept = np.concatenate((cells[:start], cells[stop:]))
+        kept_offsets = np.concatenate((offsets[:index + 1], offsets[index + 2:] - (stop - start)))
+        order = np.lexsort((released, labels))
+        labels, released = labels[order], released[order]
+        positions = np.empty(len(released), dtype=np.intp)
+        for label in np.unique(labels).tolist():
+            new = labels == label
+            slice_start, slice_stop = kept_offsets[label - (label > index)], kept_offsets[label - (label > index) + 1]
+            positions[new] = slice_start + np.searchsorted(kept[slice_start:slice_stop], released[new])
+        cells = np.insert(kept, positions, released).astype(np.int32)
+        cells.flags.writeable = False
+        counts = np.delete(np.diff(offsets) + np.bincount(labels, minlength=len(self._points)), index)
+        self._region_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self._region_cells = cells
+        # renumber regions after the removed one; a pass over the whole map is faster than scattering through cells
+        self._region_map[self._region_map > index] -= 1
+        regions = self._feature_regions()
+        keep = regions != index
+        del self._points[index]
+        self._store_feature_points(regions[keep] - (regions[keep] > index), self._features[keep])
+        self._index_points()
+        if self._region_bounds is not None:
+            self._region_bounds = np.delete(self._region_bounds, index, axis=0)
+        self._boundaries = None
+        self._region_stats = None
+
+    def move_point(self, x, y, new_x, new_y):
+        """Move a point, updating only the positions which may change region.
+
+        Feature points no longer within their regions afterwards are removed.
+
+        Args:
+            x (int): X coordinate of point.
+            y (int): Y coordinate of point.
+            new_x (int): New x coordinate of point.
+            new_y (int): New y coordinate of point.
+
+        """
+        index = self._get_point_index(x, y)
+        self._release_positions(index)
+        self._points[index] = (new_x, new_y)
+        self._index_points()
+        self._claim_positions(index)
+        self._filter_feature_points()
+
+    def get_region_cells(self, point_x, point_y):
+        """Get flat indices of all positions within the region defined around a point.
+
+        Args:
+            point_x (int): X coordinate of point to get region around.
+            point_y (int): Y coordinate of point to get region around.
+
+        Returns:
+            np.ndarray: Read only view of indices (y * width + x) of positions in region, in increasing order.
+
+        """
+        index = self._get_point_index(point_x, point_y)
+        cells, offsets = self._region_index()
+        return cells[offsets[index]:offsets[index + 1]]
 
     def get_region(self, point_x, point_y):
         """Get all positions within the region defined around a point.
@@ -379,10 +1195,25 @@ class VoronoiTerrain(Terrain):
             point_y (int): Y coordinate of point to get region around.
 
         Returns:
-            list[tuple(int, int)]: List of 2-tuples, representing x-y coordinates of positions in region.
+            list[tuple(int, int)]: List of 2-tuples, representing x-y coordinates of positions in region,
+                in order of x then y. (Use get_region_cells for an array.)
+
+        """
+        return self._cell_positions(self.get_region_cells(point_x, point_y))
+
+    def _cell_positions(self, cells):
+        """Convert flat indices of positions to x-y coordinates.
+
+        Args:
+            cells (np.ndarray): Flat indices (y * width + x) of positions.
+
+        Returns:
+            list[tuple(int, int)]: List of x-y coordinates of positions, in order of x then y.
 
         """
-        return self._point_regions[self.points.index((point_x, point_y))]
+        xs, ys = cells % self.width, cells // self.width
+        order = np.lexsort((ys, xs))
+        return list(zip(xs[order].tolist(), ys[order].tolist()))
 
     def get_region_length(self, region_x, region_y):
         """Get side length of bounding box of region.
@@ -392,12 +1223,11 @@ class VoronoiTerrain(Terrain):
             region_y (int): Y coordinate of center point of region.
 
         Returns:
-            int: Number of positions across vertical side of bounding box.
+            int: Number of positions across vertical side of bounding box, or 0 if region is empty.
 
         """
-        min_y = min(y for _, y in self.get_region(region_x, region_y))
-        max_y = max(y for _, y in self.get_region(region_x, region_y))
-        return max_y - min_y + 1
+        _, min_y, _, max_y = self._bounds()[self._get_point_index(region_x, region_y)].tolist()
+        return max(max_y - min_y + 1, 0)
 
     def get_region_width(self, region_x, region_y):
         """Get side width of bounding box of region.
@@ -407,12 +1237,11 @@ class VoronoiTerrain(Terrain):
             region_y (int): Y coordinate of center point of region.
 
         Returns:
-            int: Number of positions across horizontal side of bounding box.
+            int: Number of positions across horizontal side of bounding box, or 0 if region is empty.
 
         """
-        min_x = min(x for x, _ in self.get_region(region_x, region_y))
-        max_x = max(x for x, _ in self.get_region(region_x, region_y))
-        return max_x - min_x + 1
+        min_x, _, max_x, _ = self._bounds()[self._get_point_index(region_x, region_y)].tolist()
+        return max(max_x - min_x + 1, 0)
 
     def set_region_height(self, point_x, point_y, height):
         """Set uniform height of all positions within the region defined around a point.
@@ -423,93 +1252,300 @@ class VoronoiTerrain(Terrain):
             height (float): Uniform height to set all points in region to. Between 0 and 1.
 
         """
-        for x, y in self.get_region(point_x, point_y):
-            self[x, y] = height
+        if not 0 <= round(height, 3) <= 1:
+            raise HeightOutOfBoundsError()
+        cells = self.get_region_cells(point_x, point_y)
+        self._height_map[cells // self.width, cells % self.width] = round(height, 3)
+        self._heights_version += 1
+
+    def set_region_heights(self, heights):
+        """Set uniform height of every region at once.
+
+        Args:
+            heights (list[float]): Height of each region, in order of points. All between 0 and 1.
+
+        Raises:
+            InvalidDimensionsError: Not one height per point.
+            HeightOutOfBoundsError: A height is not between 0 and 1, when rounded to 3 decimal places.
+                No heights are changed.
+
+        """
+        heights = np.round(np.asarray(heights, dtype=np.float64), 3)
+        if heights.shape != (len(self._points),):
+            raise InvalidDimensionsError()
+        if not ((0 <= heights) & (heights <= 1)).all():
+            raise HeightOutOfBoundsError()
+        if len(heights):
+            self._height_map[...] = heights[self._region_map]
+            self._heights_version += 1
+
+    def region_stats(self):
+        """Get area, and mean, min and max height, of every region at once.
+
+        Stats are kept until heights or points change. If heights are changed through as_array(),
+        heights_changed() must be called for stats to be updated.
 
-    def set_uniform_random_points(self, num_points):
+        Returns:
+            spatial.RegionStats: Stats of each region, in order of points.
+
+        """
+        if self._region_stats is None or self._region_stats[0] != self._heights_version:
+            cells, offsets = self._region_index()
+            stats = spatial.region_stats(self._height_map.ravel(), cells, offsets[:len(self._points) + 1])
+            for array in (stats.area, stats.mean, stats.min, stats.max):
+                array.flags.writeable = False
+            self._region_stats = (self._heights_version, stats)
+        return self._region_stats[1]
+
+    def set_uniform_random_points(self, num_points, seed=None):
         """Set region points to be a preset number of new random positions.
 
-        Points are uniformly distributed, but are guaranteed to never be the same.
+        Points are uniformly distributed, but are guaranteed to never be the same (see spatial.uniform_points).
 
         Args:
-            num_points (int): Number of points to randomly generate. Must be > 0.
+            num_points (int): Number of points to randomly generate. Must be > 0, and at most width * length.
+            seed (int): Seed for points. If None, drawn from the random module.
 
         """
-        self._points = []
-        for pnt_index in range(num_points):
-            made_unique_points = False
-            while not made_unique_points:
-                x, y = random.randint(0, self.width-1), random.randint(0, self.length-1)
-                if (x, y) not in self._points:
-                    self._points.append((x, y))
-                    made_unique_points = True
+        self._points = spatial.uniform_points(self.width, self.length, num_points, seed)
         self._init_regions()
 
-    def lloyd_relax(self, iters=1):
+    def set_poisson_disk_points(self, min_dist, num_points=None, seed=None):
+        """Set region points to be new random positions, no two closer than a minimum distance.
+
+        Points are spread much more evenly than uniformly random ones (see spatial.poisson_disk_points),
+        so fewer iterations of Lloyd relaxation are needed, if any.
+
+        Args:
+            min_dist (float): Minimum distance between points. Must be > 0.
+            num_points (int): Number of points to generate. If None, or more than fit, as many as fit.
+            seed (int): Seed for points. If None, drawn from the random module.
+
+        """
+        self._points = spatial.poisson_disk_points(self.width, self.length, min_dist, num_points, seed)
+        self._init_regions()
+
+    def lloyd_relax(self, iters=1, tol=0.0):
         """Perform iteration of Lloyd relaxation on center points.
 
         This involves points being moved to the centroids of their regions,
         making regions more uniformly distributed.
+        Centroids of all regions are found together from the region map, rounded down to whole positions.
+        Points of empty regions are left where they are.
+        All feature points are removed.
 
         Args:
-            iters (int): Number of iterations of Lloyd relaxation to do in sequence.
+            iters (int): Maximum number of iterations of Lloyd relaxation to do in sequence.
+            tol (float): Stop once no point moves further than this in an iteration.
+
+        Returns:
+            tuple(int, float): Number of iterations done, and furthest distance a point moved in the last one.
 
         """
-        for _ in range(iters):
-            for point_index, region_points in enumerate(self._point_regions):
-                centroid_x = sum(pnt[0] for pnt in region_points) / len(region_points)
-                centroid_y = sum(pnt[1] for pnt in region_points) / len(region_points)
-                self._points[point_index] = (centroid_x, centroid_y)
-            self._init_regions()
+        num_points = len(self._points)
+        if iters <= 0 or num_points == 0:
+            return 0, 0.0
+        xs = np.tile(np.arange(self.width), self.length)
+        ys = np.repeat(np.arange(self.length), self.width)
+        iterations = 0
+        residual = 0.0
+        while iterations < iters:
+            labels = self._region_map.ravel()
+            counts = np.bincount(labels, minlength=num_points)[:num_points]
+            sums_x = np.bincount(labels, weights=xs, minlength=num_points)[:num_points].astype(np.int64)
+            sums_y = np.bincount(labels, weights=ys, minlength=num_points)[:num_points].astype(np.int64)
+            old_points = np.array(self._points, dtype=np.float64)
+            filled = counts > 0
+            new_points = old_points.copy()
+            new_points[filled, 0] = sums_x[filled] // counts[filled]
+            new_points[filled, 1] = sums_y[filled] // counts[filled]
+            residual = float(np.sqrt(((new_points - old_points) ** 2).sum(axis=1)).max())
+            centroids = zip(new_points[:, 0].astype(np.int64).tolist(), new_points[:, 1].astype(np.int64).tolist())
+            self._points = [centroid if is_filled else point
+                            for point, centroid, is_filled in zip(self._points, centroids, filled.tolist())]
+            self._label_regions()
+            iterations += 1
+            if residual <= tol:
+                break
+        self._clear_feature_points()
+        self._index_points()
+        self._bound_regions()
+        return iterations, residual
+
+    def _boundary_index(self):
+        """Get edges, corners and adjacency of all regions, recomputing them if regions changed since last use.
+
+        An edge position has a different region to at least one of its 8 neighbours,
+        and a corner position has at least 3 different regions among its 8 neighbours.
+        Neighbours wrap around to the other side of the terrain.
+        Two regions are adjacent if any of their positions are neighbours, without wrapping around.
+
+        Returns:
+            dict[str, np.ndarray]: Read only arrays, under keys
+                "edge_mask", "corner_mask": Whether each position is an edge or corner, indexed [y, x].
+                "edge_cells", "edge_offsets": Flat indices of edge positions grouped by region,
+                    and start of each region within them, plus end of last region (as for _region_cells).
+                "corner_cells", "corner_offsets": Same for corner positions.
+                "adjacent", "adjacent_offsets": Indices of adjacent points of each region, in increasing order,
+                    and start of each region within them, plus end of last region.
+
+        """
+        if self._boundaries is not None:
+            return self._boundaries
+        num_points = len(self._points)
+        labels = self._region_map
+        flat_labels = labels.ravel()
+        offsets = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+        edge_mask = np.zeros(labels.shape, dtype=bool)
+        for dx, dy in offsets:
+            edge_mask |= np.roll(labels, (dy, dx), axis=(0, 1)) != labels
+        edge_cells = np.flatnonzero(edge_mask)
+        # count distinct regions among neighbours of edge positions only
+        edge_xs, edge_ys = edge_cells % self.width, edge_cells // self.width
+        neighbours = np.sort([flat_labels[((edge_ys + dy) % self.length) * self.width + (edge_xs + dx) % self.width]
+                              for dx, dy in offsets], axis=0)
+        distinct = 1 + (neighbours[1:] != neighbours[:-1]).sum(axis=0)
+        corner_cells = edge_cells[distinct >= 3]
+        corner_mask = np.zeros(labels.shape, dtype=bool)
+        corner_mask.ravel()[corner_cells] = True
+        # pairs of neighbouring positions in different regions, looking right and down from each position
+        pairs = [(labels[:, :-1], labels[:, 1:]), (labels[:-1, :], labels[1:, :]),
+                 (labels[:-1, :-1], labels[1:, 1:]), (labels[:-1, 1:], labels[1:, :-1])]
+        firsts = np.concatenate([first[first != second] for first, second in pairs]).astype(np.int64)
+        seconds = np.concatenate([second[first != second] for first, second in pairs]).astype(np.int64)
+        keys = np.unique(np.concatenate((firsts * num_points + seconds, seconds * num_points + firsts)))
+        self._boundaries = {"edge_mask": edge_mask, "corner_mask": corner_mask}
+        for name, cells, groups in (("edge", edge_cells, flat_labels[edge_cells]),
+                                    ("corner", corner_cells, flat_labels[corner_cells]),
+                                    ("adjacent", keys % max(num_points, 1), keys // max(num_points, 1))):
+            order = np.argsort(groups, kind="mergesort")
+            counts = np.bincount(groups, minlength=num_points)[:num_points]
+            self._boundaries[name if name == "adjacent" else name + "_cells"] = cells[order].astype(np.int32)
+            self._boundaries[name + "_offsets"] = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        for array in self._boundaries.values():
+            array.flags.writeable = False
+        return self._boundaries
+
+    def boundary_masks(self):
+        """Get edges and corners of all regions at once.
+
+        Positions on the edge of a region have a different region to at least one of their 8 neighbours.
+        Corners are positions with at least 3 different regions among their 8 neighbours.
+        Neighbours wrap around to the other side of the terrain.
+        Results are kept until points change.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Read only boolean arrays of whether each position is an edge,
+                and whether each is a corner, indexed [y, x].
+
+        """
+        boundaries = self._boundary_index()
+        return boundaries["edge_mask"], boundaries["corner_mask"]
+
+    def region_adjacency(self):
+        """Get graph of which regions neighbour which.
+
+        Two regions are adjacent if any of their positions are among each other's 8 neighbours,
+        without wrapping around the terrain. Results are kept until points change.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Read only indices of adjacent points of every region,
+                grouped by region in order of points and in increasing order within each,
+                and start of each region's group, plus end of last group.
+
+        """
+        boundaries = self._boundary_index()
+        return boundaries["adjacent"], boundaries["adjacent_offsets"]
+
+    def get_adjacent_regions(self, region_x, region_y):
+        """Get regions neighbouring a region (see region_adjacency).
+
+        Args:
+            region_x (int): X coordinate of center point of region.
+            region_y (int): Y coordinate of center point of region.
+
+        Returns:
+            np.ndarray: Read only view of indices of adjacent points, in increasing order.
+
+        """
+        index = self._get_point_index(region_x, region_y)
+        adjacent, offsets = self.region_adjacency()
+        return adjacent[offsets[index]:offsets[index + 1]]
+
+    def _get_boundary_cells(self, name, region_x, region_y):
+        """Get flat indices of edge or corner positions of a region.
+
+        Args:
+            name (str): "edge" or "corner".
+            region_x (int): X coordinate of center point of region.
+            region_y (int): Y coordinate of center point of region.
+
+        Returns:
+            np.ndarray: Read only view of indices (y * width + x) of positions, in increasing order.
+
+        """
+        index = self._get_point_index(region_x, region_y)
+        boundaries = self._boundary_index()
+        offsets = boundaries[name + "_offsets"]
+        return boundaries[name + "_cells"][offsets[index]:offsets[index + 1]]
+
+    def get_region_edge_cells(self, region_x, region_y):
+        """Get flat indices of all positions on edge of region contained within it (see boundary_masks).
+
+        Args:
+            region_x (int): X coordinate of center point of region.
+            region_y (int): Y coordinate of center point of region.
+
+        Returns:
+            np.ndarray: Read only view of indices (y * width + x) of positions within region on its edge,
+                in increasing order.
+
+        """
+        return self._get_boundary_cells("edge", region_x, region_y)
 
     def get_region_edge(self, region_x, region_y):
-        """Get list of all positions on edge of region contained within it.
+        """Get list of all positions on edge of region contained within it (see boundary_masks).
+
+        Args:
+            region_x (int): X coordinate of center point of region.
+            region_y (int): Y coordinate of center point of region.
+
+        Returns:
+            list[tuple(int, int)]: List of positions within region on its edge, in order of x then y.
+                (Use get_region_edge_cells for an array.)
+
+        """
+        return self._cell_positions(self.get_region_edge_cells(region_x, region_y))
+
+    def get_region_corner_cells(self, region_x, region_y):
+        """Get flat indices of all positions of corners of region (see get_region_corners).
 
         Args:
-            region_x (int): X ccordinate of center point of region.
+            region_x (int): X coordinate of center point of region.
             region_y (int): Y coordinate of center point of region.
 
         Returns:
-            list[tuple(int, int)]: List of positions within region on its edge.
+            np.ndarray: Read only view of indices (y * width + x) of corner positions within region,
+                in increasing order.
 
         """
-        edge = []
-        for x, y in self.get_region(region_x, region_y):
-            neighbours = [(x-1, y-1), (x-1, y), (x-1, y+1),
-                          (x, y-1), (x, y+1),
-                          (x+1, y-1), (x+1, y), (x+1, y+1)]
-            bounded_neighbours = [(n[0] % self.width, n[1] % self.length) for n in neighbours]
-            if not all(self.get_closest_point(*n) == (region_x, region_y) for n in bounded_neighbours):
-                edge.append((x, y))
-        return edge
+        return self._get_boundary_cells("corner", region_x, region_y)
 
     def get_region_corners(self, region_x, region_y):
-        """Get list of all positions of corners of region.
+        """Get list of all positions of corners of region (see boundary_masks).
 
         Corner of region is defined as position between 3 or more different regions.
 
         Args:
-            region_x (int): X ccordinate of center point of region.
+            region_x (int): X coordinate of center point of region.
             region_y (int): Y coordinate of center point of region.
 
         Returns:
-            list[tuple(int, int)]: List of positions within region on its edge.
+            list[tuple(int, int)]: List of corner positions within region, in order of x then y.
+                (Use get_region_corner_cells for an array.)
 
         """
-        corners = []
-        for x, y in self.get_region_edge(region_x, region_y):
-            neighbours = [(x-1, y-1), (x-1, y), (x-1, y+1),
-                          (x, y-1), (x, y+1),
-                          (x+1, y-1), (x+1, y), (x+1, y+1)]
-            bounded_neighbours = [(n[0] % self.width, n[1] % self.length) for n in neighbours]
-            adjacent_regions = []
-            for nx, ny in bounded_neighbours:
-                if self.get_closest_point(nx, ny) not in adjacent_regions:
-                    adjacent_regions.append(self.get_closest_point(nx, ny))
-                if len(adjacent_regions) >= 3:
-                    corners.append((x, y))
-                    break
-        return corners
+        return self._cell_positions(self.get_region_corner_cells(region_x, region_y))
 
     def get_feature_points(self, x, y):
         """Get feature points within a particular region.
@@ -522,7 +1558,9 @@ class VoronoiTerrain(Terrain):
             list[tuple(int, int)]: List of all x-y coordinates of feature points in region.
 
         """
-        return self._feature_points[self._points.index((x, y))]
+        index = self._get_point_index(x, y)
+        features = self._features[self._feature_offsets[index]:self._feature_offsets[index + 1]]
+        return [tuple(feature) for feature in features.tolist()]
 
     def add_feature_point(self, region_x, region_y, x, y):
         """Add a feature point to a region.
@@ -537,14 +1575,14 @@ class VoronoiTerrain(Terrain):
             OutOfRegionError: x and y are outside the chosen region.
 
         """
-        region = self.get_region(region_x, region_y)
-        if (x, y) not in region:
+        index = self._get_point_index(region_x, region_y)
+        if not self._in_region(index, x, y):
             raise OutOfRegionError()
         else:
-            self._feature_points[self._points.index((region_x, region_y))] += [(x, y)]
+            self._insert_feature_points(index, [(x, y)])
 
     def remove_feature_point(self, region_x, region_y, x, y):
-        """Add a feature point to a region.
+        """Remove a feature point from a region.
 
         Args:
             region_x (int): X coordinate of center point of desired region.
@@ -553,14 +1591,150 @@ class VoronoiTerrain(Terrain):
             y (int): Y coordinate of feature point.
 
         Raises:
-            OutOfRegionError: x and y are outside the chosen region.
+            OutOfRegionError: x and y are outside the chosen region, or not a feature point of it.
 
         """
-        region = self.get_region(region_x, region_y)
-        if (x, y) not in region:
+        index = self._get_point_index(region_x, region_y)
+        start, end = self._feature_offsets[index], self._feature_offsets[index + 1]
+        matches = np.flatnonzero((self._features[start:end] == (x, y)).all(axis=1))
+        if not self._in_region(index, x, y) or not len(matches):
             raise OutOfRegionError()
         else:
-            self._feature_points[self._points.index(region_x, region_y)] += [(x, y)]
+            self._features = np.delete(self._features, start + matches[0], axis=0)
+            self._feature_offsets[index + 1:] -= 1
+
+    def _feature_point_factors(self, indices, coeffs, chunk_size=1 << 20, radii=None):
+        """Find height added to each position of some regions by their feature points.
+
+        The distance from a feature point to a position is divided by the distance from the feature point
+        to the edge of the region, along the ray through the position. As every region is convex,
+        it is the intersection of the terrain and the half planes closer to its point than to each nearby point,
+        so the edge along each ray is found directly rather than by stepping along it.
+        Nearby points are found through a bucket grid of points (see spatial.SeedGrid): those within twice
+        a bounding radius of the region, at first the distance from its point to the furthest corner of the
+        bounding box of its positions grown by one on each side. Points further away only bound the region
+        beyond that radius, so if an edge found is further out, the region is worked out again with twice the radius.
+
+        Args:
+            indices (list[int]): Indices of regions.
+            coeffs (list[list[float]]): Coefficients for each region, one per feature point of the region.
+            chunk_size (int): Number of half planes to work on at once, over all positions worked on.
+            radii (list[float]): Bounding radius of each region, or None to find them from bounding boxes.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): Flat indices of positions, and height to add to each.
+
+        """
+        counts = np.diff(self._feature_offsets)
+        selected = [(index, coeff) for index, coeff in zip(indices, coeffs) if counts[index]]
+        if not selected:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        num_features = np.array([len(coeff) for _, coeff in selected])
+        max_features = num_features.max()
+        features = np.full((len(selected), max_features, 2), np.nan)
+        feature_coeffs = np.zeros((len(selected), max_features))
+        for i, (index, coeff) in enumerate(selected):
+            features[i, :len(coeff)] = self._features[self._feature_offsets[index]:self._feature_offsets[index + 1]]
+            feature_coeffs[i, :len(coeff)] = coeff
+        points = np.array(self._points, dtype=np.float64)
+        selected_points = points[[index for index, _ in selected]]
+        if radii is None:
+            bounds = self._bounds()[[index for index, _ in selected]].astype(np.float64)
+            low = np.maximum(bounds[:, :2] - 1, 0)
+            high = np.minimum(bounds[:, 2:] + 1, (self.width, self.length))
+            furthest = np.maximum(np.abs(low - selected_points), np.abs(high - selected_points))
+            radii = np.sqrt((furthest ** 2).sum(axis=1))
+        else:
+            radii = np.array([radius for radius, count in zip(radii, counts[list(indices)]) if count], dtype=np.float64)
+        grid = spatial.SeedGrid(points, self.width, self.length)
+        nearby = []
+        for i, (index, _) in enumerate(selected):
+            bucket_x, bucket_y = (np.clip(np.floor(selected_points[i] / grid.bucket_size), 0,
+                                          (grid.buckets_x - 1, grid.buckets_y - 1)).astype(int).tolist())
+            seeds = grid.seeds_near(bucket_x, bucket_y, int(math.ceil(2 * radii[i] / grid.bucket_size)) + 1)
+            near = ((points[seeds] - selected_points[i]) ** 2).sum(axis=1) <= (2 * radii[i]) ** 2
+            nearby.append(seeds[near & (seeds != index)])
+        # regions with every other point nearby are bounded exactly, however far out their edges are
+        complete = np.array([len(others) == len(points) - 1 for others in nearby])
+        region_cells, region_offsets = self._region_index()
+        cells = np.concatenate([region_cells[region_offsets[index]:region_offsets[index + 1]] for index, _ in selected])
+        groups = np.repeat(np.arange(len(selected)), [region_offsets[index + 1] - region_offsets[index]
+                                                      for index, _ in selected])
+        additions = np.zeros(len(cells))
+        beyond_radius = np.zeros(len(selected), dtype=bool)
+        # regions are worked on in buckets of similar numbers of half planes, padded to the most in the bucket,
+        # so one region with many nearby points does not widen the arrays of every other region
+        num_planes = np.array([len(others) for others in nearby]) + 4
+        buckets = np.ceil(np.log2(num_planes)).astype(int)
+        for bucket in np.unique(buckets).tolist():
+            members = np.flatnonzero(buckets == bucket)
+            rows = np.zeros(len(selected), dtype=np.intp)
+            rows[members] = np.arange(len(members))
+            # half planes n.p <= b: one per nearby point, and four for the sides of the terrain
+            normals = np.zeros((len(members), num_planes[members].max(), 2))
+            limits = np.zeros(normals.shape[:2])
+            normals[:, :4] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+            limits[:, :4] = (self.width, 0, self.length, 0)
+            for row, i in enumerate(members.tolist()):
+                others = points[nearby[i]]
+                normals[row, 4:4 + len(others)] = others - selected_points[i]
+                limits[row, 4:4 + len(others)] = ((others - selected_points[i]) *
+                                                  (others + selected_points[i]) / 2).sum(axis=1)
+            bucket_cells = np.flatnonzero(buckets[groups] == bucket)
+            step = max(chunk_size // normals.shape[1], 1)
+            for start in range(0, len(bucket_cells), step):
+                chunk = bucket_cells[start:start + step]
+                group = groups[chunk]
+                position = np.column_stack((cells[chunk] % self.width, cells[chunk] // self.width)).astype(np.float64)
+                # sort feature points by distance, keeping order of equally close ones; missing ones go last
+                dist_squared = ((features[group] - position[:, np.newaxis]) ** 2).sum(axis=2)
+                dist_squared[np.isnan(dist_squared)] = np.inf
+                order = np.argsort(dist_squared, axis=1, kind="mergesort")
+                sorted_features = features[group][np.arange(len(group))[:, np.newaxis], order]
+                group_normals, group_limits = normals[rows[group]], limits[rows[group]]
+                toward_position = np.einsum("ijk,ik->ij", group_normals, position)
+                for rank in range(max_features):
+                    # for each half plane, fraction of way along ray from feature point to its edge
+                    toward_feature = np.einsum("ijk,ik->ij", group_normals, sorted_features[:, rank])
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        toward = toward_position - toward_feature
+                        fractions = np.where(toward > 0, toward / (group_limits - toward_feature), 0)
+                    fraction = np.nan_to_num(fractions.max(axis=1))
+                    factor = np.clip(fraction, 0, 1)
+                    in_use = rank < num_features[group]
+                    additions[chunk] += np.where(in_use, factor * feature_coeffs[group, rank], 0)
+                    # edge along ray, which may only be bounded by points left out if beyond bounding radius
+                    ray = in_use & (fraction > 0) & ~complete[group]
+                    feature = sorted_features[ray, rank]
+                    edge = feature + (position[ray] - feature) / fraction[ray, np.newaxis]
+                    outside = ((edge - selected_points[group[ray]]) ** 2).sum(axis=1) > radii[group[ray]] ** 2
+                    beyond_radius[group[ray][outside]] = True
+        if beyond_radius.any():
+            redo = np.flatnonzero(beyond_radius).tolist()
+            _, redo_additions = self._feature_point_factors([selected[i][0] for i in redo],
+                                                            [selected[i][1] for i in redo], chunk_size, 2 * radii[redo])
+            # regions worked out again are in the same order, so their positions are too
+            additions[beyond_radius[groups]] = redo_additions
+        return cells, additions
+
+    def _add_heights(self, cells, additions):
+        """Add to heights of positions, as with self[x, y] += addition for each.
+
+        Args:
+            cells (np.ndarray): Flat indices (y * width + x) of positions.
+            additions (np.ndarray): Height to add to each position.
+
+        Raises:
+            HeightOutOfBoundsError: A new height is not between 0 and 1, when rounded to 3 decimal places.
+                No heights are changed.
+
+        """
+        ys, xs = cells // self.width, cells % self.width
+        heights = np.round(self._height_map[ys, xs] + additions, 3)
+        if not ((0 <= heights) & (heights <= 1)).all():
+            raise HeightOutOfBoundsError()
+        self._height_map[ys, xs] = heights
+        self._heights_version += 1
 
     def add_feature_point_factors(self, region_x, region_y, coeffs):
         """Add value to each position in region relative to distance from each feature point times a coefficient.
@@ -571,43 +1745,46 @@ class VoronoiTerrain(Terrain):
 
         for n feature points in the region. c(n) is the nth coefficient supplied,
         and d(n) is the distance of the nth closest feature point to the supplied point.
-        (dn is divided by sqrt(region_length**2 + region_width**2), so is between 0 and 1.)
+        (dn is divided by the distance from the feature point to the edge of the region
+        in the direction of the supplied point, so is between 0 and 1.)
 
         Args:
             region_x (int): X coordinate of center point of desired region.
             region_y (int): Y coordinate of center point of desired region.
             coeffs (list[int]): List of all coefficients for distance to each feature point. (0th = closest, etc.)
 
+        Raises:
+            InvalidCoefficientCountError: Not one coefficient per feature point of region.
+            HeightOutOfBoundsError: A new height is not between 0 and 1. No heights are changed.
+
         References:
             Realtime Procedural Terrain Generation: Jacob Olsen [http://web.mit.edu/cesium/Public/terrain.pdf]
 
         """
-        if len(coeffs) != len(self.get_feature_points(region_x, region_y)):
+        index = self._get_point_index(region_x, region_y)
+        if len(coeffs) != self._feature_offsets[index + 1] - self._feature_offsets[index]:
+            raise InvalidCoefficientCountError()
+        else:
+            self._add_heights(*self._feature_point_factors([index], [coeffs]))
+
+    def add_all_feature_point_factors(self, coeffs):
+        """Add feature point factors to every region at once (see add_feature_point_factors).
+
+        Args:
+            coeffs (list[list[int]]): Coefficients for each region, in order of points,
+                each with one coefficient per feature point of the region.
+
+        Raises:
+            InvalidCoefficientCountError: Not one list of coefficients per point,
+                or not one coefficient per feature point of each region.
+            HeightOutOfBoundsError: A new height is not between 0 and 1. No heights are changed.
+
+        """
+        if len(coeffs) != len(self._points) or \
+                any(len(coeff) != count for coeff, count in zip(coeffs, np.diff(self._feature_offsets).tolist())):
             raise InvalidCoefficientCountError()
         else:
-            for x, y in self.get_region(region_x, region_y):
-                feat_points = self.get_feature_points(region_x, region_y)
-                sorted_pnts = sorted(feat_points, key=lambda p: (x - p[0])**2 + (y - p[1])**2)
-                for (feat_x, feat_y), coeff in zip(sorted_pnts, coeffs):
-                    if x != feat_x or y != feat_y:     # distance factor is 0 at feature point, don't bother
-                        dist_to_point_squared = (x - feat_x)**2 + (y - feat_y)**2
-                        # get distance in same direction to edge of region
-                        feat_to_pnt_len = math.sqrt((x - feat_x)**2 + (y - feat_y)**2)
-                        x_diff = (x - feat_x) / float(feat_to_pnt_len)
-                        y_diff = (y - feat_y) / float(feat_to_pnt_len)
-                        temp_x = x
-                        temp_y = y
-                        # move in same dir as feat pnt => (x, y) until at edge of region / edge of terrain
-                        # once there, distance to reached point from feat pnt = dist to edge of region
-                        while self._points[self.get_closest_point(int(temp_x), int(temp_y))] == (region_x, region_y):
-                            temp_x += x_diff
-                            temp_y += y_diff
-                            if not ((0 <= temp_x < self.width) and (0 <= temp_y < self.length)):
-                                break
-                        dist_to_edge_squared = (temp_x + x_diff - feat_x)**2 + (temp_y + y_diff - feat_y)**2
-                        # divide distance to point by distance to edge to ensure 0 <= height <= 1
-                        dist_factor = math.sqrt(dist_to_point_squared / float(dist_to_edge_squared))
-                        self[x, y] += dist_factor * coeff
+            self._add_heights(*self._feature_point_factors(range(len(self._points)), coeffs))
 
     def add_random_feature_points(self, region_x, region_y, num_points):
         """Add a set number of randomly placed feature points in a region.
@@ -618,11 +1795,43 @@ class VoronoiTerrain(Terrain):
             num_points (int): Number of feature points to create.
 
         """
-        pnts = self.get_region(region_x, region_y)
-        chosen_indices = random.sample(range(0, len(pnts)), num_points)
-        chosen_feat_points = [pnts[i] for i in chosen_indices]
-        for x, y in chosen_feat_points:
-            self.add_feature_point(region_x, region_y, x, y)
+        index = self._get_point_index(region_x, region_y)
+        cells = self.get_region_cells(region_x, region_y)
+        chosen = cells[random.sample(range(0, len(cells)), num_points)]
+        self._insert_feature_points(index, np.column_stack((chosen % self.width, chosen // self.width)))
+
+    def add_all_random_feature_points(self, num_points, seed=None):
+        """Add randomly placed feature points to every region at once.
+
+        Positions are sorted by region plus a random fraction, shuffling them within each region,
+        and the first positions of each region taken. No position is picked twice in one call.
+
+        Args:
+            num_points (int or list[int]): Number of feature points to create in every region,
+                or in each region, in order of points.
+            seed (int): Seed for feature points. If None, drawn from the random module.
+
+        Raises:
+            ValueError: A number of feature points is more than the number of positions in its region.
+            InvalidDimensionsError: A list of numbers is not one per point.
+
+        """
+        if np.ndim(num_points) == 0:
+            counts = np.full(len(self._points), num_points, dtype=np.int64)
+        else:
+            counts = np.asarray(num_points, dtype=np.int64)
+        if counts.shape != (len(self._points),):
+            raise InvalidDimensionsError()
+        cells, offsets = self._region_index()
+        sizes = np.diff(offsets)[:len(self._points)]
+        if (counts > sizes).any():
+            raise ValueError("cannot pick more feature points than positions in region")
+        regions = np.repeat(np.arange(len(self._points)), sizes)
+        order = np.argsort(regions + 0.5 * make_rng(seed).random_sample(len(cells)))
+        rank = np.arange(len(cells)) - offsets[regions]
+        chosen = order[rank < counts[regions]]
+        self._add_feature_points(regions[chosen], np.column_stack((cells[chosen] % self.width,
+                                                                   cells[chosen] // self.width)))
 
     def save_terrain(self, path, fname):
         """Save terrain to a location, using .vterr extension.
@@ -646,8 +1855,7 @@ class VoronoiTerrain(Terrain):
         else:
             terr_file = open(path + fname + ".vterr", mode="w")
             terr_file.write(str(self.width) + " " + str(self.length) + " " + str(len(self._points)) + "\n")
-            for row in self._height_map:
-                terr_file.write(" ".join(str(round(x, 4)) for x in row) + "\n")
+            terrainio.write_chunked(terr_file, terrainio.iter_terr_lines(self._height_map))
             for x, y in self._points:
                 terr_file.write(str(x) + " " + str(y))
                 for feat_x, feat_y in self.get_feature_points(x, y):
@@ -669,33 +1877,98 @@ class VoronoiTerrain(Terrain):
         Raises:
             IOError: Cannot get given file from path.
             InvalidFileFormatError: File does not conform to .terr extension format.
+            HeightOutOfBoundsError: A height in file is not between 0 and 1.
+            OutOfRegionError: A feature point in file is not within its region.
 
         """
-        if not os.path.isdir(path + fname + ".vterr"):
+        if not os.path.isfile(path + fname + ".vterr"):
             raise IOError()
         else:
-            terr_file = open(path + fname + ".vterr", mode="r")
-            terr_file_lines = terr_file.read().split("\n")
-            terr_file.close()
-            width = int(terr_file_lines[0].split(" ")[0])
-            length = int(terr_file_lines[0].split(" ")[1])
-            num_regions = int(terr_file_lines[0].split(" ")[2])
-            if not len(terr_file_lines) == 1 + length + num_regions:
-                raise InvalidFileFormatError()
-            heights = [[float(x) for x in terr_file_lines[1:length][y].split(" ")] for y in range(length)]
-            if not all(len(line) == width for line in heights):
+            with open(path + fname + ".vterr", mode="r") as terr_file:
+                header = terr_file.readline().split()
+                try:
+                    width, length, num_regions = int(header[0]), int(header[1]), int(header[2])
+                except (IndexError, ValueError):
+                    raise InvalidFileFormatError()
+                heights = np.zeros((length, width))
+                for y in range(length):
+                    row = terr_file.readline().split()
+                    if len(row) != width:
+                        raise InvalidFileFormatError()
+                    heights[y] = [float(x) for x in row]
+                region_lines = [line.split() for line in terr_file]
+            while region_lines and not region_lines[-1]:
+                region_lines.pop()      # allow blank lines at end of file
+            if len(region_lines) != num_regions or any(len(line) < 2 or len(line) % 2 for line in region_lines):
                 raise InvalidFileFormatError()
-            region_lines = [line.split(" ") for line in terr_file_lines[length:]]
+            if heights.size and not (0 <= heights.min() and heights.max() <= 1):
+                raise HeightOutOfBoundsError()
             points = []
             feat_points = []
             for line in region_lines:
                 points.append((int(line[0]), int(line[1])))
                 feat_points.append([(int(line[i]), int(line[i+1])) for i in range(2, len(line), 2)])
             terr = VoronoiTerrain(width, length, points)
-            for y in range(length):
-                for x in range(width):
-                    terr[x, y] = heights[y][x]
-            for i, (x, y) in enumerate(points):
-                for feat_x, feat_y in feat_points[i]:
-                    terr.add_feature_point(x, y, feat_x, feat_y)
+            terr._height_map[:] = heights
+            regions = [terr._get_point_index(*points[i]) for i, features in enumerate(feat_points) for _ in features]
+            features = [feature for features in feat_points for feature in features]
+            if not all(terr._in_region(region, x, y) for region, (x, y) in zip(regions, features)):
+                raise OutOfRegionError()
+            terr._add_feature_points(np.array(regions, dtype=np.intp), features)
             return terr
+
+    def save_terrain_binary(self, path, fname, dtype="<f8"):
+        """Save terrain to a location, using binary .bvterr extension.
+
+        .bvterr extension holds heights, the region of every position, points and feature points,
+        so loading does not need to find regions again. (See terrainio for full layout.)
+
+        Args:
+            path (str): Path to folder containing terrain. Must end with slash.
+            fname (str): Name of file, minus extension.
+            dtype (str): Dtype to store heights as; "<f8" (default, exact), "<f4" or "<f2".
+
+        Raises:
+            IOError: Cannot get path.
+            InvalidOptionError: dtype is not a valid .bterr dtype.
+
+        """
+        if not os.path.isdir(path):
+            raise IOError()
+        else:
+            with open(path + fname + ".bvterr", mode="wb") as terr_file:
+                terrainio.write_voronoi_binary(terr_file, self._height_map, self._region_map,
+                                               np.array(self._points).reshape(-1, 2), self._feature_offsets,
+                                               self._features, dtype)
+
+    @classmethod
+    def load_terrain_binary(cls, path, fname):
+        """Load voronoi terrain from a .bvterr file.
+
+        Regions are read from the file rather than found again.
+
+        Args:
+            path (str): Path to folder containing terrain. Must end with slash.
+            fname (str): Name of file, minus extension.
+
+        Returns:
+            VoronoiTerrain: VoronoiTerrain from .bvterr file.
+
+        Raises:
+            IOError: Cannot get given file from path.
+            InvalidFileFormatError: File does not conform to .bvterr extension format.
+            HeightOutOfBoundsError: A height in file is not between 0 and 1.
+
+        """
+        if not os.path.isfile(path + fname + ".bvterr"):
+            raise IOError()
+        with open(path + fname + ".bvterr", mode="rb") as terr_file:
+            heights, labels, points, feature_offsets, features = terrainio.read_voronoi_binary(terr_file)
+        if heights.size and not (0 <= heights.min() and heights.max() <= 1):
+            raise HeightOutOfBoundsError()
+        terr = cls._wrap_array(heights)
+        # points are kept as given, so whole numbers stored as floats are made ints again
+        terr._points = [tuple(int(value) if value.is_integer() else value for value in point)
+                        for point in points.tolist()]
+        terr._set_regions(labels, features, feature_offsets)
+        return terr
@@ -90,8 +90,7 @@ class Terrain3D(object):
         self.terrain = terrain
         self.x_grid, self.y_grid = np.meshgrid(range(self.terrain.width),
                                                range(self.terrain.length))
-        z_vals = np.array([self.terrain[x, y] for x, y in zip(np.ravel(self.x_grid), np.ravel(self.y_grid))])
-        self.z_grid = z_vals.reshape(self.x_grid.shape)
+        self.z_grid = self.terrain.as_array()
 
     def display_terrain(self):
         """Display 3D surface of terrain."""
@@ -1,6 +1,10 @@
 """All random generators for Terrain class."""
 
 from terrain import Terrain
+from exceptions import *
+from rng import make_rng, derive_seed, hash_keys
+import numpy as np
+import collections
 import random
 import abc
 import math
@@ -21,19 +25,73 @@ class TerrainGenerator(object):
         """
 
 
+def _divide_level(heights, square_len, amplitude, draw, finish):
+    """Do the square step and then the diamond step for every square of one size at once.
+
+    Points are updated exactly as in DiamondSquareGenerator._update_square and _update_diamond,
+    with neighbours summed in the same order, and offsets taken from draw in the same order
+    as DiamondSquareGenerator._divide_once loops through points.
+
+    Args:
+        heights (np.ndarray): Heights to update, indexed [y, x]. Must have corners of squares set.
+        square_len (int): Length of one side of a square.
+        amplitude (float): Maximum amplitude of offsets at this level.
+        draw (function): Function that gives an array of a number of random values between 0 and 1.
+        finish (function): Function that rounds an array of heights to 3 decimal places.
+
+    """
+    length, width = heights.shape
+    half = square_len // 2
+    # square step, in order of y then x
+    ys, xs = np.arange(half, length, square_len)[:, np.newaxis], np.arange(half, width, square_len)
+    mean_height = (heights[ys - half, xs - half] + heights[ys + half, xs - half] +
+                   heights[ys - half, xs + half] + heights[ys + half, xs + half]) / 4.0
+    offset = (draw(mean_height.size).reshape(mean_height.shape) - 0.5) * amplitude
+    heights[half::square_len, half::square_len] = finish(np.clip(mean_height + offset, 0, 1).ravel()).reshape(
+        mean_height.shape)
+    # diamond step, on positions between those done so far, in order of y then x
+    lattice_y, lattice_x = np.nonzero((np.add.outer(np.arange(0, length, half) // half,
+                                                    np.arange(0, width, half) // half) % 2) == 1)
+    ys, xs = lattice_y * half, lattice_x * half
+    total = np.zeros(len(ys))
+    count = np.zeros(len(ys))
+    for valid, neighbour_y, neighbour_x in ((xs != 0, ys, xs - half), (ys != 0, ys - half, xs),
+                                            (xs != width - 1, ys, xs + half), (ys != length - 1, ys + half, xs)):
+        total = total + np.where(valid, heights[neighbour_y % length, neighbour_x % width], 0)
+        count += valid
+    offset = (draw(len(ys)) - 0.5) * amplitude
+    heights[ys, xs] = finish(np.clip(total / count + offset, 0, 1))
+
+
 class DiamondSquareGenerator(TerrainGenerator):
     """Terrain generator that used diamond-square algorithm."""
 
-    def __init__(self, amp_from_freq):
+    SCALAR = "scalar"
+    """Mode: update one point at a time, drawing offsets from the random module."""
+    REFERENCE = "reference"
+    """Mode: update all points of a step at once, but draw offsets and round heights exactly as SCALAR does,
+    so the same seed gives the same terrain."""
+    VECTORIZED = "vectorized"
+    """Mode: update all points of a step at once, drawing all offsets of a step in one batch.
+    Statistically the same as SCALAR, but not the same terrain for the same seed."""
+
+    def __init__(self, amp_from_freq, mode=SCALAR):
         """
 
         Args:
             amp_from_freq (function): Function that converts frequency to maximum amplitude.
+            mode (str): One of SCALAR (default), REFERENCE or VECTORIZED.
+
+        Raises:
+            InvalidOptionError: mode is not one of SCALAR, REFERENCE or VECTORIZED.
 
         """
+        if mode not in (self.SCALAR, self.REFERENCE, self.VECTORIZED):
+            raise InvalidOptionError()
         self.amp_from_freq = amp_from_freq
+        self.mode = mode
 
-    def __call__(self, side_exp):
+    def __call__(self, side_exp, seed=None):
         """Generate a Terrain with heights corresponding to noise.
 
         Used diamond-square algorithm, with frequency of noise at each step doubling.
@@ -43,14 +101,55 @@ class DiamondSquareGenerator(TerrainGenerator):
 
         Args:
             side_exp (int): Exponent of side length. Length of side is 2**side_exp + 1.
+            seed (int): Seed for noise. If None, SCALAR and REFERENCE modes use the random module's own state,
+                and VECTORIZED mode draws a seed from it.
 
         Returns:
             Terrain: New Terrain with heights corresponding to noise.
 
+        """
+        for _, ter in self.iter_levels(side_exp, seed):
+            pass
+        return ter
+
+    def iter_levels(self, side_exp, seed=None):
+        """Generate a Terrain level by level, from coarse to fine, for previews while generating.
+
+        The same Terrain is yielded after corners are set and after each level of squares and diamonds is done,
+        along with the spacing of the points set so far. Points in between are 0 until set,
+        so terrain.as_array()[::step, ::step] is a complete coarse view.
+        Random numbers are drawn in the same order as __call__, so the last Terrain equals __call__ with the same seed.
+
+        Args:
+            side_exp (int): Exponent of side length. Length of side is 2**side_exp + 1.
+            seed (int): Seed for noise, as in __call__.
+
+        Yields:
+            tuple(int, Terrain): Spacing of points set so far, and Terrain being generated.
+
         """
         side_len = (2 ** side_exp) + 1
         ter = Terrain(side_len, side_len)
-        return self._divide(self._initialize_corners(ter, 0.5), side_len-1)
+        ter = self._initialize_corners(ter, 0.5)
+        yield side_len - 1, ter
+        if self.mode == self.SCALAR:
+            rand = random if seed is None else random.Random(seed)
+            for square_len in (2 ** exp for exp in range(side_exp, 0, -1)):
+                ter = self._divide_once(ter, square_len, rand)
+                yield square_len // 2, ter
+            return
+        if self.mode == self.REFERENCE:
+            rand = random if seed is None else random.Random(seed)
+            draw = lambda count: np.array([rand.random() for _ in range(count)])
+            finish = lambda heights: np.array([round(height, 3) for height in heights.tolist()])
+        else:
+            rng = make_rng(seed)
+            draw = rng.random_sample
+            finish = lambda heights: np.round(heights, 3)
+        for square_len in (2 ** exp for exp in range(side_exp, 0, -1)):
+            _divide_level(ter.as_array(), square_len, self.amp_from_freq(side_len // square_len), draw, finish)
+            ter.heights_changed()
+            yield square_len // 2, ter
 
     def _initialize_corners(self, terrain, init_val):
         """Initialize corner values of terrain.
@@ -69,38 +168,32 @@ class DiamondSquareGenerator(TerrainGenerator):
         terrain[terrain.width-1, terrain.length-1] = init_val
         return terrain
 
-    def _divide(self, terrain, square_len):
-        """Divide terrain into squares and process each square recursively.
+    def _divide_once(self, terrain, square_len, rand):
+        """Update the midpoints of all squares of one size, then the midpoints of all diamonds of that size.
 
-        Goes through each square, altering midpoint. After this, go through each diamond, altering edges.
-        (Altering constitutes setting the value to an average of adjacent values and adding a noise offset.)
-        Once all are done, halve size of each square and do _divide again on half-size squares.
-        Once square size goes below 1, finish.
+        (Updating constitutes setting the value to an average of adjacent values and adding a noise offset.)
 
         Args:
-            terrain (Terrain): Terrain to manipulate. Must have corners initialized.
-            square_len (int): Current length of one side of a square.
+            terrain (Terrain): Terrain to manipulate. Must have corners of squares initialized.
+            square_len (int): Length of one side of a square. Must be at least 2.
+            rand (random.Random): Source of random offsets.
 
         Returns:
-            Terrain: New terrain with generated values.
+            Terrain: Terrain with updated values.
 
         """
-        half = square_len / 2
+        half = square_len // 2
+        # loop through all squares
+        for y in range(half, terrain.length, square_len):
+            for x in range(half, terrain.width, square_len):
+                terrain = self._update_square(terrain, x, y, square_len, rand)
+        # loop through all diamonds
+        for y in range(0, terrain.length, half):
+            for x in range((y + half) % square_len, terrain.width, square_len):
+                terrain = self._update_diamond(terrain, x, y, square_len, rand)
+        return terrain
 
-        if half < 1:
-            return terrain
-        else:
-            # loop through all squares
-            for y in range(half, terrain.length, square_len):
-                for x in range(half, terrain.width, square_len):
-                    terrain = self._update_square(terrain, x, y, square_len)
-            # loop through all diamonds
-            for y in range(0, terrain.length, half):
-                for x in range((y + half) % square_len, terrain.width, square_len):
-                    terrain = self._update_diamond(terrain, x, y, square_len)
-            return self._divide(terrain, half)
-
-    def _update_square(self, terrain, x, y, square_len):
+    def _update_square(self, terrain, x, y, square_len, rand):
         """Update the midpoint of a square.
 
         Midpoint becomes average of square corners plus a random offset determined by noise.
@@ -110,19 +203,20 @@ class DiamondSquareGenerator(TerrainGenerator):
             x (int): X coordinate of center of square.
             y (int): Y coordinate of center of square.
             square_len (int): Length of one side of square.
+            rand (random.Random): Source of random offset.
 
         Returns:
             Terrain: New terrain with updated square center.
 
         """
-        half_len = square_len / 2
+        half_len = square_len // 2
         # Impossible to attempt to access neighbours out of terrain bounds
         mean_height = sum([terrain[x - half_len, y - half_len],
                            terrain[x - half_len, y + half_len],
                            terrain[x + half_len, y - half_len],
                            terrain[x + half_len, y + half_len]]) / 4.0
-        frequency = terrain.length / square_len
-        offset = (random.random() - 0.5) * self.amp_from_freq(frequency)
+        frequency = terrain.length // square_len
+        offset = (rand.random() - 0.5) * self.amp_from_freq(frequency)
         if not 0 <= mean_height + offset <= 1:
             if mean_height + offset > 1:
                 terrain[x, y] = 1
@@ -132,7 +226,7 @@ class DiamondSquareGenerator(TerrainGenerator):
             terrain[x, y] = mean_height + offset
         return terrain
 
-    def _update_diamond(self, terrain, x, y, diamond_len):
+    def _update_diamond(self, terrain, x, y, diamond_len, rand):
         """Update the midpoint of a diamond.
 
         Midpoint becomes average of diamond corners plus a random offset determined by noise.
@@ -142,12 +236,13 @@ class DiamondSquareGenerator(TerrainGenerator):
             x (int): X coordinate of center of diamond.
             y (int): Y coordinate of center of diamond.
             diamond_len (int): Length of one corner of diamond to other.
+            rand (random.Random): Source of random offset.
 
         Returns:
             Terrain: New terrain with updated square center.
 
         """
-        half_len = diamond_len / 2
+        half_len = diamond_len // 2
         # If on edge of terrain, only access 3 neighbours to avoid leaving terrain bounds
         neighbours = []
         if x != 0:
@@ -159,8 +254,8 @@ class DiamondSquareGenerator(TerrainGenerator):
         if y != terrain.length - 1:
             neighbours.append(terrain[x, y + half_len])
         mean_height = sum(neighbours) / float(len(neighbours))
-        frequency = terrain.length / diamond_len
-        offset = (random.random() - 0.5) * self.amp_from_freq(frequency)
+        frequency = terrain.length // diamond_len
+        offset = (rand.random() - 0.5) * self.amp_from_freq(frequency)
         if not 0 <= mean_height + offset <= 1:
             if mean_height + offset > 1:
                 terrain[x, y] = 1
@@ -171,91 +266,476 @@ class DiamondSquareGenerator(TerrainGenerator):
         return terrain
 
 
+# Amplitude functions of presets are defined at module level rather than as lambdas, so presets can be pickled
+# to worker processes by generate_batch.
+def _red_noise_amplitude(frequency):
+    return frequency ** -2
+
+
+def _pink_noise_amplitude(frequency):
+    return frequency ** -1
+
+
+def _white_noise_amplitude(frequency):
+    return 1
+
+
+def _blue_noise_amplitude(frequency):
+    return frequency
+
+
+def _violet_noise_amplitude(frequency):
+    return frequency ** 2
+
+
 class RedNoiseGenerator(DiamondSquareGenerator):
     """Diamond square terrain generator with red noise (amplitude = 1 / (frequency^2))."""
 
     def __new__(cls, *args, **kwargs):
-        return DiamondSquareGenerator(lambda f: f ** -2)
+        return DiamondSquareGenerator(_red_noise_amplitude, *args, **kwargs)
 
 
 class PinkNoiseGenerator(DiamondSquareGenerator):
     """Diamond square terrain generator with pink noise (amplitude = 1 / frequency)."""
 
     def __new__(cls, *args, **kwargs):
-        return DiamondSquareGenerator(lambda f: f ** -1)
+        return DiamondSquareGenerator(_pink_noise_amplitude, *args, **kwargs)
 
 
 class WhiteNoiseGenerator(DiamondSquareGenerator):
     """Diamond square terrain generator with white noise (amplitude = 1)."""
 
     def __new__(cls, *args, **kwargs):
-        return DiamondSquareGenerator(lambda f: 1)
+        return DiamondSquareGenerator(_white_noise_amplitude, *args, **kwargs)
 
 
 class BlueNoiseGenerator(DiamondSquareGenerator):
     """Diamond square terrain generator with blue noise (amplitude = frequency)."""
 
     def __new__(cls, *args, **kwargs):
-        return DiamondSquareGenerator(lambda f: f)
+        return DiamondSquareGenerator(_blue_noise_amplitude, *args, **kwargs)
 
 
 class VioletNoiseGenerator(DiamondSquareGenerator):
     """Diamond square terrain generator with violet noise (amplitude = frequency^2)."""
 
     def __new__(cls, *args, **kwargs):
-        return DiamondSquareGenerator(lambda f: f ** 2)
+        return DiamondSquareGenerator(_violet_noise_amplitude, *args, **kwargs)
+
+
+class TiledDiamondSquareGenerator(TerrainGenerator):
+    """Diamond square terrain generator for an unbounded world of tiles that join up at their edges.
+
+    Tile (i, j) covers x from i * (side_len - 1) to (i + 1) * (side_len - 1) and likewise for y,
+    so adjacent tiles share a row or column of heights.
+    Corners and edges only depend on the world seed and their own coordinates, and edges are made with
+    1-D midpoint displacement between their corners, so any tile can be made in any order and still match
+    its neighbours exactly. The inside of each tile is then filled with diamond-square, keeping its edges fixed.
+
+    Unlike DiamondSquareGenerator, it is called with the coordinates of a tile rather than a size and seed,
+    as size and seed are fixed for the whole world.
+    """
+
+    _CORNER = 0
+    _HORIZONTAL_EDGE = 1
+    _VERTICAL_EDGE = 2
+    _TILE = 3
+
+    def __init__(self, amp_from_freq, side_exp, seed=None, cache_size=64):
+        """
+
+        Args:
+            amp_from_freq (function): Function that converts frequency to maximum amplitude.
+            side_exp (int): Exponent of side length of tiles. Length of side is 2**side_exp + 1.
+            seed (int): Seed of world. If None, one is drawn from the random module.
+            cache_size (int): Most edges kept for reuse by neighbouring tiles; least recently used are forgotten first.
+
+        """
+        self.amp_from_freq = amp_from_freq
+        self.side_exp = side_exp
+        self.side_len = (2 ** side_exp) + 1
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.cache_size = cache_size
+        self._edges = collections.OrderedDict()
+        """collections.OrderedDict: Edges made recently, by (kind, i, j), from least to most recently used."""
+
+    def __call__(self, i, j):
+        """Generate the tile at tile coordinates (i, j).
+
+        Args:
+            i (int): X coordinate of tile.
+            j (int): Y coordinate of tile.
+
+        Returns:
+            Terrain: New Terrain of the tile, with heights corresponding to noise.
+
+        """
+        heights = np.empty((self.side_len, self.side_len))
+        self._set_edges(heights, i, j)
+        rng = make_rng(derive_seed(self.seed, self._TILE, i, j))
+        finish = lambda values: np.round(values, 3)
+        for square_len in (2 ** exp for exp in range(self.side_exp, 0, -1)):
+            _divide_level(heights, square_len, self.amp_from_freq((self.side_len - 1) // square_len),
+                          rng.random_sample, finish)
+            # diamond step also updates edges, which must stay as shared with neighbours
+            self._set_edges(heights, i, j)
+        return Terrain._wrap_array(heights)
+
+    def sample(self, xs, ys):
+        """Get heights of the world at some points only, generating just the tiles they are in.
+
+        Args:
+            xs (np.ndarray): Integer X coordinates of points in world.
+            ys (np.ndarray): Integer Y coordinates of points in world, broadcastable with xs.
+
+        Returns:
+            np.ndarray: Heights at points, of shape of xs and ys broadcast together.
+
+        """
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64))
+        tile_len = self.side_len - 1
+        tile_xs, tile_ys = xs // tile_len, ys // tile_len
+        heights = np.empty(xs.shape)
+        tiles = np.unique(np.stack([tile_xs.ravel(), tile_ys.ravel()], axis=1), axis=0)
+        for i, j in tiles.tolist():
+            in_tile = (tile_xs == i) & (tile_ys == j)
+            heights[in_tile] = self(i, j).as_array()[ys[in_tile] - j * tile_len, xs[in_tile] - i * tile_len]
+        return heights
+
+    def window(self, x, y, width, length):
+        """Generate a Terrain covering a window of the world, generating just the tiles it overlaps.
+
+        Args:
+            x (int): X coordinate of top left of window in world.
+            y (int): Y coordinate of top left of window in world.
+            width (int): Width of window.
+            length (int): Length of window.
+
+        Returns:
+            Terrain: New Terrain of heights in window.
+
+        """
+        tile_len = self.side_len - 1
+        heights = np.empty((length, width))
+        for j in range(y // tile_len, (y + length - 1) // tile_len + 1):
+            for i in range(x // tile_len, (x + width - 1) // tile_len + 1):
+                # part of window this tile covers, leaving shared far edges to the next tile
+                left, right = max(x, i * tile_len), min(x + width, (i + 1) * tile_len)
+                top, bottom = max(y, j * tile_len), min(y + length, (j + 1) * tile_len)
+                heights[top - y:bottom - y, left - x:right - x] = self(i, j).as_array()[
+                    top - j * tile_len:bottom - j * tile_len, left - i * tile_len:right - i * tile_len]
+        return Terrain._wrap_array(heights)
+
+    def clear_cache(self):
+        """Forget all edges made so far. They are made again, identically, when next needed."""
+        self._edges.clear()
+
+    def _set_edges(self, heights, i, j):
+        """Set the edges of a tile's heights to the edges shared with its neighbours.
+
+        Args:
+            heights (np.ndarray): Heights of tile, indexed [y, x].
+            i (int): X coordinate of tile.
+            j (int): Y coordinate of tile.
+
+        """
+        heights[0, :] = self._get_edge(self._HORIZONTAL_EDGE, i, j)
+        heights[-1, :] = self._get_edge(self._HORIZONTAL_EDGE, i, j + 1)
+        heights[:, 0] = self._get_edge(self._VERTICAL_EDGE, i, j)
+        heights[:, -1] = self._get_edge(self._VERTICAL_EDGE, i + 1, j)
+
+    def _get_corner(self, i, j):
+        """Get the height of the corner at tile coordinates (i, j), the top left corner of tile (i, j).
+
+        Args:
+            i (int): X coordinate of corner.
+            j (int): Y coordinate of corner.
+
+        Returns:
+            float: Height of corner.
+
+        """
+        offset = (make_rng(derive_seed(self.seed, self._CORNER, i, j)).random_sample() - 0.5) * self.amp_from_freq(1)
+        return round(min(max(0.5 + offset, 0), 1), 3)
+
+    def _get_edge(self, kind, i, j):
+        """Get the heights along an edge starting at the corner (i, j), making it if not recently made.
+
+        Args:
+            kind (int): _HORIZONTAL_EDGE for the edge from corner (i, j) to (i + 1, j),
+                or _VERTICAL_EDGE for the edge from corner (i, j) to (i, j + 1).
+            i (int): X coordinate of first corner.
+            j (int): Y coordinate of first corner.
+
+        Returns:
+            np.ndarray: Heights along edge, read-only.
+
+        """
+        key = (kind, i, j)
+        if key in self._edges:
+            edge = self._edges.pop(key)
+        else:
+            end = (i + 1, j) if kind == self._HORIZONTAL_EDGE else (i, j + 1)
+            edge = np.empty(self.side_len)
+            edge[0] = self._get_corner(i, j)
+            edge[-1] = self._get_corner(*end)
+            rng = make_rng(derive_seed(self.seed, kind, i, j))
+            for square_len in (2 ** exp for exp in range(self.side_exp, 0, -1)):
+                half = square_len // 2
+                mean_height = (edge[0:-1:square_len] + edge[square_len::square_len]) / 2.0
+                offset = (rng.random_sample(len(mean_height)) - 0.5) * self.amp_from_freq(
+                    (self.side_len - 1) // square_len)
+                edge[half::square_len] = np.round(np.clip(mean_height + offset, 0, 1), 3)
+            edge.flags.writeable = False
+        self._edges[key] = edge
+        while len(self._edges) > self.cache_size:
+            self._edges.popitem(last=False)
+        return edge
 
 
 class PerlinGenerator(TerrainGenerator):
     """Terrain generator that uses Perlin noise algorithm."""
 
-    def __init__(self, square_len, width_in_squares, length_in_squares):
+    TABLE = "table"
+    """Lattice: gradient vectors are drawn up front for a grid of the size of the terrain,
+    and points outside the grid wrap around it."""
+    HASHED = "hashed"
+    """Lattice: gradient vector at each corner is derived from a hash of the seed and the corner's coordinates,
+    so noise covers an unbounded plane with constant memory."""
+
+    def __init__(self, square_len, width_in_squares, length_in_squares, lattice=TABLE, seed=None):
         """
 
         Args:
             square_len (int): Length of one side of a square in Perlin noise grid. Is > 0.
             width_in_squares (int): Width of generated terrain in grid squares. Is > 0.
             length_in_squares (int): Length of generated terrain in grid squares. Is > 0.
+            lattice (str): Where gradient vectors come from, TABLE or HASHED.
+            seed (int): Seed for gradient vectors. If None, they are drawn from the random module.
+
+        Raises:
+            InvalidOptionError: lattice is not TABLE or HASHED.
 
         """
+        if lattice not in (self.TABLE, self.HASHED):
+            raise InvalidOptionError()
         self._square_len = square_len
         self._width_in_squares = width_in_squares
         self._length_in_squares = length_in_squares
         self._linearly_interpolated = False
-        self._init_gradients(1)
+        self._lattice = lattice
+        if lattice == self.TABLE:
+            self._init_gradients(1, random if seed is None else random.Random(seed))
+        else:
+            self._seed = random.getrandbits(64) if seed is None else seed
 
-    def _init_gradients(self, vec_magnitude):
+    def _init_gradients(self, vec_magnitude, rand=random):
         """Initialize all gradient vectors to be in random directions with the same magnitude.
 
         Args:
             vec_magnitude (float): Magnitude of all gradient vectors.
+            rand (random.Random): Source of random directions.
 
         """
         self._grad_vecs = [[(0, 0) for _ in range(self._width_in_squares+1)] for _ in range(self._length_in_squares+1)]
         """list[list[tuple(float, float)]]: Grid of gradient vectors."""
         for x in range(self._width_in_squares+1):
             for y in range(self._length_in_squares+1):
-                x_val = (random.random() - 0.5) * 2 * vec_magnitude
-                y_val = math.sqrt(vec_magnitude**2 - x_val**2) * random.choice([1, -1])
+                x_val = (rand.random() - 0.5) * 2 * vec_magnitude
+                y_val = math.sqrt(vec_magnitude**2 - x_val**2) * rand.choice([1, -1])
                 self._grad_vecs[y][x] = (x_val, y_val)
+        self._grad_table = np.array(self._grad_vecs, dtype=np.float64)
+        """np.ndarray: Gradient vectors as an array of shape (length_in_squares + 1, width_in_squares + 1, 2)."""
 
-    def __call__(self, linearly_interpolated=False):
+    def _get_gradients(self, vec_x, vec_y, octave=0):
+        """Get gradient vectors at corners of the grid.
+
+        Args:
+            vec_x (np.ndarray): Integer X coordinates of corners.
+            vec_y (np.ndarray): Integer Y coordinates of corners, broadcastable with vec_x.
+            octave (int): Octave of noise. With a HASHED lattice, each octave has its own gradient vectors.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): X and Y components of gradient vectors.
+
+        """
+        vec_x = np.asarray(vec_x).astype(np.int64)
+        vec_y = np.asarray(vec_y).astype(np.int64)
+        if self._lattice == self.TABLE:
+            index = (vec_y % self._grad_table.shape[0], vec_x % self._grad_table.shape[1])
+            return self._grad_table[..., 0][index], self._grad_table[..., 1][index]
+        # top 53 bits of hash give an angle, evenly spread around the circle
+        angle = (hash_keys(self._seed, octave, vec_x, vec_y) >> np.uint64(11)) * (2 * math.pi / 2 ** 53)
+        return np.cos(angle), np.sin(angle)
+
+    def __call__(self, linearly_interpolated=False, octaves=1, lacunarity=2.0, persistence=0.5, seed=None):
         """Generate terrain via Perlin noise.
 
+        Noise is worked out for the whole terrain at once, with one array pass per octave.
+        With more than one octave, octaves are summed as fractal Brownian motion: each octave has
+        lacunarity times the frequency and persistence times the amplitude of the one before.
+        With a TABLE lattice, octaves wrap around the grid of gradient vectors where they go past its edge.
+
         Args:
             linearly_interpolated (bool): Whether to linearly interpolate values or use cubic function.
+            octaves (int): Number of octaves of noise to sum. Is > 0.
+            lacunarity (float): Factor by which frequency grows from one octave to the next.
+            persistence (float): Factor by which amplitude shrinks from one octave to the next.
+            seed (int): If not None, gradient vectors for this terrain only are made from this seed,
+                as if this generator had been made with it.
 
         Returns:
             Terrain: Generated terrain.
 
+        Raises:
+            ValueError: octaves is not positive.
+
+        """
+        if seed is not None:
+            generator = PerlinGenerator(self._square_len, self._width_in_squares, self._length_in_squares,
+                                        self._lattice, seed)
+            return generator(linearly_interpolated, octaves, lacunarity, persistence)
+        return self.window(0, 0, self._square_len * self._width_in_squares,
+                           self._square_len * self._length_in_squares,
+                           linearly_interpolated, octaves, lacunarity, persistence)
+
+    def window(self, x, y, width, length, linearly_interpolated=False, octaves=1, lacunarity=2.0, persistence=0.5):
+        """Generate terrain via Perlin noise over a window of the plane.
+
+        With a HASHED lattice, the window may be anywhere, including at negative coordinates,
+        and windows that overlap give exactly the same heights where they overlap.
+        With a TABLE lattice, corners outside the grid of gradient vectors wrap around it.
+
+        Args:
+            x (int): X coordinate of top left of window.
+            y (int): Y coordinate of top left of window.
+            width (int): Width of window.
+            length (int): Length of window.
+            linearly_interpolated (bool): Whether to linearly interpolate values or use cubic function.
+            octaves (int): Number of octaves of noise to sum. Is > 0.
+            lacunarity (float): Factor by which frequency grows from one octave to the next.
+            persistence (float): Factor by which amplitude shrinks from one octave to the next.
+
+        Returns:
+            Terrain: Generated terrain of the window.
+
+        Raises:
+            ValueError: octaves is not positive.
+
+        """
+        return Terrain._wrap_array(self._get_heights(np.arange(x, x + width), np.arange(y, y + length)[:, np.newaxis],
+                                                     linearly_interpolated, octaves, lacunarity, persistence))
+
+    def sample(self, xs, ys, linearly_interpolated=False, octaves=1, lacunarity=2.0, persistence=0.5):
+        """Get heights of Perlin noise at some points only.
+
+        Heights are the same as those at the same points of window.
+
+        Args:
+            xs (np.ndarray): X coordinates of points.
+            ys (np.ndarray): Y coordinates of points, broadcastable with xs.
+            linearly_interpolated (bool): Whether to linearly interpolate values or use cubic function.
+            octaves (int): Number of octaves of noise to sum. Is > 0.
+            lacunarity (float): Factor by which frequency grows from one octave to the next.
+            persistence (float): Factor by which amplitude shrinks from one octave to the next.
+
+        Returns:
+            np.ndarray: Heights at points, of shape of xs and ys broadcast together.
+
+        Raises:
+            ValueError: octaves is not positive.
+
+        """
+        xs, ys = np.broadcast_arrays(np.asarray(xs), np.asarray(ys))
+        return self._get_heights(xs, ys, linearly_interpolated, octaves, lacunarity, persistence)
+
+    def _get_heights(self, xs, ys, linearly_interpolated, octaves, lacunarity, persistence):
+        """Get heights of Perlin noise, as for window and sample.
+
+        Args:
+            xs (np.ndarray): X coordinates of points.
+            ys (np.ndarray): Y coordinates of points, broadcastable with xs.
+            linearly_interpolated (bool): Whether to linearly interpolate values or use cubic function.
+            octaves (int): Number of octaves of noise to sum. Is > 0.
+            lacunarity (float): Factor by which frequency grows from one octave to the next.
+            persistence (float): Factor by which amplitude shrinks from one octave to the next.
+
+        Returns:
+            np.ndarray: Heights at points, rounded to 3 decimal places.
+
+        Raises:
+            ValueError: octaves is not positive.
+
         """
+        if octaves < 1:
+            raise ValueError("must have at least one octave")
         self._linearly_interpolated = bool(linearly_interpolated)
-        terr = Terrain(self._square_len * self._width_in_squares,
-                       self._square_len * self._length_in_squares)
-        for x in range(terr.width):
-            for y in range(terr.length):
-                terr[x, y] = self._get_noise_at(x, y)
-        return terr
+        grid_x = xs / float(self._square_len)
+        grid_y = ys / float(self._square_len)
+        total = 0
+        total_amplitude = 0
+        for octave in range(octaves):
+            frequency = lacunarity ** octave
+            amplitude = persistence ** octave
+            total = total + amplitude * self._get_noise_grid(grid_x * frequency, grid_y * frequency, octave)
+            total_amplitude += amplitude
+        # Can range from 0.5 to -0.5, add 0.5 to achieve proper result
+        heights = total / total_amplitude + 0.5
+        # Some margin of error, ensure is still between 0 and 1
+        heights = np.where((0 <= heights) & (heights <= 1), heights, np.round(heights))
+        return np.round(heights, 3)
+
+    def _get_noise_grid(self, grid_x, grid_y, octave=0):
+        """Get perlin noise at many points at once, before normalizing it to a height.
+
+        Gives exactly the same values as _get_noise_at, less 0.5.
+        With a TABLE lattice, points outside the grid of gradient vectors wrap around to the other side.
+
+        Args:
+            grid_x (np.ndarray): X coordinates of points within grid of gradient vectors.
+            grid_y (np.ndarray): Y coordinates of points within grid of gradient vectors, broadcastable with grid_x.
+                If grid_x is a row and grid_y a column, gives noise for the whole grid of points they span.
+            octave (int): Octave of noise, choosing gradient vectors of a HASHED lattice.
+
+        Returns:
+            np.ndarray: Interpolated influence values of points, between -0.5 and 0.5.
+
+        """
+        left_x = np.floor(grid_x)
+        upper_y = np.floor(grid_y)
+        if self._lattice == self.TABLE:
+            # Same corners as _get_corners, so that points on far edges use squares before them
+            left_x -= (grid_x == self._width_in_squares)
+            upper_y -= (grid_y == self._length_in_squares)
+        # Weights are worked out before broadcasting, so a whole grid only smoothens one row and one column of them
+        x_weight = grid_x - left_x
+        y_weight = grid_y - upper_y
+
+        get_gradients = lambda vec_x, vec_y: self._get_gradients(vec_x, vec_y, octave)
+        num_points = np.broadcast(grid_x, grid_y).size
+        if self._lattice == self.HASHED and num_points > 0:
+            min_x, min_y = int(left_x.min()), int(upper_y.min())
+            span = (int(upper_y.max()) - min_y + 2, int(left_x.max()) - min_x + 2)
+            if span[0] * span[1] <= num_points:
+                # hash each corner among points once, rather than once for each point around it
+                grad_xs, grad_ys = self._get_gradients(np.arange(min_x, min_x + span[1]),
+                                                       np.arange(min_y, min_y + span[0])[:, np.newaxis], octave)
+                get_gradients = lambda vec_x, vec_y: (
+                    grad_xs[(vec_y - min_y).astype(np.intp), (vec_x - min_x).astype(np.intp)],
+                    grad_ys[(vec_y - min_y).astype(np.intp), (vec_x - min_x).astype(np.intp)])
+
+        def influence_vals(vec_x, vec_y):
+            grad_x, grad_y = get_gradients(vec_x, vec_y)
+            return grad_x*(grid_x - vec_x) + grad_y*(grid_y - vec_y)
+
+        # ul = upper left, lr = lower right, etc.
+        ul_influence_vals = influence_vals(left_x, upper_y)
+        ur_influence_vals = influence_vals(left_x + 1, upper_y)
+        ll_influence_vals = influence_vals(left_x, upper_y + 1)
+        lr_influence_vals = influence_vals(left_x + 1, upper_y + 1)
+        upper_influence_vals = self._interpolate_between(ul_influence_vals, ur_influence_vals, x_weight)
+        lower_influence_vals = self._interpolate_between(ll_influence_vals, lr_influence_vals, x_weight)
+        return self._interpolate_between(upper_influence_vals, lower_influence_vals, y_weight)
 
     def _get_noise_at(self, x, y):
         """Get perlin noise at a point in terrain.
@@ -303,6 +783,8 @@ class PerlinGenerator(TerrainGenerator):
             tuple(int, int, int, int): Tuple of left x, right x, upper y and lower y.
 
         """
+        if self._lattice == self.HASHED:
+            return int(math.floor(x)), int(math.floor(x)) + 1, int(math.floor(y)), int(math.floor(y)) + 1
         left_x = (int(x)-1) if x == self._width_in_squares else int(x)
         right_x = int(x) if x == self._width_in_squares else (int(x) + 1)
         upper_y = (int(y)-1) if y == self._length_in_squares else int(y)
@@ -327,7 +809,10 @@ class PerlinGenerator(TerrainGenerator):
         """
         disp_x = x - vec_x
         disp_y = y - vec_y
-        grad_x, grad_y = self._grad_vecs[vec_y][vec_x]
+        if self._lattice == self.TABLE:
+            grad_x, grad_y = self._grad_vecs[vec_y][vec_x]
+        else:
+            grad_x, grad_y = (float(component) for component in self._get_gradients(vec_x, vec_y))
         return grad_x*disp_x + grad_y*disp_y
 
     def _interpolate_between(self, val0, val1, weight):
@@ -0,0 +1,414 @@
+"""Reading and writing of terrain height maps, a row at a time or memory mapped.
+
+The text .terr format has width and length on its first line, space delimited,
+followed by one line of space delimited heights per row.
+Rows can be read and written one at a time with the streaming functions below,
+so converting or inspecting a .terr file takes constant memory whatever its size.
+
+The binary .bterr format is a fixed size header followed by the raw height buffer, row by row:
+
+    magic (4 bytes, "BTER"), format version (uint16), header size (uint16),
+    dtype (8 bytes, numpy dtype string, null padded), width (uint64), length (uint64)
+
+All header fields are little endian. As the heights are stored exactly as in memory,
+a .bterr file can be memory mapped, and any sub-rectangle read without touching the rest of the file.
+
+The binary .bvterr format stores a Voronoi diagram alongside the heights, so it can be loaded
+without finding the closest point to every position again. Its header is
+
+    magic (4 bytes, "BVTR"), format version (uint16), header size (uint16),
+    dtype (8 bytes, as for .bterr), width (uint64), length (uint64),
+    number of points (uint64), number of feature points (uint64)
+
+followed by, all little endian:
+
+    heights (width * length, of dtype), region of each position (width * length, int32),
+    points (number of points * 2, float64, x then y),
+    start of each region's feature points (number of points + 1, int64),
+    feature points (number of feature points * 2, int32, x then y)
+
+"""
+
+from exceptions import *
+import numpy as np
+import itertools
+import struct
+import os
+
+
+TERR_CHUNK_SIZE = 1 << 16
+"""int: Default number of characters of text buffered before each write to a file."""
+BINARY_MAGIC = b"BTER"
+"""bytes: First bytes of every .bterr file."""
+BINARY_VERSION = 1
+"""int: Current version of .bterr format."""
+_BINARY_HEADER = struct.Struct("<4sHH8sQQ")
+"""struct.Struct: Layout of .bterr header."""
+BINARY_HEADER_SIZE = _BINARY_HEADER.size
+"""int: Size of .bterr header in bytes."""
+BINARY_DTYPES = ("<f8", "<f4", "<f2")
+"""tuple(str): Dtypes heights can be stored as in .bterr files."""
+VORONOI_MAGIC = b"BVTR"
+"""bytes: First bytes of every .bvterr file."""
+VORONOI_VERSION = 1
+"""int: Current version of .bvterr format."""
+_VORONOI_HEADER = struct.Struct("<4sHH8sQQQQ")
+"""struct.Struct: Layout of .bvterr header."""
+VORONOI_HEADER_SIZE = _VORONOI_HEADER.size
+"""int: Size of .bvterr header in bytes."""
+
+
+def write_chunked(file_obj, lines, chunk_size=TERR_CHUNK_SIZE):
+    """Write lines of text to a file, joined into chunks of bounded size.
+
+    Args:
+        file_obj (file): File-like object to write to.
+        lines (iterable[str]): Lines to write, each including its newline.
+        chunk_size (int): Number of characters to buffer before writing; single longer lines are written whole.
+
+    """
+    chunk = []
+    chunk_len = 0
+    for line in lines:
+        chunk.append(line)
+        chunk_len += len(line)
+        if chunk_len >= chunk_size:
+            file_obj.write("".join(chunk))
+            chunk = []
+            chunk_len = 0
+    if chunk:
+        file_obj.write("".join(chunk))
+
+
+def iter_terr_lines(rows):
+    """Format rows of heights as lines of a .terr file.
+
+    Each value is rounded to 4 decimal places.
+
+    Args:
+        rows (iterable[np.ndarray]): Rows of heights.
+
+    Yields:
+        str: One line of space delimited heights, including newline, per row.
+
+    """
+    for row in rows:
+        yield " ".join(str(x) for x in np.round(row, 4).tolist()) + "\n"
+
+
+def write_terr(file_obj, width, length, rows, chunk_size=TERR_CHUNK_SIZE):
+    """Write rows of heights in .terr format.
+
+    Args:
+        file_obj (file): Text file-like object to write to.
+        width (int): Width of terrain.
+        length (int): Length of terrain. Rows must yield this many rows.
+        rows (iterable[np.ndarray]): Rows of heights, each of width elements.
+        chunk_size (int): Number of characters to buffer before each write.
+
+    """
+    header = str(width) + " " + str(length) + "\n"
+    write_chunked(file_obj, itertools.chain([header], iter_terr_lines(rows)), chunk_size)
+
+
+def read_terr_header(file_obj):
+    """Read the first line of a .terr file.
+
+    Args:
+        file_obj (file): Text file-like object, positioned at start of file.
+
+    Returns:
+        tuple(int, int): Width and length of terrain.
+
+    Raises:
+        InvalidFileFormatError: First line is not a width and length.
+        InvalidDimensionsError: Width or length is 0, so rows could not be told apart from blank lines.
+
+    """
+    fields = file_obj.readline().split()
+    if len(fields) < 2:
+        raise InvalidFileFormatError()
+    try:
+        width, length = int(fields[0]), int(fields[1])
+    except ValueError:
+        raise InvalidFileFormatError()
+    if width < 0 or length < 0:
+        raise InvalidFileFormatError()
+    if width == 0 or length == 0:
+        raise InvalidDimensionsError()
+    return width, length
+
+
+def iter_terr_rows(file_obj, width, length):
+    """Read rows of heights from a .terr file, one at a time.
+
+    Args:
+        file_obj (file): Text file-like object, positioned after header (see read_terr_header).
+        width (int): Width of terrain.
+        length (int): Length of terrain.
+
+    Yields:
+        np.ndarray: Float64 array of width heights for each row, in order.
+
+    Raises:
+        InvalidFileFormatError: A row is not width heights, or file does not have exactly length rows.
+
+    """
+    rows_read = 0
+    for line in file_obj:
+        fields = line.split()
+        if not fields:
+            continue    # allow blank lines, e.g. at end of file
+        if rows_read == length or len(fields) != width:
+            raise InvalidFileFormatError()
+        try:
+            row = np.array(fields, dtype=np.float64)
+        except ValueError:
+            raise InvalidFileFormatError()
+        rows_read += 1
+        yield row
+    if rows_read != length:
+        raise InvalidFileFormatError()
+
+
+def convert_terr_to_binary(terr_file, bin_file, dtype="<f8"):
+    """Convert a .terr file to .bterr format, one row at a time.
+
+    Args:
+        terr_file (file): Text file-like object of .terr file, positioned at start of file.
+        bin_file (file): Binary file-like object to write .bterr file to.
+        dtype (str): Dtype to store heights as, one of BINARY_DTYPES.
+
+    Raises:
+        InvalidFileFormatError: terr_file does not conform to .terr format.
+        InvalidDimensionsError: Width or length of terr_file is 0.
+        InvalidOptionError: dtype is not one of BINARY_DTYPES.
+
+    """
+    width, length = read_terr_header(terr_file)
+    write_binary_header(bin_file, width, length, dtype)
+    for row in iter_terr_rows(terr_file, width, length):
+        bin_file.write(row.astype(dtype).tobytes())
+
+
+def write_binary_header(file_obj, width, length, dtype="<f8"):
+    """Write a .bterr header.
+
+    Args:
+        file_obj (file): Binary file-like object to write to.
+        width (int): Width of terrain.
+        length (int): Length of terrain.
+        dtype (str): Dtype of stored heights, one of BINARY_DTYPES.
+
+    Raises:
+        InvalidOptionError: dtype is not one of BINARY_DTYPES.
+
+    """
+    dtype = np.dtype(dtype).newbyteorder("<").str
+    if dtype not in BINARY_DTYPES:
+        raise InvalidOptionError()
+    file_obj.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_HEADER_SIZE,
+                                       dtype.encode("ascii"), width, length))
+
+
+def read_binary_header(file_obj):
+    """Read a .bterr header.
+
+    Args:
+        file_obj (file): Binary file-like object, positioned at start of file.
+
+    Returns:
+        tuple(int, int, np.dtype): Width, length, and dtype of stored heights.
+
+    Raises:
+        InvalidFileFormatError: Header is not a valid .bterr header.
+
+    """
+    header = file_obj.read(BINARY_HEADER_SIZE)
+    if len(header) != BINARY_HEADER_SIZE:
+        raise InvalidFileFormatError()
+    magic, version, header_size, dtype, width, length = _BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION or header_size != BINARY_HEADER_SIZE:
+        raise InvalidFileFormatError()
+    dtype = dtype.rstrip(b"\0").decode("ascii")
+    if dtype not in BINARY_DTYPES:
+        raise InvalidFileFormatError()
+    return width, length, np.dtype(dtype)
+
+
+def write_binary(file_obj, heights, dtype="<f8", chunk_rows=256):
+    """Write an array of heights in .bterr format.
+
+    Rows are converted and written a chunk at a time, so memory use is bounded whatever the dtype.
+
+    Args:
+        file_obj (file): Binary file-like object to write to.
+        heights (np.ndarray): Array of heights of shape (length, width).
+        dtype (str): Dtype to store heights as, one of BINARY_DTYPES.
+        chunk_rows (int): Number of rows to convert and write at once.
+
+    Raises:
+        InvalidOptionError: dtype is not one of BINARY_DTYPES.
+
+    """
+    length, width = heights.shape
+    write_binary_header(file_obj, width, length, dtype)
+    for y in range(0, length, chunk_rows):
+        file_obj.write(np.ascontiguousarray(heights[y:y+chunk_rows], dtype=dtype).tobytes())
+
+
+def map_binary(filename, mode="c"):
+    """Memory map the heights of a .bterr file.
+
+    No heights are read until they are accessed.
+
+    Args:
+        filename (str): Path to .bterr file.
+        mode (str): Memory map mode; "r" for read only, "r+" to write changes back to the file,
+            or "c" for copy-on-write, where changes are kept in memory only.
+
+    Returns:
+        np.memmap: Array of heights of shape (length, width).
+
+    Raises:
+        IOError: Cannot get given file.
+        InvalidFileFormatError: File does not conform to .bterr format.
+
+    """
+    if not os.path.isfile(filename):
+        raise IOError()
+    with open(filename, "rb") as bin_file:
+        width, length, dtype = read_binary_header(bin_file)
+    if os.path.getsize(filename) != BINARY_HEADER_SIZE + width * length * dtype.itemsize:
+        raise InvalidFileFormatError()
+    if width * length == 0:
+        return np.zeros((length, width), dtype=dtype)   # cannot map empty region of file
+    return np.memmap(filename, dtype=dtype, mode=mode, offset=BINARY_HEADER_SIZE, shape=(length, width))
+
+
+def read_binary_window(filename, x, y, width, length):
+    """Read a rectangle of heights from a .bterr file.
+
+    Only the rows of the file overlapping the rectangle are read.
+
+    Args:
+        filename (str): Path to .bterr file.
+        x (int): X coordinate of left of rectangle.
+        y (int): Y coordinate of top of rectangle.
+        width (int): Width of rectangle.
+        length (int): Length of rectangle.
+
+    Returns:
+        np.ndarray: Float64 array of heights of shape (length, width).
+
+    Raises:
+        IOError: Cannot get given file.
+        InvalidFileFormatError: File does not conform to .bterr format.
+        InvalidDimensionsError: Rectangle is not within stored heights.
+
+    """
+    heights = map_binary(filename, mode="r")
+    if not (0 <= x and 0 <= y and width >= 0 and length >= 0 and
+            x + width <= heights.shape[1] and y + length <= heights.shape[0]):
+        raise InvalidDimensionsError()
+    return np.array(heights[y:y+length, x:x+width], dtype=np.float64)
+
+
+def write_voronoi_binary(file_obj, heights, labels, points, feature_offsets, features, dtype="<f8", chunk_rows=256):
+    """Write a Voronoi diagram and its heights in .bvterr format.
+
+    Args:
+        file_obj (file): Binary file-like object to write to.
+        heights (np.ndarray): Array of heights of shape (length, width).
+        labels (np.ndarray): Index of closest point to each position, of shape (length, width).
+        points (np.ndarray): X-Y coordinates of points, of shape (number of points, 2).
+        feature_offsets (np.ndarray): Start of each region's feature points, plus end of last region's.
+        features (np.ndarray): X-Y coordinates of feature points, grouped by region, of shape (n, 2).
+        dtype (str): Dtype to store heights as, one of BINARY_DTYPES.
+        chunk_rows (int): Number of rows of heights and labels to convert and write at once.
+
+    Raises:
+        InvalidOptionError: dtype is not one of BINARY_DTYPES.
+
+    """
+    length, width = heights.shape
+    dtype = np.dtype(dtype).newbyteorder("<").str
+    if dtype not in BINARY_DTYPES:
+        raise InvalidOptionError()
+    file_obj.write(_VORONOI_HEADER.pack(VORONOI_MAGIC, VORONOI_VERSION, VORONOI_HEADER_SIZE, dtype.encode("ascii"),
+                                        width, length, len(points), len(features)))
+    for array, array_dtype in ((heights, dtype), (labels, "<i4")):
+        for y in range(0, length, chunk_rows):
+            file_obj.write(np.ascontiguousarray(array[y:y+chunk_rows], dtype=array_dtype).tobytes())
+    file_obj.write(np.ascontiguousarray(points, dtype="<f8").tobytes())
+    file_obj.write(np.ascontiguousarray(feature_offsets, dtype="<i8").tobytes())
+    file_obj.write(np.ascontiguousarray(features, dtype="<i4").tobytes())
+
+
+def _read_array(file_obj, dtype, count):
+    """Read an array from a binary file.
+
+    Args:
+        file_obj (file): Binary file-like object.
+        dtype (np.dtype): Dtype of array.
+        count (int): Number of elements.
+
+    Returns:
+        np.ndarray: Writeable 1D array of elements, in native byte order.
+
+    Raises:
+        InvalidFileFormatError: File ends before array does.
+
+    """
+    dtype = np.dtype(dtype)
+    data = file_obj.read(count * dtype.itemsize)
+    if len(data) != count * dtype.itemsize:
+        raise InvalidFileFormatError()
+    return np.frombuffer(data, dtype=dtype).astype(dtype.newbyteorder("="))
+
+
+def read_voronoi_binary(file_obj):
+    """Read a Voronoi diagram and its heights in .bvterr format.
+
+    Every array is read in one go, and checked for consistency:
+    region indices must be of existing points, and feature points within their regions.
+
+    Args:
+        file_obj (file): Binary file-like object, positioned at start of file.
+
+    Returns:
+        tuple(np.ndarray * 5): Float64 heights and int32 region of each position, both of shape (length, width),
+            float64 points of shape (number of points, 2), int64 start of each region's feature points
+            plus end of last region's, and int32 feature points of shape (number of feature points, 2).
+
+    Raises:
+        InvalidFileFormatError: File does not conform to .bvterr format.
+
+    """
+    header = file_obj.read(VORONOI_HEADER_SIZE)
+    if len(header) != VORONOI_HEADER_SIZE:
+        raise InvalidFileFormatError()
+    magic, version, header_size, dtype, width, length, num_points, num_features = _VORONOI_HEADER.unpack(header)
+    if magic != VORONOI_MAGIC or version != VORONOI_VERSION or header_size != VORONOI_HEADER_SIZE:
+        raise InvalidFileFormatError()
+    dtype = dtype.rstrip(b"\0").decode("ascii")
+    if dtype not in BINARY_DTYPES:
+        raise InvalidFileFormatError()
+    heights = _read_array(file_obj, dtype, width * length).astype(np.float64).reshape(length, width)
+    labels = _read_array(file_obj, "<i4", width * length).reshape(length, width)
+    points = _read_array(file_obj, "<f8", num_points * 2).reshape(num_points, 2)
+    feature_offsets = _read_array(file_obj, "<i8", num_points + 1)
+    features = _read_array(file_obj, "<i4", num_features * 2).reshape(num_features, 2)
+    if file_obj.read(1):
+        raise InvalidFileFormatError()
+    if labels.size and (labels.min() < 0 or labels.max() >= max(num_points, 1)):
+        raise InvalidFileFormatError()
+    if feature_offsets[0] != 0 or feature_offsets[-1] != num_features or (np.diff(feature_offsets) < 0).any():
+        raise InvalidFileFormatError()
+    if num_features:
+        regions = np.repeat(np.arange(num_points), np.diff(feature_offsets))
+        xs, ys = features[:, 0], features[:, 1]
+        if not ((0 <= xs) & (xs < width) & (0 <= ys) & (ys < length)).all() or \
+                (labels[ys.clip(0, length - 1), xs.clip(0, width - 1)] != regions).any():
+            raise InvalidFileFormatError()
+    return heights, labels, points, feature_offsets, features
@@ -13,7 +13,7 @@ setup(
     packages=['randterrainpy'],
     install_requires=[
         "matplotlib>=1.5.1",
-        "numpy>=1.6.2"
+        "numpy>=1.13"
     ],
     classifiers=[
         "Operating System :: OS Independent",
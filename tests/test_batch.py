@@ -0,0 +1,64 @@
+import unittest
+import pickle
+from randterrainpy import *
+
+
+class SeedSizedGenerator(TerrainGenerator):
+    """Generator making flat terrains whose width is their seed."""
+
+    def __call__(self, seed=None):
+        return Terrain(seed, 2)
+
+
+class BatchMeanGenerator(TerrainGenerator):
+    """Generator averaging a batch of pink noise terrains of its seed and the next, generated with generate_batch."""
+
+    def __call__(self, seed=None):
+        first, second = generate_batch(PinkNoiseGenerator(), [seed, seed + 1], (3,), processes=1)
+        return (first + second) * 0.5
+
+
+class GenerateBatchTester(unittest.TestCase):
+
+    def test_matches_serial(self):
+        gen = PinkNoiseGenerator()
+        seeds = [3, 1, 4, 1, 5]
+        for processes in [1, 2]:
+            terrains = generate_batch(gen, seeds, (4,), processes=processes)
+            self.assertEqual(len(terrains), len(seeds))
+            for ter, seed in zip(terrains, seeds):
+                self.assertEqual(ter, gen(4, seed=seed))
+        self.assertEqual(terrains[1], terrains[3])
+        self.assertNotEqual(terrains[0].as_array().tolist(), terrains[1].as_array().tolist())
+
+    def test_perlin(self):
+        gen = PerlinGenerator(4, 3, 2)
+        terrains = generate_batch(gen, [7, 8, 9], kwargs={"octaves": 2}, processes=2)
+        for ter, seed in zip(terrains, [7, 8, 9]):
+            self.assertEqual(ter, gen(octaves=2, seed=seed))
+            self.assertEqual(ter, PerlinGenerator(4, 3, 2, seed=seed)(octaves=2))
+
+    def test_presets_picklable(self):
+        for preset in [RedNoiseGenerator, PinkNoiseGenerator, WhiteNoiseGenerator, BlueNoiseGenerator,
+                       VioletNoiseGenerator]:
+            gen = pickle.loads(pickle.dumps(preset()))
+            self.assertEqual(gen(3, seed=2), preset()(3, seed=2))
+
+    def test_nested(self):
+        gen = BatchMeanGenerator()
+        for processes in [1, 2]:
+            terrains = generate_batch(gen, [1, 5, 9], processes=processes)
+            for ter, seed in zip(terrains, [1, 5, 9]):
+                self.assertEqual(ter, gen(seed=seed))
+
+    def test_empty(self):
+        self.assertEqual(generate_batch(PinkNoiseGenerator(), [], (3,)), [])
+
+    def test_different_sizes(self):
+        for processes in [1, 2]:
+            with self.assertRaises(InvalidDimensionsError):
+                generate_batch(SeedSizedGenerator(), [2, 2, 3], processes=processes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import numpy as np
+from randterrainpy import *
+import randterrainpy.erosion
+
+
+class ThermalErosionTester(unittest.TestCase):
+
+    def setUp(self):
+        self.heights = np.zeros((5, 6))
+        self.heights[2, 3] = 1
+
+    def test_conserves_height(self):
+        heights = np.random.RandomState(0).random_sample((20, 30))
+        total = heights.sum()
+        thermal_erode(heights, iterations=10, talus=0.1)
+        self.assertAlmostEqual(heights.sum(), total)
+        self.assertTrue(0 <= heights.min() and heights.max() <= 1)
+
+    def test_step(self):
+        engine = ThermalErosion(self.heights, 0.5)
+        self.assertEqual(engine.step(), 0.5 / 4)
+        self.assertEqual(self.heights[2, 3], 0.5)
+        self.assertEqual(self.heights[3, 3], 0.125)
+        self.assertEqual(self.heights[0, 0], 0)
+
+    def test_whole_excess_moved(self):
+        # as with the original algorithm, the whole excess above talus moves to a position with one donor
+        heights = np.array([[1.0, 0.0]])
+        thermal_erode(heights, talus=0.5)
+        self.assertEqual(heights.tolist(), [[0.5, 0.5]])
+
+    def test_iterations(self):
+        for talus, budget in ((0.05, 20), (0.1, 10)):
+            heights = np.random.RandomState(0).random_sample((24, 24))
+            stats = thermal_erode(heights, iterations=100, talus=talus, tol=1e-4)
+            self.assertTrue(stats.iterations <= budget)
+            self.assertTrue(0 <= heights.min() and heights.max() <= 1)
+
+    def test_pit_stays_lower(self):
+        # a pit receives from all four neighbours at once, but is never raised above the height they had
+        ter = Terrain(5, 5)
+        for x in range(5):
+            for y in range(5):
+                ter[x, y] = 1 if (x, y) != (2, 2) else 0
+        ter.thermal_erode(talus=0.5)
+        self.assertEqual(ter[2, 2], 0.5)
+        self.assertTrue(ter[2, 2] <= min([ter[1, 2], ter[3, 2], ter[2, 1], ter[2, 3]]))
+        donors = max([ter[1, 2], ter[3, 2], ter[2, 1], ter[2, 3]])
+        ter.thermal_erode(talus=0.0)
+        self.assertTrue(ter[2, 2] <= donors)
+        self.assertTrue(0 <= ter.as_array().min() and ter.as_array().max() <= 1)
+        ter.thermal_erode(iterations=50, talus=0.0)
+        self.assertTrue(0 <= ter.as_array().min() and ter.as_array().max() <= 1)
+        self.assertTrue(ter[2, 2] <= ter[1, 2])
+
+    def test_early_stop(self):
+        stats = thermal_erode(self.heights, iterations=100, talus=0.5, tol=0.01)
+        self.assertTrue(stats.iterations < 100)
+        self.assertTrue(stats.residual <= 0.01)
+        stats = thermal_erode(np.zeros((3, 3)), iterations=100)
+        self.assertEqual((stats.iterations, stats.residual), (1, 0))
+
+    def test_no_neighbours(self):
+        self.assertEqual(thermal_erode(np.ones((1, 1))).residual, 0)
+
+
+class ActiveThermalErosionTester(unittest.TestCase):
+
+    def test_same_as_full(self):
+        full = np.random.RandomState(1).random_sample((25, 40)) ** 4
+        active = full.copy()
+        full_stats = thermal_erode(full, iterations=30, talus=0.05)
+        active_stats = thermal_erode(active, iterations=30, talus=0.05, active_set=True)
+        self.assertTrue(np.array_equal(full, active))
+        self.assertEqual(full_stats.iterations, active_stats.iterations)
+        self.assertEqual(full_stats.residual, active_stats.residual)
+
+    def test_active_cells(self):
+        heights = np.zeros((50, 50))
+        heights[25, 25] = 1
+        stats = thermal_erode(heights, iterations=20, talus=0.1, active_set=True)
+        self.assertEqual(stats.active_cells[0], 2500)
+        self.assertTrue(all(count < 100 for count in stats.active_cells[1:]))
+        self.assertIsNone(thermal_erode(heights).active_cells)
+
+
+class ParallelThermalErosionTester(unittest.TestCase):
+
+    def test_same_as_full(self):
+        full = np.random.RandomState(2).random_sample((23, 17)) ** 4
+        parallel = full.copy()
+        full_stats = thermal_erode(full, iterations=8, talus=0.05)
+        parallel_stats = thermal_erode(parallel, iterations=8, talus=0.05, processes=3)
+        self.assertTrue(np.array_equal(full, parallel))
+        self.assertEqual(full_stats.residual, parallel_stats.residual)
+
+    def test_failure_leaves_heights(self):
+        heights = np.random.RandomState(2).random_sample((23, 17)) ** 4
+        original = heights.copy()
+        step = randterrainpy.erosion.ParallelThermalErosion.step
+
+        def failing_step(engine):
+            step(engine)
+            raise RuntimeError("worker failed")
+        randterrainpy.erosion.ParallelThermalErosion.step = failing_step
+        try:
+            with self.assertRaises(RuntimeError):
+                thermal_erode(heights, iterations=8, talus=0.05, processes=3)
+        finally:
+            randterrainpy.erosion.ParallelThermalErosion.step = step
+        self.assertTrue(np.array_equal(heights, original))
+        stats = thermal_erode(heights, iterations=8, talus=0.05, processes=3)
+        self.assertFalse(np.array_equal(heights, original))
+        self.assertTrue(stats.seconds >= 0)
+
+    def test_invalid(self):
+        self.assertRaises(InvalidOptionError, thermal_erode, np.zeros((4, 4)), active_set=True, processes=2)
+        self.assertRaises(InvalidOptionError, thermal_erode, np.zeros((1, 4)), active_set=True, processes=2)
+
+
+class HydraulicErosionTester(unittest.TestCase):
+
+    def setUp(self):
+        x, y = np.meshgrid(np.linspace(0, 1, 40), np.linspace(0, 1, 30))
+        self.heights = 0.5 + 0.3 * np.sin(6 * x) * np.cos(5 * y)
+
+    def test_seed(self):
+        first, second = self.heights.copy(), self.heights.copy()
+        hydraulic_erode(first, droplets=500, seed=3, batch_size=100)
+        hydraulic_erode(second, droplets=500, seed=3, batch_size=100)
+        self.assertTrue(np.array_equal(first, second))
+        self.assertFalse(np.array_equal(first, self.heights))
+        self.assertTrue(0 <= first.min() and first.max() <= 1)
+
+    def test_stats(self):
+        stats = hydraulic_erode(self.heights, droplets=250, seed=0, batch_size=100)
+        self.assertEqual(stats.droplets, 250)
+        self.assertTrue(stats.droplets_per_second > 0)
+
+    def test_flat(self):
+        heights = np.zeros((10, 10))
+        hydraulic_erode(heights, droplets=100, seed=0)     # droplets stop immediately on flat ground
+        self.assertTrue(np.array_equal(heights, np.zeros((10, 10))))
+
+    def test_speed_on_slope(self):
+        # heights fall steadily with x
+        engine = HydraulicErosion(np.tile(np.linspace(1, 0, 20), (5, 1)))
+        pos_x, pos_y = np.array([3.0, 10.5]), np.array([2.0, 1.5])
+        speed = np.array([1.0, 0.5])
+        height = engine._sample(pos_x, pos_y)[0]
+        downhill = engine._sample(pos_x + 1, pos_y)[0] - height
+        uphill = engine._sample(pos_x - 1, pos_y)[0] - height
+        self.assertTrue(np.all(downhill < 0))
+        self.assertTrue(np.all(engine._update_speed(speed, downhill) > speed))
+        self.assertTrue(np.all(engine._update_speed(speed, uphill) < speed))
+        self.assertTrue(np.all(engine._update_speed(speed, 0 * uphill) == speed))
+
+
+if __name__ == "__main__":
+    unittest.main()
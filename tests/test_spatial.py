@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from randterrainpy import *
+
+
+def brute_force_labels(points, width, length):
+    """Label map as made by comparing every position with every point, in order."""
+    labels = np.zeros((length, width), dtype=int)
+    for x in range(width):
+        for y in range(length):
+            min_dist = width**2 + length**2
+            for i, pnt in enumerate(points):
+                dist_squared = (pnt[0] - x)**2 + (pnt[1] - y)**2
+                if dist_squared < min_dist:
+                    min_dist = dist_squared
+                    labels[y, x] = i
+    return labels
+
+
+class NearestSeedMapTester(unittest.TestCase):
+
+    def test_random_points(self):
+        rand = np.random.RandomState(4)
+        points = [tuple(p) for p in rand.randint(0, 40, (60, 2)).tolist()]
+        labels, dists = nearest_seed_map(points, 40, 33)
+        self.assertTrue(np.array_equal(labels, brute_force_labels(points, 40, 33)))
+        self.assertEqual(dists[points[0][1] % 33, points[0][0]], 0 if points[0][1] < 33 else dists[0, 0])
+
+    def test_ties(self):
+        points = [(4, 0), (0, 4), (4, 4), (0, 0), (4, 0), (2.5, 7.5), (-3, 20)]
+        self.assertTrue(np.array_equal(nearest_seed_map(points, 9, 11)[0], brute_force_labels(points, 9, 11)))
+
+    def test_far_points(self):
+        points = [(100, 100), (-50, 3)]
+        self.assertTrue(np.array_equal(nearest_seed_map(points, 5, 5)[0], np.zeros((5, 5))))
+        self.assertTrue(np.array_equal(nearest_seed_map([], 5, 5)[0], np.zeros((5, 5))))
+
+    def test_seed_grid(self):
+        grid = SeedGrid([(0, 0), (9, 9), (5, 5)], 10, 10, bucket_size=5)
+        self.assertEqual(grid.seeds_near(0, 0, 0).tolist(), [0])
+        self.assertEqual(grid.seeds_near(0, 0, 1).tolist(), [0, 1, 2])
+
+    def test_nearest_seeds(self):
+        points = [(4, 0), (0, 4), (4, 4), (0, 0), (4, 0), (2.5, 7.5)]
+        xs, ys = np.array([0, 4, 3, 8]), np.array([0, 0, 9, 10])
+        labels, dists = nearest_seeds(points, xs, ys, 9, 11)
+        self.assertEqual(labels.tolist(), brute_force_labels(points, 9, 11)[ys, xs].tolist())
+        labels, dists = nearest_seeds(points, xs, ys, 9, 11, exclude=0)
+        self.assertEqual(labels.tolist(), [3, 4, 5, 5])
+        self.assertEqual(dists.tolist(), [0, 0, 2.5, 36.5])
+
+
+class PointSamplerTester(unittest.TestCase):
+
+    def test_uniform_points(self):
+        for num_points in (0, 1, 50, 300, 320):
+            points = uniform_points(20, 16, num_points, seed=3)
+            self.assertEqual(len(points), num_points)
+            self.assertEqual(len(set(points)), num_points)
+            self.assertTrue(all(0 <= x < 20 and 0 <= y < 16 for x, y in points))
+        self.assertEqual(uniform_points(20, 16, 50, seed=3), uniform_points(20, 16, 50, seed=3))
+        self.assertRaises(ValueError, uniform_points, 20, 16, 321)
+
+    def test_poisson_disk_points(self):
+        points = poisson_disk_points(60, 45, 5, seed=7)
+        coords = np.array(points)
+        dist_squared = ((coords[:, np.newaxis] - coords[np.newaxis]) ** 2).sum(axis=2)
+        np.fill_diagonal(dist_squared, 25)
+        self.assertGreaterEqual(dist_squared.min(), 25)
+        self.assertTrue(((0 <= coords) & (coords < (60, 45))).all())
+        # no room left for another point anywhere on grid
+        ys, xs = np.mgrid[0:45, 0:60]
+        gaps = ((xs.ravel()[:, np.newaxis] - coords[:, 0]) ** 2 + (ys.ravel()[:, np.newaxis] - coords[:, 1]) ** 2)
+        self.assertLess(gaps.min(axis=1).max(), 100)
+        self.assertEqual(len(poisson_disk_points(60, 45, 5, num_points=10, seed=7)), 10)
+        self.assertEqual(poisson_disk_points(60, 45, 5, seed=7), points)
+        self.assertRaises(ValueError, poisson_disk_points, 60, 45, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
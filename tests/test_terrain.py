@@ -1,4 +1,9 @@
 import unittest
+import tempfile
+import shutil
+import random
+import math
+import numpy as np
 from randterrainpy import *
 
 
@@ -23,6 +28,24 @@ class TerrainTester(unittest.TestCase):
         self.ter2[1, 2] = 0.5
         self.assertEqual(self.ter2[1, 2], 0.5)
 
+    def test_from_array(self):
+        heights = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+        ter = Terrain.from_array(heights)
+        self.assertEqual((ter.width, ter.length), (2, 3))
+        self.assertEqual(ter[1, 2], 0.6)
+        heights[2, 1] = 0.7     # no copy, so shares buffer
+        self.assertEqual(ter[1, 2], 0.7)
+        self.assertNotEqual(Terrain.from_array(heights, copy=True).as_array().ctypes.data, heights.ctypes.data)
+        self.assertRaises(HeightOutOfBoundsError, Terrain.from_array, heights * 2)
+        self.assertRaises(InvalidDimensionsError, Terrain.from_array, np.zeros(4))
+
+    def test_as_array(self):
+        arr = self.ter2.as_array()
+        self.assertEqual(arr.shape, (4, 2))
+        arr[2, 1] = 0.5
+        self.assertEqual(self.ter2[1, 2], 0.5)
+        self.assertEqual(Terrain.from_array(arr), self.ter2)
+
     def test_add(self):
         self.assertRaises(InvalidDimensionsError, self.ter1.__add__, self.ter2)
         self.assertEqual(self.ter1+self.ter3, self.ter1)
@@ -41,10 +64,427 @@ class TerrainTester(unittest.TestCase):
         self.assertEqual(self.ter1*0, Terrain(self.ter1.width, self.ter1.length))
         self.assertEqual(self.ter2*1, self.ter2)
         self.assertNotEqual(self.ter2*0.5, self.ter2)
+        test_ter = Terrain(1, 1)
+        test_ter[0, 0] = 0.8
+        self.assertRaises(HeightOutOfBoundsError, test_ter.__mul__, 2)
+
+    def test_inplace(self):
+        test_ter = Terrain(1, 1)
+        test_ter[0, 0] = 0.75
+        buf = test_ter.as_array()
+        test_ter += test_ter
+        self.assertIs(test_ter.as_array(), buf)
+        self.assertEqual(test_ter[0, 0], 1)
+        test_ter *= 0.5
+        self.assertEqual(test_ter[0, 0], 0.5)
+        test_ter -= self.ter3
+        self.assertEqual(test_ter[0, 0], 0.5)
+        with self.assertRaises(HeightOutOfBoundsError):
+            test_ter *= 3
+        self.assertEqual(test_ter[0, 0], 0.5)     # unaltered after failure
+        self.assertRaises(InvalidDimensionsError, self.ter1.__iadd__, self.ter2)
+
+    def test_out_of_bounds(self):
+        test_ter = Terrain.from_array(np.array([[0.2, 0.8]]))
+        self.assertEqual(test_ter.mul(2, out_of_bounds=Terrain.CLAMP).as_array().tolist(), [[0.4, 1]])
+        self.assertEqual(test_ter.mul(2, out_of_bounds=Terrain.RESCALE).as_array().tolist(), [[0.25, 1]])
+        self.assertRaises(HeightOutOfBoundsError, test_ter.add, test_ter, out_of_bounds=Terrain.RAISE)
+        self.assertRaises(InvalidOptionError, test_ter.add, test_ter, out_of_bounds="wrap")
+
+    def test_str(self):
+        self.ter2[1, 2] = 0.5
+        self.assertEqual(str(self.ter2), "0.0\t0.0\n0.0\t0.0\n0.0\t0.5\n0.0\t0.0\n")
+
+    def test_save_load(self):
+        path = tempfile.mkdtemp() + "/"
+        try:
+            test_ter = Terrain.from_array(np.round(np.random.random((5, 3)), 4))
+            test_ter.save_terrain(path, "test")
+            self.assertEqual(Terrain.load_terrain(path, "test"), test_ter)
+            self.assertRaises(IOError, Terrain.load_terrain, path, "missing")
+
+            class SubTerrain(Terrain):
+                pass
+            self.assertEqual(type(SubTerrain.load_terrain(path, "test")), SubTerrain)
+        finally:
+            shutil.rmtree(path)
+
+    def test_save_load_binary(self):
+        path = tempfile.mkdtemp() + "/"
+        try:
+            test_ter = Terrain.from_array(np.random.random((5, 3)))
+            test_ter.save_terrain_binary(path, "test")
+            self.assertEqual(Terrain.load_terrain_binary(path, "test"), test_ter)
+            window = Terrain.load_terrain_binary(path, "test", window=(1, 2, 2, 3))
+            self.assertTrue(np.array_equal(window.as_array(), test_ter.as_array()[2:5, 1:3]))
+            test_ter.save_terrain_binary(path, "test32", dtype="<f4")
+            self.assertTrue(np.allclose(Terrain.load_terrain_binary(path, "test32").as_array(), test_ter.as_array()))
+            self.assertRaises(IOError, Terrain.load_terrain_binary, path, "missing")
+
+            class SubTerrain(Terrain):
+                pass
+            self.assertEqual(type(SubTerrain.load_terrain_binary(path, "test")), SubTerrain)
+            self.assertEqual(type(SubTerrain.load_terrain_binary(path, "test", window=(0, 0, 1, 1))), SubTerrain)
+        finally:
+            shutil.rmtree(path)
+
+    def test_thermal_erode(self):
+        test_ter = Terrain(3, 3)
+        test_ter[1, 1] = 1
+        stats = test_ter.thermal_erode(iterations=50, talus=0.2, tol=1e-4)
+        self.assertTrue(stats.iterations < 50)
+        self.assertAlmostEqual(test_ter.as_array().sum(), 1)
+        self.assertTrue(test_ter[1, 1] < 1)
+
+    def test_hydraulic_erode(self):
+        test_ter = Terrain.from_array(np.linspace(0, 1, 100).reshape(10, 10))
+        original = Terrain.from_array(test_ter.as_array(), copy=True)
+        stats = test_ter.hydraulic_erode(droplets=50, seed=1, max_steps=10)
+        self.assertEqual(stats.droplets, 50)
+        self.assertNotEqual(test_ter.as_array().tolist(), original.as_array().tolist())
 
 
 class VoronoiTerrainTester(unittest.TestCase):
-    pass
+
+    def setUp(self):
+        self.points = [(1, 1), (8, 2), (4, 6), (1, 1)]
+        self.vter = VoronoiTerrain(10, 8, self.points)
+
+    def test_regions(self):
+        self.assertEqual(self.vter.get_closest_point(0, 0), 0)
+        self.assertEqual(self.vter.get_closest_point(9, 0), 1)
+        self.assertEqual(self.vter.get_closest_point(4, 7), 2)
+        self.assertEqual(sum(len(self.vter.get_region(*p)) for p in self.points[:3]), 80)
+        self.assertEqual(self.vter.get_region(1, 1)[:2], [(0, 0), (0, 1)])
+        self.assertTrue((0, 0) in self.vter.get_region(1, 1))
+        self.assertFalse((9, 0) in self.vter.get_region(1, 1))
+        for x, y in self.vter.get_region(8, 2):
+            self.assertEqual(self.vter.get_closest_point(x, y), 1)
+        self.assertEqual(self.vter.get_region_cells(4, 6).tolist(),
+                         sorted(y * 10 + x for x, y in self.vter.get_region(4, 6)))
+        self.assertFalse(self.vter.get_region_cells(4, 6).flags.writeable)
+        self.assertRaises(ValueError, self.vter.get_region, 5, 5)
+
+    def test_feature_points(self):
+        self.vter.add_feature_point(8, 2, 9, 0)
+        self.vter.add_feature_point(8, 2, 7, 3)
+        self.assertRaises(OutOfRegionError, self.vter.add_feature_point, 8, 2, 0, 0)
+        self.assertRaises(OutOfRegionError, self.vter.add_feature_point, 8, 2, 10, 0)
+        self.vter.remove_feature_point(8, 2, 9, 0)
+        self.assertEqual(self.vter.get_feature_points(8, 2), [(7, 3)])
+        self.assertRaises(OutOfRegionError, self.vter.remove_feature_point, 8, 2, 9, 0)
+
+    def test_feature_points_grouped(self):
+        # points added one at a time, to regions in any order, stay grouped by region in order added
+        added = {}
+        for (x, y), region in zip([(1, 1), (8, 2), (0, 0), (9, 1), (2, 3), (8, 0)], [(1, 1), (8, 2), (1, 1), (8, 2),
+                                                                                      (1, 1), (8, 2)]):
+            self.vter.add_feature_point(region[0], region[1], x, y)
+            added.setdefault(region, []).append((x, y))
+        for region, features in added.items():
+            self.assertEqual(self.vter.get_feature_points(*region), features)
+        self.assertEqual(self.vter._feature_offsets.tolist(), [0, 3, 6, 6, 6])
+
+    def test_feature_point_factors(self):
+        vter = VoronoiTerrain(10, 8, [(0, 0)])
+        vter.add_feature_point(0, 0, 0, 0)
+        vter.add_feature_point_factors(0, 0, [0.5])
+        self.assertEqual(vter[0, 0], 0)
+        self.assertEqual(vter[5, 0], 0.25)
+        self.assertEqual(vter[5, 4], 0.25)
+        self.assertEqual(vter[0, 6], 0.375)
+        self.assertRaises(InvalidCoefficientCountError, vter.add_feature_point_factors, 0, 0, [0.5, 0.5])
+        self.assertRaises(HeightOutOfBoundsError, vter.add_feature_point_factors, 0, 0, [-1])
+        self.assertEqual(vter[5, 0], 0.25)
+
+    def test_all_feature_point_factors(self):
+        points = [(3, 3), (20, 2), (10, 9), (4, 15), (18, 14), (12, 1)]
+        vter = VoronoiTerrain(23, 17, points)
+        random.seed(5)     # feature points are placed by the random module
+        for x, y in points[:5]:
+            vter.add_random_feature_points(x, y, random.randint(1, 3))
+        coeffs = [[0.2, 0.1, 0.05][:len(vter.get_feature_points(x, y))] for x, y in points]
+        vter.add_all_feature_point_factors(coeffs)
+        single = VoronoiTerrain(23, 17, points)
+        for i, (x, y) in enumerate(points):
+            for feat_x, feat_y in vter.get_feature_points(x, y):
+                single.add_feature_point(x, y, feat_x, feat_y)
+            single.add_feature_point_factors(x, y, coeffs[i])
+        self.assertEqual(vter, single)
+        for px in range(23):
+            for py in range(17):
+                self.assertAlmostEqual(vter[px, py], round(self.brute_force_factor(vter, coeffs, px, py), 3), places=3)
+        self.assertRaises(InvalidCoefficientCountError, vter.add_all_feature_point_factors, coeffs[:5])
+
+    def test_thin_region_feature_point_factors(self):
+        # one column wide regions along the last column, cut short of the side of the terrain by regions
+        # only holding positions between them, or none, so bounded by points of regions not adjacent to them
+        thin = [(4, 4), (4, 12)] + [(19, y) for y in range(0, 16, 3)] + [(19.8, y + 1.5) for y in range(0, 16, 3)]
+        # a region here reaches beyond the bounding box of its positions, so is worked out again
+        beyond = [(17.1, 14.9), (4.4, 9.8), (14.6, 9.5), (10.5, 5.1), (2.9, 12.0), (2.0, 7.3), (-0.2, 12.8), (5.2, 3.0)]
+        for points, width, length in [(thin, 20, 16), (beyond, 18, 15)]:
+            vter = VoronoiTerrain(width, length, points)
+            rand = random.Random(6)
+            for x, y in points:
+                region = vter.get_region(x, y)
+                for feature in rand.sample(region, min(2, len(region))):
+                    vter.add_feature_point(x, y, *feature)
+            coeffs = [[0.2, 0.1][:len(vter.get_feature_points(x, y))] for x, y in points]
+            cells, additions = vter._feature_point_factors(range(len(points)), coeffs)
+            self.assertEqual(sorted(cells.tolist()), list(range(width * length)))
+            self.assertTrue(np.allclose(vter._feature_point_factors(range(len(points)), coeffs, chunk_size=7)[1],
+                                        additions))
+            for cell, addition in zip(cells.tolist(), additions.tolist()):
+                self.assertAlmostEqual(addition, self.brute_force_factor(vter, coeffs, cell % width, cell // width))
+
+    def brute_force_factor(self, vter, coeffs, px, py):
+        points = vter.points
+        i = vter.get_closest_point(px, py)
+        feats = sorted(vter.get_feature_points(*points[i]), key=lambda f: (px - f[0]) ** 2 + (py - f[1]) ** 2)
+        expected = 0
+        for (fx, fy), coeff in zip(feats, coeffs[i]):
+            # furthest fraction of the way to the edge of any half plane, or side of terrain
+            fractions = [0]
+            fractions += ([(px - fx) / float(vter.width - fx)] if px > fx else
+                          [(fx - px) / float(fx)] if px < fx else [])
+            fractions += ([(py - fy) / float(vter.length - fy)] if py > fy else
+                          [(fy - py) / float(fy)] if py < fy else [])
+            for j, (ox, oy) in enumerate(points):
+                nx, ny = ox - points[i][0], oy - points[i][1]
+                toward = nx * (px - fx) + ny * (py - fy)
+                if j != i and toward > 0:
+                    room = (nx * (ox + points[i][0]) + ny * (oy + points[i][1])) / 2.0 - nx * fx - ny * fy
+                    fractions.append(toward / room)
+            expected += min(max(fractions), 1) * coeff
+        return expected
+
+    def test_random_points(self):
+        self.vter.set_uniform_random_points(80, seed=1)
+        self.assertEqual(sorted(self.vter.points), [(x, y) for x in range(10) for y in range(8)])
+        self.vter.set_poisson_disk_points(3, seed=1)
+        self.assertTrue(len(self.vter.points) > 1)
+        self.assert_matches_rebuild(self.vter)
+
+    def test_save_load(self):
+        path = tempfile.mkdtemp() + "/"
+        try:
+            self.vter.set_region_height(8, 2, 0.25)
+            self.vter.add_feature_point(8, 2, 9, 0)
+            self.vter.add_feature_point(8, 2, 7, 3)
+            self.vter.add_feature_point(4, 6, 4, 7)
+            self.vter.save_terrain(path, "test")
+            loaded = VoronoiTerrain.load_terrain(path, "test")
+            self.assertEqual(loaded, self.vter)
+            self.assertEqual(loaded.points, self.points)
+            self.assertEqual(loaded.get_feature_points(8, 2), [(9, 0), (7, 3)])
+            self.assertRaises(IOError, VoronoiTerrain.load_terrain, path, "missing")
+        finally:
+            shutil.rmtree(path)
+
+    def test_save_load_binary(self):
+        path = tempfile.mkdtemp() + "/"
+        try:
+            self.vter.add_point(2.5, 7.5)
+            self.vter.set_region_height(8, 2, 0.25)
+            self.vter.add_feature_point(8, 2, 9, 0)
+            self.vter.add_feature_point(8, 2, 7, 3)
+            self.vter.add_feature_point(2.5, 7.5, 2, 7)
+            self.vter.save_terrain_binary(path, "test")
+            loaded = VoronoiTerrain.load_terrain_binary(path, "test")
+            self.assertEqual(loaded, self.vter)
+            self.assertEqual(loaded.points, self.vter.points)
+            self.assertEqual(type(loaded.points[0][0]), int)
+            self.assertEqual(loaded.get_feature_points(8, 2), [(9, 0), (7, 3)])
+            self.assertEqual(loaded.get_feature_points(2.5, 7.5), [(2, 7)])
+            self.assertEqual(loaded.get_feature_points(1, 1), [])
+            # index and bounds of regions are only found once used
+            self.assertIsNone(loaded._region_cells)
+            self.assertIsNone(loaded._region_bounds)
+            self.assert_matches_rebuild(loaded)
+            # bound of distances to closest points is only found once regions are updated
+            self.assertIsNone(loaded._max_region_dist)
+            loaded.add_point(5, 0)
+            self.assertEqual(loaded._max_region_dist, VoronoiTerrain(10, 8, self.vter.points)._max_region_dist)
+            self.assert_matches_rebuild(loaded)
+            for update in (lambda ter: ter.add_point(5, 0), lambda ter: ter.remove_point(8, 2),
+                           lambda ter: ter.move_point(8, 2, 0, 0)):
+                loaded = VoronoiTerrain.load_terrain_binary(path, "test")
+                update(loaded)
+                self.assert_matches_rebuild(loaded)
+            VoronoiTerrain(6, 5, []).save_terrain_binary(path, "empty")
+            loaded = VoronoiTerrain.load_terrain_binary(path, "empty")
+            loaded.add_point(2, 2)
+            self.assert_matches_rebuild(loaded)
+            self.assertRaises(IOError, VoronoiTerrain.load_terrain_binary, path, "missing")
+        finally:
+            shutil.rmtree(path)
+
+    def test_region_heights_and_stats(self):
+        self.vter.set_region_heights([0.25, 0.5, 0.75, 1])
+        for x in range(10):
+            for y in range(8):
+                self.assertEqual(self.vter[x, y], [0.25, 0.5, 0.75][self.vter.get_closest_point(x, y)])
+        self.assertRaises(InvalidDimensionsError, self.vter.set_region_heights, [0.25, 0.5, 0.75])
+        self.assertRaises(HeightOutOfBoundsError, self.vter.set_region_heights, [0.25, 0.5, 0.75, 2])
+        self.assertEqual(self.vter[0, 0], 0.25)
+        stats = self.vter.region_stats()
+        areas = [len(self.vter.get_region(*p)) for p in self.points[:3]]
+        self.assertEqual(stats.area.tolist(), areas + [0])
+        self.assertEqual(stats.mean[:3].tolist(), [0.25, 0.5, 0.75])
+        self.assertTrue(np.isnan(stats.max[3]))
+        self.assertTrue(self.vter.region_stats() is stats)
+        self.vter[0, 0] = 1
+        stats = self.vter.region_stats()
+        self.assertEqual(stats.max[0], 1)
+        self.assertAlmostEqual(stats.mean[0], 0.25 + 0.75 / areas[0])
+        self.vter.as_array()[0, 0] = 0
+        self.assertTrue(self.vter.region_stats() is stats)
+        self.vter.heights_changed()
+        self.assertEqual(self.vter.region_stats().min[0], 0)
+        self.vter.add_point(4, 2)
+        self.assertEqual(len(self.vter.region_stats().area), 5)
+
+    def test_all_random_feature_points(self):
+        self.vter.add_feature_point(8, 2, 9, 0)
+        self.vter.add_all_random_feature_points([2, 3, 1, 0], seed=4)
+        for i, (x, y) in enumerate(self.points[:3]):
+            features = self.vter.get_feature_points(x, y)
+            self.assertEqual(len(features), [2, 4, 1][i])
+            self.assertTrue(all(self.vter.get_closest_point(*f) == i for f in features))
+        self.assertEqual(self.vter.get_feature_points(8, 2)[0], (9, 0))
+        self.assertEqual(len(set(self.vter.get_feature_points(1, 1))), 2)
+        self.assertRaises(ValueError, self.vter.add_all_random_feature_points, 1)
+        self.assertRaises(InvalidDimensionsError, self.vter.add_all_random_feature_points, [1, 1])
+        sizes = [len(self.vter.get_region(*p)) for p in self.points[:3]]
+        vter = VoronoiTerrain(10, 8, self.points[:3])
+        vter.add_all_random_feature_points(sizes)
+        for (x, y), region in zip(self.points[:3], [vter.get_region(*p) for p in self.points[:3]]):
+            self.assertEqual(sorted(vter.get_feature_points(x, y)), sorted(region))
+        vter.remove_point(8, 2)
+        self.assertEqual(len(vter.get_feature_points(1, 1)), sizes[0])
+        vter.move_point(4, 6, 4, 5)
+        self.assertTrue(all(vter.get_closest_point(*f) == 1 for f in vter.get_feature_points(4, 5)))
+
+    def test_set_region_height(self):
+        self.vter.set_region_height(4, 6, 0.5)
+        for x in range(10):
+            for y in range(8):
+                self.assertEqual(self.vter[x, y], 0.5 if self.vter.get_closest_point(x, y) == 2 else 0)
+        self.assertRaises(HeightOutOfBoundsError, self.vter.set_region_height, 4, 6, 1.5)
+
+    def test_lloyd_relax(self):
+        expected = []
+        for i, (x, y) in enumerate(self.points):
+            region = [(rx, ry) for rx in range(10) for ry in range(8) if self.vter.get_closest_point(rx, ry) == i]
+            if region:
+                expected.append((sum(p[0] for p in region) // len(region), sum(p[1] for p in region) // len(region)))
+            else:
+                expected.append((x, y))   # empty region keeps its point
+        iterations, residual = self.vter.lloyd_relax()
+        self.assertEqual(self.vter.points, expected)
+        self.assertEqual(iterations, 1)
+        self.assertAlmostEqual(residual, max(math.hypot(x - ex, y - ey)
+                                             for (x, y), (ex, ey) in zip(self.points, expected)))
+        self.assert_matches_rebuild(self.vter)
+        iterations, residual = self.vter.lloyd_relax(100)
+        self.assertLess(iterations, 100)
+        self.assertEqual(residual, 0)
+        self.assertEqual(self.vter.lloyd_relax(100, tol=10), (1, 0))
+
+    def test_boundaries(self):
+        vter = VoronoiTerrain(23, 17, [(3, 3), (20, 2), (10, 9), (4, 15), (18, 14), (12, 1)])
+        edge_mask, corner_mask = vter.boundary_masks()
+        adjacent = [set() for _ in vter.points]
+        for x in range(23):
+            for y in range(17):
+                region = vter.get_closest_point(x, y)
+                neighbours = [vter.get_closest_point((x + dx) % 23, (y + dy) % 17)
+                              for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+                self.assertEqual(edge_mask[y, x], any(n != region for n in neighbours))
+                self.assertEqual(corner_mask[y, x], len(set(neighbours)) >= 3)
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        if 0 <= x + dx < 23 and 0 <= y + dy < 17 and vter.get_closest_point(x + dx, y + dy) != region:
+                            adjacent[region].add(vter.get_closest_point(x + dx, y + dy))
+        for i, (x, y) in enumerate(vter.points):
+            self.assertEqual(vter.get_region_edge(x, y),
+                             [(ex, ey) for ex in range(23) for ey in range(17)
+                              if edge_mask[ey, ex] and vter.get_closest_point(ex, ey) == i])
+            self.assertEqual(vter.get_region_corners(x, y),
+                             [(cx, cy) for cx in range(23) for cy in range(17)
+                              if corner_mask[cy, cx] and vter.get_closest_point(cx, cy) == i])
+            self.assertEqual(vter.get_region_edge_cells(x, y).tolist(),
+                             sorted(ey * 23 + ex for ex, ey in vter.get_region_edge(x, y)))
+            self.assertEqual(vter.get_region_corner_cells(x, y).tolist(),
+                             sorted(cy * 23 + cx for cx, cy in vter.get_region_corners(x, y)))
+            self.assertFalse(vter.get_region_edge_cells(x, y).flags.writeable)
+            self.assertEqual(vter.get_adjacent_regions(x, y).tolist(), sorted(adjacent[i]))
+        self.assertTrue(vter.boundary_masks()[0] is edge_mask)
+        vter.move_point(10, 9, 11, 9)
+        self.assertFalse(vter.boundary_masks()[0] is edge_mask)
+
+    def test_empty_regions(self):
+        self.vter.add_point(100, 100)
+        self.assertEqual(self.vter.get_region(100, 100), [])
+        self.assertEqual(self.vter.get_region_edge(100, 100), [])
+        self.assertEqual(self.vter.get_region_corners(100, 100), [])
+        self.assertEqual(self.vter.get_adjacent_regions(100, 100).tolist(), [])
+        self.assertEqual(self.vter.get_region_width(100, 100), 0)
+        self.assert_matches_rebuild(self.vter)
+        self.vter.remove_point(100, 100)
+        self.assert_matches_rebuild(self.vter)
+
+    def assert_matches_rebuild(self, vter):
+        rebuilt = VoronoiTerrain(vter.width, vter.length, list(vter.points))
+        for x, y in rebuilt.points:
+            self.assertEqual(vter.get_region(x, y), rebuilt.get_region(x, y))
+            self.assertEqual(vter.get_region_cells(x, y).tolist(), rebuilt.get_region_cells(x, y).tolist())
+            self.assertEqual(vter.get_region_width(x, y), rebuilt.get_region_width(x, y))
+            self.assertEqual(vter.get_region_length(x, y), rebuilt.get_region_length(x, y))
+        for x in range(vter.width):
+            for y in range(vter.length):
+                self.assertEqual(vter.get_closest_point(x, y), rebuilt.get_closest_point(x, y))
+
+    def test_add_remove_move_point(self):
+        self.vter.add_point(6, 4)
+        self.assert_matches_rebuild(self.vter)
+        self.vter.remove_point(1, 1)
+        self.assert_matches_rebuild(self.vter)
+        self.vter.move_point(8, 2, 0, 7)
+        self.assert_matches_rebuild(self.vter)
+        rand = random.Random(2)
+        vter = VoronoiTerrain(23, 17, [(3, 3)])
+        for _ in range(40):
+            vter.add_point(rand.randint(0, 22), rand.randint(0, 16))
+            # index of regions is updated in place rather than rebuilt
+            self.assertIsNotNone(vter._region_cells)
+            if rand.random() < 0.3:
+                vter.remove_point(*rand.choice(vter.points))
+            if rand.random() < 0.3:
+                vter.move_point(*(rand.choice(vter.points) + (rand.randint(0, 22), rand.randint(0, 16))))
+            self.assert_matches_rebuild(vter)
+
+    def test_add_points_to_empty(self):
+        vter = VoronoiTerrain(6, 5, [])
+        vter.add_point(2, 2)
+        self.assertEqual(vter.get_region_width(2, 2), 6)
+        self.assertEqual(vter.get_region_length(2, 2), 5)
+        vter.add_point(4, 4)
+        self.assert_matches_rebuild(vter)
+        vter.remove_point(4, 4)
+        vter.remove_point(2, 2)
+        vter.add_point(1, 3)
+        self.assert_matches_rebuild(vter)
+
+    def test_remove_points(self):
+        rand = random.Random(3)
+        vter = VoronoiTerrain(31, 19, [(rand.randint(0, 30), rand.randint(0, 18)) for _ in range(25)])
+        vter.add_feature_point(*(vter.points[-1] * 2))
+        while len(vter.points) > 1:
+            vter.remove_point(*rand.choice(vter.points))
+            self.assert_matches_rebuild(vter)
+        vter.remove_point(*vter.points[0])
+        self.assertEqual(vter.points, [])
 
 
 if __name__ == "__main__":
@@ -1,9 +1,191 @@
 import unittest
+import random
+import numpy as np
 from randterrainpy import *
 
 
 class DiamondSquareGeneratorTester(unittest.TestCase):
-    pass
+
+    amp_from_freqs = [lambda f: f ** -2, lambda f: f ** -1, lambda f: 1]
+
+    def test_reference_matches_scalar(self):
+        for amp_from_freq in self.amp_from_freqs:
+            for seed in range(4):
+                scalar = DiamondSquareGenerator(amp_from_freq, DiamondSquareGenerator.SCALAR)(4, seed=seed)
+                reference = DiamondSquareGenerator(amp_from_freq, DiamondSquareGenerator.REFERENCE)(4, seed=seed)
+                self.assertEqual(scalar, reference)
+
+    def test_default_scalar(self):
+        gen = PinkNoiseGenerator()
+        self.assertEqual(gen.mode, DiamondSquareGenerator.SCALAR)
+        # unseeded, existing callers get the same terrain from the random module's state as before
+        random.seed(3)
+        self.assertEqual(gen(4), gen(4, seed=3))
+
+    def test_vectorized(self):
+        gen = PinkNoiseGenerator(mode=DiamondSquareGenerator.VECTORIZED)
+        self.assertEqual(gen.mode, DiamondSquareGenerator.VECTORIZED)
+        ter = gen(5, seed=3)
+        self.assertEqual((ter.width, ter.length), (33, 33))
+        self.assertEqual(ter, gen(5, seed=3))
+        self.assertNotEqual(ter.as_array().tolist(), gen(5, seed=4).as_array().tolist())
+        for x, y in [(0, 0), (0, 32), (32, 0), (32, 32)]:
+            self.assertEqual(ter[x, y], 0.5)
+        heights = WhiteNoiseGenerator(mode=DiamondSquareGenerator.VECTORIZED)(5, seed=3).as_array()
+        self.assertTrue(0 <= heights.min() and heights.max() <= 1)
+        self.assertTrue(np.array_equal(heights, np.round(heights, 3)))
+
+    def test_vectorized_statistics(self):
+        for amp_from_freq in self.amp_from_freqs:
+            stds = {}
+            for mode in [DiamondSquareGenerator.REFERENCE, DiamondSquareGenerator.VECTORIZED]:
+                gen = DiamondSquareGenerator(amp_from_freq, mode)
+                stds[mode] = np.mean([gen(6, seed=seed).as_array().std() for seed in range(20)])
+            self.assertAlmostEqual(stds[DiamondSquareGenerator.VECTORIZED] / stds[DiamondSquareGenerator.REFERENCE],
+                                   1, delta=0.25)
+
+    def test_iter_levels(self):
+        for mode in [DiamondSquareGenerator.SCALAR, DiamondSquareGenerator.REFERENCE,
+                     DiamondSquareGenerator.VECTORIZED]:
+            gen = DiamondSquareGenerator(lambda f: f ** -1, mode)
+            steps = []
+            for step, ter in gen.iter_levels(4, seed=2):
+                steps.append(step)
+                coarse = ter.as_array()[::step, ::step]
+                self.assertEqual(coarse.shape, (16 // step + 1,) * 2)
+                if step > 1:
+                    self.assertTrue(np.all(ter.as_array()[step // 2::step, step // 2::step] == 0))
+            self.assertEqual(steps, [16, 8, 4, 2, 1])
+            self.assertEqual(ter, gen(4, seed=2))
+
+    def test_sample_unsupported(self):
+        self.assertFalse(hasattr(PinkNoiseGenerator(), "sample"))
+        self.assertFalse(hasattr(PinkNoiseGenerator(), "window"))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(InvalidOptionError):
+            DiamondSquareGenerator(lambda f: 1, "fast")
+        with self.assertRaises(InvalidOptionError):
+            RedNoiseGenerator(mode="fast")
+
+
+class TiledDiamondSquareGeneratorTester(unittest.TestCase):
+
+    def test_seams(self):
+        gen = TiledDiamondSquareGenerator(lambda f: f ** -1, 4, seed=11)
+        tiles = dict(((i, j), gen(i, j).as_array()) for i in range(-1, 2) for j in range(-1, 2))
+        for (i, j), heights in tiles.items():
+            self.assertEqual(heights.shape, (17, 17))
+            self.assertTrue(0 <= heights.min() and heights.max() <= 1)
+            if (i + 1, j) in tiles:
+                self.assertTrue(np.array_equal(heights[:, -1], tiles[i + 1, j][:, 0]))
+            if (i, j + 1) in tiles:
+                self.assertTrue(np.array_equal(heights[-1, :], tiles[i, j + 1][0, :]))
+        self.assertFalse(np.array_equal(tiles[0, 0], tiles[1, 1]))
+
+    def test_order_independent(self):
+        gen = TiledDiamondSquareGenerator(lambda f: f ** -1, 4, seed=11)
+        first = [gen(i, 0) for i in range(3)]
+        gen.clear_cache()
+        other = TiledDiamondSquareGenerator(lambda f: f ** -1, 4, seed=11)
+        self.assertEqual(first[2], other(2, 0))
+        self.assertEqual(first[0], other(0, 0))
+        self.assertEqual(first[1], gen(1, 0))
+        different = TiledDiamondSquareGenerator(lambda f: f ** -1, 4, seed=12)
+        self.assertNotEqual(first[1].as_array().tolist(), different(1, 0).as_array().tolist())
+
+    def test_bounded_cache(self):
+        gen = TiledDiamondSquareGenerator(lambda f: f ** -1, 3, seed=5, cache_size=6)
+        uncached = TiledDiamondSquareGenerator(lambda f: f ** -1, 3, seed=5, cache_size=0)
+        for i in range(-3, 3):
+            for j in range(2):
+                self.assertEqual(gen(i, j), uncached(i, j))
+                self.assertTrue(len(gen._edges) <= 6)
+        self.assertEqual(len(uncached._edges), 0)
+
+    def test_window_and_sample(self):
+        gen = TiledDiamondSquareGenerator(lambda f: f ** -1, 3, seed=5)
+        ter = gen.window(-11, 3, 30, 14)
+        self.assertEqual((ter.width, ter.length), (30, 14))
+        for x, y in [(-11, 3), (-8, 7), (0, 8), (8, 16), (18, 16)]:
+            i, j = x // 8, y // 8
+            self.assertEqual(ter[x + 11, y - 3], gen(i, j)[x - 8 * i, y - 8 * j])
+        xs = np.array([[-11, 0, 18], [-3, 8, 5]])
+        ys = np.array([[3, 8, 16], [10, 4, 12]])
+        self.assertTrue(np.array_equal(gen.sample(xs, ys), ter.as_array()[ys - 3, xs + 11]))
+
+    def test_called_with_tile(self):
+        gen = TiledDiamondSquareGenerator(lambda f: f ** -1, 3, seed=5)
+        self.assertFalse(isinstance(gen, DiamondSquareGenerator))
+        self.assertFalse(hasattr(gen, "iter_levels") or hasattr(gen, "mode"))
+        with self.assertRaises(TypeError):
+            gen(3, seed=2)      # not a sized generator, so cannot be mistaken for one (e.g. by generate_batch)
+
+    def test_derive_seed(self):
+        self.assertEqual(derive_seed(5, 1, -2), derive_seed(5, 1, -2))
+        self.assertNotEqual(derive_seed(5, 1, -2), derive_seed(5, -2, 1))
+        self.assertNotEqual(derive_seed(5, 1, -2), derive_seed(6, 1, -2))
+        self.assertTrue(0 <= derive_seed(5, 1, -2) < 2 ** 32)
+
+
+class PerlinGeneratorTester(unittest.TestCase):
+
+    def test_matches_scalar(self):
+        random.seed(5)
+        gen = PerlinGenerator(4, 3, 2)
+        for linearly_interpolated in [False, True]:
+            ter = gen(linearly_interpolated)
+            self.assertEqual((ter.width, ter.length), (12, 8))
+            for x in range(ter.width):
+                for y in range(ter.length):
+                    self.assertEqual(ter[x, y], round(gen._get_noise_at(x, y), 3))
+
+    def test_octaves(self):
+        random.seed(5)
+        gen = PerlinGenerator(8, 4, 4)
+        single = gen()
+        self.assertEqual(single, gen(octaves=1, lacunarity=3.0, persistence=0.1))
+        layered = gen(octaves=4)
+        self.assertEqual((layered.width, layered.length), (32, 32))
+        heights = layered.as_array()
+        self.assertTrue(0 <= heights.min() and heights.max() <= 1)
+        self.assertNotEqual(heights.tolist(), single.as_array().tolist())
+        self.assertEqual(layered, gen(octaves=4))
+        with self.assertRaises(ValueError):
+            gen(octaves=0)
+
+    def test_seed(self):
+        self.assertEqual(PerlinGenerator(4, 3, 2, seed=1)(), PerlinGenerator(4, 3, 2, seed=1)())
+        self.assertNotEqual(PerlinGenerator(4, 3, 2, seed=1)().as_array().tolist(),
+                            PerlinGenerator(4, 3, 2, seed=2)().as_array().tolist())
+
+    def test_hashed_lattice(self):
+        gen = PerlinGenerator(4, 3, 2, PerlinGenerator.HASHED, seed=7)
+        ter = gen.window(-6, -9, 14, 20)
+        for x in range(ter.width):
+            for y in range(ter.length):
+                self.assertEqual(ter[x, y], round(gen._get_noise_at(x - 6, y - 9), 3))
+        self.assertEqual(gen(), gen.window(0, 0, 12, 8))
+        # overlapping windows match exactly, whichever order corners are hashed in
+        big = gen.window(-50, -50, 100, 100, octaves=3).as_array()
+        small = gen.window(-3, 5, 10, 7, octaves=3).as_array()
+        self.assertTrue(np.array_equal(big[55:62, 47:57], small))
+        self.assertEqual(gen.window(-6, -9, 14, 20), PerlinGenerator(4, 3, 2, PerlinGenerator.HASHED, seed=7).window(
+            -6, -9, 14, 20))
+        self.assertNotEqual(ter.as_array().tolist(), PerlinGenerator(4, 3, 2, PerlinGenerator.HASHED, seed=8).window(
+            -6, -9, 14, 20).as_array().tolist())
+
+    def test_sample(self):
+        for lattice in [PerlinGenerator.TABLE, PerlinGenerator.HASHED]:
+            gen = PerlinGenerator(4, 3, 2, lattice, seed=4)
+            heights = gen.window(-5, 2, 20, 10, octaves=2).as_array()
+            xs = np.array([-5, 0, 14, 7])
+            ys = np.array([2, 11, 6, 3])
+            self.assertTrue(np.array_equal(gen.sample(xs, ys, octaves=2), heights[ys - 2, xs + 5]))
+
+    def test_invalid_lattice(self):
+        with self.assertRaises(InvalidOptionError):
+            PerlinGenerator(4, 3, 2, "permuted")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+import unittest
+import tempfile
+import shutil
+import io
+import numpy as np
+from randterrainpy import *
+
+
+class BinaryFormatTester(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.fname = self.dir + "/test.bterr"
+        self.heights = np.linspace(0, 1, 12).reshape(3, 4)
+        with open(self.fname, "wb") as bin_file:
+            write_binary(bin_file, self.heights, chunk_rows=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_header(self):
+        with open(self.fname, "rb") as bin_file:
+            self.assertEqual(read_binary_header(bin_file), (4, 3, np.dtype("<f8")))
+        self.assertRaises(InvalidFileFormatError, read_binary_header, io.BytesIO(b"TERR" + b"\0" * 28))
+        self.assertRaises(InvalidOptionError, write_binary_header, io.BytesIO(), 1, 1, "<i4")
+
+    def test_map(self):
+        heights = map_binary(self.fname)
+        self.assertTrue(np.array_equal(heights, self.heights))
+        heights[0, 0] = 1     # copy on write, file unchanged
+        self.assertTrue(np.array_equal(map_binary(self.fname), self.heights))
+        with open(self.fname, "ab") as bin_file:
+            bin_file.write(b"\0")
+        self.assertRaises(InvalidFileFormatError, map_binary, self.fname)
+
+    def test_window(self):
+        self.assertTrue(np.array_equal(read_binary_window(self.fname, 1, 1, 2, 2), self.heights[1:3, 1:3]))
+        self.assertRaises(InvalidDimensionsError, read_binary_window, self.fname, 3, 0, 2, 1)
+
+
+class VoronoiFormatTester(unittest.TestCase):
+
+    def setUp(self):
+        self.heights = np.linspace(0, 1, 6).reshape(2, 3)
+        self.labels = np.array([[0, 0, 1], [0, 1, 1]])
+        self.points = np.array([[0, 0], [2.5, 1]])
+        self.feature_offsets = np.array([0, 1, 3])
+        self.features = np.array([[0, 1], [2, 0], [2, 1]])
+
+    def write(self, **changes):
+        arrays = dict(heights=self.heights, labels=self.labels, points=self.points,
+                      feature_offsets=self.feature_offsets, features=self.features)
+        arrays.update(changes)
+        bin_file = io.BytesIO()
+        write_voronoi_binary(bin_file, **arrays)
+        bin_file.seek(0)
+        return bin_file
+
+    def test_read(self):
+        arrays = read_voronoi_binary(self.write())
+        for array, expected in zip(arrays, (self.heights, self.labels, self.points,
+                                            self.feature_offsets, self.features)):
+            self.assertTrue(np.array_equal(array, expected))
+        self.assertEqual(arrays[1].dtype, np.int32)
+        self.assertEqual(len(self.write().getvalue()), VORONOI_HEADER_SIZE + 6 * 8 + 6 * 4 + 4 * 8 + 3 * 8 + 6 * 4)
+
+    def test_invalid(self):
+        truncated = io.BytesIO(self.write().getvalue()[:-1])
+        self.assertRaises(InvalidFileFormatError, read_voronoi_binary, truncated)
+        self.assertRaises(InvalidFileFormatError, read_voronoi_binary, self.write(labels=self.labels * 2))
+        self.assertRaises(InvalidFileFormatError, read_voronoi_binary,
+                          self.write(features=np.array([[1, 1], [2, 0], [2, 1]])))
+        self.assertRaises(InvalidFileFormatError, read_voronoi_binary, self.write(feature_offsets=[0, 2, 1]))
+
+
+class TerrFormatTester(unittest.TestCase):
+
+    def setUp(self):
+        self.text = "3 2\n0.0 0.5 1.0\n0.25 0.125 0.75\n"
+
+    def test_read(self):
+        terr_file = io.StringIO(u"" + self.text)
+        self.assertEqual(read_terr_header(terr_file), (3, 2))
+        rows = [row.tolist() for row in iter_terr_rows(terr_file, 3, 2)]
+        self.assertEqual(rows, [[0, 0.5, 1], [0.25, 0.125, 0.75]])
+        self.assertRaises(InvalidFileFormatError, list, iter_terr_rows(io.StringIO(u"0 1\n"), 3, 2))
+        self.assertRaises(InvalidFileFormatError, list, iter_terr_rows(io.StringIO(u"0 1 0.5 0\n"), 3, 1))
+        self.assertRaises(InvalidFileFormatError, read_terr_header, io.StringIO(u"3\n"))
+        for header in [u"0 2\n\n\n", u"3 0\n", u"0 0\n"]:
+            self.assertRaises(InvalidDimensionsError, read_terr_header, io.StringIO(header))
+            self.assertRaises(InvalidDimensionsError, Terrain.read_terrain, io.StringIO(header))
+
+    def test_write(self):
+        out = []
+        rows = [np.array([0, 0.5, 1]), np.array([0.25, 0.125, 0.75])]
+        writer = type("Writer", (object,), {"write": lambda _, text: out.append(text)})()
+        write_terr(writer, 3, 2, rows, chunk_size=8)
+        self.assertEqual("".join(out).split(), "3 2 0.0 0.5 1.0 0.25 0.125 0.75".split())
+        self.assertTrue(len(out) > 1)     # written in several chunks
+
+    def test_convert(self):
+        bin_file = io.BytesIO()
+        convert_terr_to_binary(io.StringIO(u"" + self.text), bin_file)
+        bin_file.seek(0)
+        self.assertEqual(read_binary_header(bin_file), (3, 2, np.dtype("<f8")))
+        self.assertEqual(np.frombuffer(bin_file.read(), dtype="<f8").tolist(), [0, 0.5, 1, 0.25, 0.125, 0.75])
+
+
+if __name__ == "__main__":
+    unittest.main()